@@ -0,0 +1,169 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from extractors.content_formats import check_format, create_content_writer, content_files, open_content
+from extractors.pdf_text_extractor import PDFTextExtractor
+from pdf_threading import fitz_lock
+
+
+class BackgroundExtraction(threading.Thread):
+    """Ekstrakcja pełnego tekstu w tle, z pierwszeństwem dla oglądanej strony.
+
+    Strony są ekstrahowane w dowolnej kolejności (od strony wskazanej przez
+    prioritize) i odkładane do pliku tymczasowego; wait_page zwraca strukturę
+    strony, gdy tylko jest gotowa. Po ostatniej stronie pdf_content.* i
+    pdf_content.txt są składane w kolejności stron i przenoszone do output_dir.
+    """
+
+    def __init__(self, pdf_path, output_dir, output_format='json', on_complete=None,
+                 on_page=None, extractor_cls=PDFTextExtractor):
+        super().__init__(daemon=True, name="BackgroundExtraction")
+        self.pdf_path = pdf_path
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.on_complete = on_complete
+        self.on_page = on_page  # wywoływane w wątku ekstrakcji dla każdej gotowej strony
+
+        check_format(output_format, extractor_cls.block_types)
+        self.extractor = extractor_cls(pdf_path)
+        self.page_count = self.extractor.doc.page_count
+
+        self.error = None
+        self.content_path = None
+        self.finished = threading.Event()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._page_ready = threading.Condition(self._lock)
+        self._offsets = {}  # strona -> (offset, długość) w pliku tymczasowym
+        self._cursor = 0
+
+        # Zamykany po złożeniu wyniku, błędzie albo zatrzymaniu (None - zamknięty)
+        self._spool = tempfile.TemporaryFile(dir=output_dir)
+
+    def prioritize(self, page_num):
+        """Kolejne strony będą ekstrahowane od page_num w przód"""
+        if 0 <= page_num < self.page_count:
+            with self._lock:
+                self._cursor = page_num
+
+    def progress(self):
+        """(gotowe strony, wszystkie strony)"""
+        with self._lock:
+            return len(self._offsets), self.page_count
+
+    def is_page_ready(self, page_num):
+        with self._lock:
+            return page_num in self._offsets
+
+    def wait_page(self, page_num, timeout=None):
+        """Struktura strony (jak PDFTextExtractor.extract_page); None po przekroczeniu timeout"""
+        self.prioritize(page_num)
+        with self._page_ready:
+            self._page_ready.wait_for(
+                lambda: (page_num in self._offsets or self.error is not None
+                         or self._stopped.is_set() or self._spool is None),
+                timeout
+            )
+            if page_num in self._offsets and self._spool is not None:
+                return self._read(page_num)
+            if self.error is not None:
+                raise RuntimeError(f"Background extraction failed: {self.error}")
+            content_path = self.content_path
+        if content_path is None:
+            return None
+        # Ekstrakcja zakończona - plik tymczasowy zamknięty, strona jest w pdf_content.*
+        reader = open_content(self.output_dir)
+        try:
+            return reader.load_page(page_num)
+        finally:
+            reader.close()
+
+    def _read(self, page_num):
+        offset, length = self._offsets[page_num]
+        self._spool.seek(offset)
+        return json.loads(self._spool.read(length))
+
+    def _next_page(self):
+        with self._lock:
+            if len(self._offsets) == self.page_count:
+                return None
+            while self._cursor in self._offsets:
+                self._cursor = (self._cursor + 1) % self.page_count
+            return self._cursor
+
+    def _close_spool(self):
+        with self._page_ready:
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
+            self._page_ready.notify_all()
+
+    def stop(self):
+        self._stopped.set()
+        with self._page_ready:
+            self._page_ready.notify_all()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
+        elif not self.is_alive():
+            # Wątek nieuruchomiony (albo już zakończony) - run() nie zamknie pliku
+            self._close_spool()
+
+    def run(self):
+        try:
+            while not self._stopped.is_set():
+                page_num = self._next_page()
+                if page_num is None:
+                    break
+                # Dokument współdzielony z widokiem (pula dokumentów)
+                with fitz_lock:
+                    page = self.extractor.extract_page(page_num)
+                data = json.dumps(page).encode('utf-8')
+                with self._page_ready:
+                    self._spool.seek(0, os.SEEK_END)
+                    self._offsets[page_num] = (self._spool.tell(), len(data))
+                    self._spool.write(data)
+                    self._page_ready.notify_all()
+                if self.on_page:
+                    self.on_page(page)
+
+            if not self._stopped.is_set():
+                self.assemble()
+                if self.on_complete:
+                    self.on_complete(self)
+        except Exception as e:
+            print(f"Background extraction of {self.pdf_path} failed: {e}")
+            with self._page_ready:
+                self.error = e
+                self._page_ready.notify_all()
+        finally:
+            self._close_spool()
+            self.extractor.close()
+            self.finished.set()
+
+    def assemble(self):
+        """Zapisuje strony w kolejności do katalogu tymczasowego i przenosi wynik"""
+        partial_dir = tempfile.mkdtemp(prefix='.partial-', dir=self.output_dir)
+        try:
+            writer = create_content_writer(partial_dir, self.output_format)
+            try:
+                with open(os.path.join(partial_dir, 'pdf_content.txt'), 'w', encoding='utf-8') as text_file:
+                    for page_num in range(self.page_count):
+                        with self._lock:
+                            page = self._read(page_num)
+                        writer.write_page(page)
+                        self.extractor.write_page_text(text_file, page)
+            finally:
+                writer.close()
+
+            # Pliki pojawiają się w projekcie dopiero kompletne
+            for name in content_files(self.output_format):
+                target = os.path.join(self.output_dir, name)
+                if os.path.isdir(target):
+                    shutil.rmtree(target)
+                os.replace(os.path.join(partial_dir, name), target)
+            self.content_path = os.path.join(self.output_dir, os.path.basename(writer.path))
+        finally:
+            shutil.rmtree(partial_dir, ignore_errors=True)
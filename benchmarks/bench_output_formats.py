@@ -0,0 +1,101 @@
+"""Porównanie formatów pdf_content: rozmiar na dysku i czas wczytania.
+
+Uruchomienie z katalogu repozytorium:
+    python -m benchmarks.bench_output_formats [plik.pdf] [--pages 300]
+Bez pliku generowany jest syntetyczny dokument tekstowy.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import fitz
+
+from extractors.pdf_text_extractor import PDFTextExtractor
+from extractors.content_formats import OUTPUT_FORMATS, open_content
+
+
+def make_text_pdf(path, pages, lines_per_page=50):
+    """Dokument z gęstym tekstem w kilku czcionkach"""
+    doc = fitz.open()
+    fonts = ["helv", "tiro", "cour"]
+    for page_num in range(pages):
+        page = doc.new_page()
+        for line in range(lines_per_page):
+            page.insert_text(
+                (40, 40 + line * 15),
+                f"Page {page_num} line {line}: lorem ipsum dolor sit amet {line * page_num}",
+                fontname=fonts[line % len(fonts)],
+                fontsize=9 + line % 3
+            )
+    doc.save(path)
+    doc.close()
+
+
+def disk_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, files in os.walk(path) for name in files)
+
+
+def bench_format(pdf_path, output_dir, output_format):
+    os.makedirs(output_dir, exist_ok=True)
+    extractor = PDFTextExtractor(pdf_path)
+    extractor.output_dir = output_dir
+
+    start = time.perf_counter()
+    path = extractor.extract_full_text(workers=1, output_format=output_format)
+    write_time = time.perf_counter() - start
+    extractor.close()
+    size = disk_size(path)
+    if output_format == 'jsonl':
+        size += disk_size(os.path.join(output_dir, 'pdf_content.jsonl.idx'))
+
+    start = time.perf_counter()
+    reader = open_content(output_dir)
+    pages = sum(1 for _ in reader.iter_pages())
+    reader.close()
+    load_all = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reader = open_content(output_dir)
+    reader.load_page(pages // 2)
+    reader.close()
+    load_one = time.perf_counter() - start
+
+    return {
+        'format': output_format,
+        'bytes': size,
+        'write_s': write_time,
+        'load_all_s': load_all,
+        'load_one_page_s': load_one,
+    }
+
+
+def run(pdf_path=None, pages=300):
+    with tempfile.TemporaryDirectory() as tmp:
+        if pdf_path is None:
+            pdf_path = os.path.join(tmp, 'synthetic.pdf')
+            make_text_pdf(pdf_path, pages)
+        results = [bench_format(pdf_path, os.path.join(tmp, output_format), output_format)
+                   for output_format in OUTPUT_FORMATS]
+
+    baseline = results[0]
+    print(f"{'format':<10} {'size':>12} {'ratio':>7} {'write s':>9} {'load all s':>11} {'load 1 page s':>14}")
+    for result in results:
+        print(f"{result['format']:<10} {result['bytes']:>12,} {result['bytes'] / baseline['bytes']:>7.2f} "
+              f"{result['write_s']:>9.3f} {result['load_all_s']:>11.3f} {result['load_one_page_s']:>14.4f}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdf", nargs="?", help="PDF to benchmark (default: synthetic document)")
+    parser.add_argument("--pages", type=int, default=300, help="pages of the synthetic document")
+    args = parser.parse_args(argv)
+    run(args.pdf, args.pages)
+
+
+if __name__ == "__main__":
+    main()
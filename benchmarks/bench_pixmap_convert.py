@@ -0,0 +1,110 @@
+"""Konwersja pixmapy do PIL: alokacje (tracemalloc) i czas.
+
+Uruchomienie z katalogu repozytorium:
+    python -m benchmarks.bench_pixmap_convert [plik.pdf] [--page 0] [--repeat 5]
+
+Porównywane ścieżki:
+    samples    - Image.frombytes(mode, size, pix.samples) (dotychczasowa)
+    samples_mv - pixmap_to_image(pix): PIL czyta bufor MuPDF bez kopii bytes
+    reuse      - pixmap_to_image(pix, into=img): dekodowanie do istniejącego obrazu
+    bitonal    - point() na obrazie 'L' kontra pixmap_to_bitonal (widok NumPy)
+
+tracemalloc widzi alokacje Pythona i NumPy (kopię pix.samples, tablice
+progowania); pamięć obrazów PIL i pixmap MuPDF jest poza nim, dlatego
+szczyt dotyczy tylko kopii pośrednich, których konwersja ma unikać.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import fitz
+from PIL import Image
+
+from pixmap_convert import pixmap_to_image, pixmap_to_bitonal
+from screenshot_profiles import BITONAL_THRESHOLD
+from benchmarks.bench_screenshot_profiles import make_mixed_pdf
+
+
+def legacy_image(pix, into=None):
+    mode = "L" if pix.n == 1 else "RGB"
+    return Image.frombytes(mode, [pix.width, pix.height], pix.samples)
+
+
+def legacy_bitonal(pix, threshold):
+    img = Image.frombytes("L", [pix.width, pix.height], pix.samples)
+    return img.point(lambda v: 255 if v >= threshold else 0, mode='1')
+
+
+def measure(convert, pix, repeat):
+    """(szczyt alokacji w bajtach, średni czas w s) dla convert(pix)"""
+    convert(pix)  # rozgrzewka: leniwe inicjalizacje PIL/NumPy poza pomiarem
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        convert(pix)
+    seconds = (time.perf_counter() - start) / repeat
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, seconds
+
+
+def run(pdf_path=None, page_num=0, repeat=5, scales=(1.0, 2.0, 4.0), json_path=None):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        if pdf_path is None:
+            pdf_path = os.path.join(tmp, 'mixed.pdf')
+            make_mixed_pdf(pdf_path)
+        doc = fitz.open(pdf_path)
+        page = doc.load_page(page_num)
+        for scale in scales:
+            matrix = fitz.Matrix(scale, scale)
+            rgb = page.get_pixmap(matrix=matrix)
+            gray = page.get_pixmap(matrix=matrix, colorspace=fitz.csGRAY)
+            target = pixmap_to_image(rgb)
+            cases = {
+                'samples': (lambda p: legacy_image(p), rgb),
+                'samples_mv': (lambda p: pixmap_to_image(p), rgb),
+                'reuse': (lambda p: pixmap_to_image(p, into=target), rgb),
+                'bitonal-point': (lambda p: legacy_bitonal(p, BITONAL_THRESHOLD), gray),
+                'bitonal-numpy': (lambda p: pixmap_to_bitonal(p, BITONAL_THRESHOLD), gray),
+            }
+            for name, (convert, pix) in cases.items():
+                peak, seconds = measure(convert, pix, repeat)
+                results.append({
+                    'scale': scale,
+                    'path': name,
+                    'pixels': pix.width * pix.height,
+                    'samples_bytes': len(pix.samples_mv),
+                    'peak_traced_bytes': peak,
+                    'convert_s': seconds,
+                })
+            del rgb, gray, target
+        doc.close()
+
+    print(f"\n{'scale':>5} {'path':<14} {'pixels':>11} {'samples B':>12} {'peak traced B':>14} {'ms':>8}")
+    for r in results:
+        print(f"{r['scale']:>5} {r['path']:<14} {r['pixels']:>11,} {r['samples_bytes']:>12,} "
+              f"{r['peak_traced_bytes']:>14,} {r['convert_s'] * 1000:>8.2f}")
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdf", nargs="?", help="PDF to benchmark (default: synthetic page)")
+    parser.add_argument("--page", type=int, default=0, help="page to render")
+    parser.add_argument("--repeat", type=int, default=5, help="conversions per path and scale")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0, 2.0, 4.0],
+                        help="render scales (1.0 = 72 DPI)")
+    parser.add_argument("--json", help="also write results to this JSON file")
+    args = parser.parse_args(argv)
+    run(args.pdf, args.page, args.repeat, args.scales, args.json)
+
+
+if __name__ == "__main__":
+    main()
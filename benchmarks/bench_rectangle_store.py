@@ -0,0 +1,95 @@
+"""Opóźnienie dodania prostokąta przy rosnącym rozmiarze projektu.
+
+Porównuje RectangleStore (dziennik + indeks w pamięci) z dotychczasowym
+zapisem: wczytanie rectangle_map.json, dopisanie, json.dump(indent=2).
+Mierzy też zapytania modelu: prostokąty strony i trafienie punktu.
+
+    python -m benchmarks.bench_rectangle_store [--sizes 10 1000 10000]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from rectangle_store import RectangleStore
+
+
+def make_rect(rect_id):
+    return {
+        'id': rect_id,
+        'page': rect_id % 50,
+        'rect': [10.0, 20.0, 110.0, 220.0],
+        'dimensions': {'width': 100.0, 'height': 200.0},
+        'description': '',
+        'keywords': [],
+        'image_path': f'screenshots/page{rect_id % 50 + 1}_rect{rect_id}.jpg',
+        'thumbnail_path': f'screenshots/thumbnails/page{rect_id % 50 + 1}_rect{rect_id}_thumb.jpg',
+        'timestamp': '2025-01-01T00:00:00'
+    }
+
+
+def legacy_add(data_file, rect):
+    with open(data_file, 'r') as f:
+        data = json.load(f)
+    data['rectangles'].append(rect)
+    with open(data_file, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def bench_size(tmp, size, adds):
+    data_file = os.path.join(tmp, f'store_{size}', 'rectangle_map.json')
+    os.makedirs(os.path.dirname(data_file))
+    store = RectangleStore(data_file, 'doc.pdf')
+    store.replace_all([make_rect(i) for i in range(1, size + 1)])
+    start = time.perf_counter()
+    for i in range(adds):
+        store.add(make_rect(size + 1 + i))
+    store.flush()
+    store_ms = (time.perf_counter() - start) / adds * 1000
+
+    queries = 1000
+    start = time.perf_counter()
+    for i in range(queries):
+        store.on_page(i % 50)
+    page_ms = (time.perf_counter() - start) / queries * 1000
+    start = time.perf_counter()
+    for i in range(queries):
+        store.hit_test(i % 50, 50.0, 100.0)
+    hit_ms = (time.perf_counter() - start) / queries * 1000
+    store.close()
+
+    legacy_file = os.path.join(tmp, f'legacy_{size}.json')
+    with open(legacy_file, 'w') as f:
+        json.dump({'pdf_path': 'doc.pdf', 'rectangles': [make_rect(i) for i in range(1, size + 1)]}, f, indent=2)
+    start = time.perf_counter()
+    for i in range(adds):
+        legacy_add(legacy_file, make_rect(size + 1 + i))
+    legacy_ms = (time.perf_counter() - start) / adds * 1000
+
+    return {'rectangles': size, 'store_add_ms': store_ms, 'legacy_add_ms': legacy_ms,
+            'on_page_ms': page_ms, 'hit_test_ms': hit_ms}
+
+
+def run(sizes=(10, 1000, 10000), adds=50):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            results.append(bench_size(tmp, size, adds))
+    print(f"{'rectangles':>10} {'store add ms':>13} {'legacy add ms':>14} {'on_page ms':>11} {'hit_test ms':>12}")
+    for result in results:
+        print(f"{result['rectangles']:>10} {result['store_add_ms']:>13.3f} {result['legacy_add_ms']:>14.3f} "
+              f"{result['on_page_ms']:>11.4f} {result['hit_test_ms']:>12.4f}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--adds", type=int, default=50, help="adds measured per size")
+    args = parser.parse_args(argv)
+    run(args.sizes, args.adds)
+
+
+if __name__ == "__main__":
+    main()
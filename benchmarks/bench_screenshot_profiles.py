@@ -0,0 +1,118 @@
+"""Profile kodowania zrzutów: rozmiar pliku, czas renderu i kodowania.
+
+Uruchomienie z katalogu repozytorium:
+    python -m benchmarks.bench_screenshot_profiles [plik.pdf] [--page 0] [--repeat 3]
+
+Bez pliku generowana jest strona z tekstem, tabelą i zdjęciem. Mierzone są
+trzy regiony: mała etykieta, pół strony i cała strona.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import fitz
+from PIL import Image
+
+from screenshot_manager import ScreenshotManager
+from screenshot_profiles import PROFILES
+
+
+def make_mixed_pdf(path):
+    """Strona z akapitami, siatką liczb i obrazem o ciągłych tonach"""
+    doc = fitz.open()
+    page = doc.new_page()
+    for line in range(25):
+        page.insert_text((40, 50 + line * 12),
+                         f"Line {line}: the quick brown fox jumps over the lazy dog {line * 17}",
+                         fontsize=9)
+    for row in range(12):
+        for col in range(6):
+            page.insert_text((40 + col * 90, 370 + row * 14), f"{row * 100 + col:>8}", fontsize=9)
+
+    # Gradient z szumem - zdjęcie to najtrudniejszy przypadek dla kodeków bezstratnych
+    rng = random.Random(7)
+    photo = Image.new("RGB", (400, 250))
+    photo.putdata([(x * 255 // 400, y * 255 // 250, rng.randrange(256))
+                   for y in range(250) for x in range(400)])
+    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
+        photo.save(tmp.name)
+    page.insert_image(fitz.Rect(40, 560, 440, 810), filename=tmp.name)
+    os.remove(tmp.name)
+    doc.save(path)
+    doc.close()
+
+
+def regions(page_rect):
+    w, h = page_rect.width, page_rect.height
+    return {
+        'label': [40, 40, 240, 62],
+        'half-page': [0, 0, w, h / 2],
+        'full-page': [0, 0, w, h],
+    }
+
+
+def bench_profile(manager, page, doc, name, rect, repeat, rect_id):
+    render_s = encode_s = 0.0
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        image = manager.capture_screenshot(page, rect, doc, 1.0, name)
+        render_s += time.perf_counter() - start
+
+        start = time.perf_counter()
+        paths = manager.save_screenshot(image, page.number, rect_id, name)
+        encode_s += time.perf_counter() - start
+        size = os.path.getsize(paths['image_path'])
+    return {
+        'profile': name,
+        'pixels': image.size[0] * image.size[1],
+        'bytes': size,
+        'render_s': render_s / repeat,
+        'encode_s': encode_s / repeat,
+    }
+
+
+def run(pdf_path=None, page_num=0, repeat=3, json_path=None):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        if pdf_path is None:
+            pdf_path = os.path.join(tmp, 'mixed.pdf')
+            make_mixed_pdf(pdf_path)
+        manager = ScreenshotManager(os.path.join(tmp, 'screenshots'), pdf_path)
+        doc = fitz.open(pdf_path)
+        page = doc.load_page(page_num)
+        rect_id = 0
+        for region, rect in regions(page.rect).items():
+            for name in PROFILES:
+                rect_id += 1
+                result = bench_profile(manager, page, doc, name, rect, repeat, rect_id)
+                result['region'] = region
+                results.append(result)
+        doc.close()
+        manager.close()
+
+    print(f"\n{'region':<10} {'profile':<24} {'pixels':>11} {'bytes':>11} {'render ms':>10} {'encode ms':>10}")
+    for r in results:
+        print(f"{r['region']:<10} {r['profile']:<24} {r['pixels']:>11,} {r['bytes']:>11,} "
+              f"{r['render_s'] * 1000:>10.1f} {r['encode_s'] * 1000:>10.1f}")
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdf", nargs="?", help="PDF to benchmark (default: synthetic page)")
+    parser.add_argument("--page", type=int, default=0, help="page to capture")
+    parser.add_argument("--repeat", type=int, default=3, help="captures per profile and region")
+    parser.add_argument("--json", help="also write results to this JSON file")
+    args = parser.parse_args(argv)
+    run(args.pdf, args.page, args.repeat, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Wykrywanie tabel: detektor NumPy (table_detection) vs dotychczasowa heurystyka.
+
+Uruchomienie z katalogu repozytorium:
+    python -m benchmarks.bench_table_detection [--rows 200 --cols 100]
+
+Czas mierzony jest na syntetycznej stronie z rows x cols komórkami (domyślnie
+20 000), jakość - na stronach z tabelami o znanym układzie (tekst nad i pod
+tabelą, kolumny liczbowe wyrównane do prawej).
+"""
+import argparse
+import random
+import time
+
+import fitz
+
+from extractors.table_detection import page_lines, detect_tables
+
+
+def legacy_detect(blocks):
+    """Heurystyka sprzed detektora NumPy: porównanie górnej krawędzi bloku z poprzednim"""
+    tables = []
+    potential_table_rows = []
+    for block in blocks:
+        if block["type"] != 0:
+            continue
+        bbox = block["bbox"]
+        text_lines = [(" ".join(span["text"] for span in line["spans"]), line["bbox"])
+                      for line in block["lines"]]
+        if potential_table_rows and abs(bbox[1] - potential_table_rows[-1]["bbox"][1]) < 10:
+            potential_table_rows.append({"text": text_lines, "bbox": bbox})
+        else:
+            if len(potential_table_rows) > 1:
+                tables.append({"type": "table", "rows": potential_table_rows})
+            potential_table_rows = [{"text": text_lines, "bbox": bbox}]
+    if len(potential_table_rows) > 1:
+        tables.append({"type": "table", "rows": potential_table_rows})
+    return tables
+
+
+def cell_text(row, col):
+    # Unikalne teksty - pozwalają dopasować wynik do układu wzorcowego
+    if col == 0:
+        return f"item-{row}"
+    return f"{row * 1000 + col}.{col:02d}"
+
+
+def table_cells(rows, cols, x, y, col_width, row_height, fontsize):
+    """Położenia komórek [(tekst, x, linia bazowa)] i wzorzec {tekst: (wiersz, kolumna)}"""
+    placements = []
+    truth = {}
+    for r in range(rows):
+        baseline = y + (r + 1) * row_height
+        for c in range(cols):
+            text = cell_text(r, c)
+            if c == 0:
+                tx = x  # pierwsza kolumna do lewej, liczby do prawej
+            else:
+                width = fitz.get_text_length(text, fontsize=fontsize)
+                tx = x + (c + 1) * col_width - width - 4
+            placements.append((text, tx, baseline))
+            truth[text] = (r, c)
+    return placements, truth
+
+
+def draw_table(page, rows, cols, x, y, col_width, row_height, fontsize):
+    """Rysuje tabelę przez insert_text i zwraca wzorzec"""
+    placements, truth = table_cells(rows, cols, x, y, col_width, row_height, fontsize)
+    for text, tx, baseline in placements:
+        page.insert_text((tx, baseline), text, fontsize=fontsize)
+    return truth
+
+
+def make_big_table_pdf(path, rows, cols, fontsize=5):
+    """Strona z rows x cols komórkami zapisana bezpośrednio jako strumień treści.
+
+    insert_text dla dziesiątek tysięcy komórek trwa minuty - operatory
+    tekstu piszemy sami (czcionka Helvetica, współrzędne PDF od dołu).
+    """
+    col_width = fontsize * 8
+    row_height = fontsize * 1.6
+    doc = fitz.open()
+    page = doc.new_page(width=cols * col_width + 80, height=rows * row_height + 80)
+    page.insert_font(fontname="helv")
+    placements, _ = table_cells(rows, cols, 40, 30, col_width, row_height, fontsize)
+    height = page.rect.height
+    ops = ["BT", f"/helv {fontsize} Tf"]
+    for text, tx, baseline in placements:
+        ops.append(f"1 0 0 1 {tx:.2f} {height - baseline:.2f} Tm ({text}) Tj")
+    ops.append("ET")
+    xref = doc.get_new_xref()
+    doc.update_object(xref, "<<>>")
+    doc.update_stream(xref, "\n".join(ops).encode("ascii"))
+    doc.xref_set_key(page.xref, "Contents", f"{xref} 0 R")
+    doc.save(path)
+    doc.close()
+
+
+def make_quality_pdf(path, seed=0, pages=20):
+    """Strony z akapitem, tabelą o losowym rozmiarze i akapitem pod spodem"""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    truths = []
+    for page_num in range(pages):
+        page = doc.new_page()
+        fontsize = rng.choice([8, 9, 10])
+        y = 50
+        for line in range(rng.randint(2, 5)):
+            page.insert_text((50, y), f"Paragraph line {page_num}-{line} with ordinary running text.", fontsize=fontsize)
+            y += fontsize * 1.5
+        rows, cols = rng.randint(3, 25), rng.randint(2, 6)
+        row_height = fontsize * rng.choice([1.4, 1.8, 2.4])
+        truth = draw_table(page, rows, cols, 50, y + fontsize, 80, row_height, fontsize)
+        y += (rows + 2) * row_height + fontsize * 2
+        page.insert_text((50, y), f"Closing remark {page_num} below the table.", fontsize=fontsize)
+        truths.append(truth)
+    doc.save(path)
+    doc.close()
+    return truths
+
+
+def score(truth, detected_rows, detected_cols=None):
+    """Metryki dla jednej strony.
+
+    detected_rows: {tekst: identyfikator wiersza} dla linii zaliczonych do tabel
+    detected_cols: {tekst: identyfikator kolumny} (None - metoda nie daje kolumn)
+    """
+    recalled = sum(1 for text in truth if text in detected_rows)
+    spurious = sum(1 for text in detected_rows if text not in truth)
+
+    # Wiersz poprawny, gdy jego komórki są razem i bez obcych komórek
+    groups = {}
+    for text, row_id in detected_rows.items():
+        groups.setdefault(row_id, set()).add(text)
+    truth_rows = {}
+    for text, (r, _) in truth.items():
+        truth_rows.setdefault(r, set()).add(text)
+    rows_ok = sum(1 for cells in truth_rows.values()
+                  if any(cells == group for group in groups.values()))
+
+    cols_ok = None
+    if detected_cols is not None:
+        truth_cols = {}
+        for text, (_, c) in truth.items():
+            truth_cols.setdefault(c, set()).add(text)
+        col_groups = {}
+        for text, col_id in detected_cols.items():
+            col_groups.setdefault(col_id, set()).add(text)
+        cols_ok = sum(1 for cells in truth_cols.values()
+                      if any(cells == group for group in col_groups.values()))
+        cols_ok /= len(truth_cols)
+
+    return {
+        'cell_recall': recalled / len(truth),
+        'spurious_lines': spurious,
+        'rows_exact': rows_ok / len(truth_rows),
+        'cols_exact': cols_ok,
+    }
+
+
+def quality(pdf_path, truths):
+    doc = fitz.open(pdf_path)
+    totals = {'legacy': [], 'numpy': []}
+    for page_num, truth in enumerate(truths):
+        blocks = doc[page_num].get_text("dict")["blocks"]
+
+        legacy_rows = {}
+        for t, table in enumerate(legacy_detect(blocks)):
+            # Jeden "wiersz" heurystyki to blok; tabela to grupa bloków o podobnym y
+            for row in table["rows"]:
+                for text, _ in row["text"]:
+                    legacy_rows[text.strip()] = t
+        totals['legacy'].append(score(truth, legacy_rows))
+
+        bboxes, texts = page_lines(blocks)
+        rows, cols = {}, {}
+        for t, table in enumerate(detect_tables(bboxes, texts)):
+            for cell in table["cells"]:
+                rows[cell["text"]] = (t, cell["row"])
+                cols[cell["text"]] = (t, cell["col"])
+        totals['numpy'].append(score(truth, rows, cols))
+    doc.close()
+
+    summary = {}
+    for method, scores in totals.items():
+        summary[method] = {}
+        for key in scores[0]:
+            values = [s[key] for s in scores if s[key] is not None]
+            summary[method][key] = sum(values) / len(values) if values else None
+    return summary
+
+
+def speed(pdf_path, repeat=3):
+    doc = fitz.open(pdf_path)
+    page = doc[0]
+    start = time.perf_counter()
+    blocks = page.get_text("dict")["blocks"]
+    layout = time.perf_counter() - start
+
+    def best(fn):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - start)
+        return min(times), result
+
+    legacy_time, legacy_tables = best(lambda: legacy_detect(blocks))
+    numpy_time, tables = best(lambda: detect_tables(*page_lines(blocks)))
+    doc.close()
+    return {
+        'lines': len(page_lines(blocks)[1]),
+        'layout_ms': layout * 1000,
+        'legacy_ms': legacy_time * 1000,
+        'legacy_tables': len(legacy_tables),
+        'numpy_ms': numpy_time * 1000,
+        'numpy_tables': [(t['n_rows'], t['n_cols']) for t in tables],
+    }
+
+
+def run(rows=200, cols=100, pages=20, tmp_dir=None):
+    import tempfile
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as tmp:
+        big_pdf = f"{tmp}/big_table.pdf"
+        make_big_table_pdf(big_pdf, rows, cols)
+        timing = speed(big_pdf)
+        print(f"Synthetic page: {rows} x {cols} = {rows * cols} cells, {timing['lines']} lines")
+        print(f"  get_text('dict'): {timing['layout_ms']:.1f} ms")
+        print(f"  legacy heuristic: {timing['legacy_ms']:.1f} ms, {timing['legacy_tables']} 'tables'")
+        print(f"  numpy detector:   {timing['numpy_ms']:.1f} ms, tables (rows, cols): {timing['numpy_tables']}")
+
+        quality_pdf = f"{tmp}/tables.pdf"
+        truths = make_quality_pdf(quality_pdf, pages=pages)
+        summary = quality(quality_pdf, truths)
+        print(f"Quality on {pages} pages with known tables (mean per page):")
+        print(f"{'method':<8} {'cell recall':>12} {'spurious':>9} {'rows exact':>11} {'cols exact':>11}")
+        for method, m in summary.items():
+            cols_exact = f"{m['cols_exact']:.3f}" if m['cols_exact'] is not None else "n/a"
+            print(f"{method:<8} {m['cell_recall']:>12.3f} {m['spurious_lines']:>9.1f} "
+                  f"{m['rows_exact']:>11.3f} {cols_exact:>11}")
+        return timing, summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--cols", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=20, help="pages for the quality comparison")
+    args = parser.parse_args(argv)
+    run(args.rows, args.cols, args.pages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Sprawdzenie, że równoległa ekstrakcja daje te same pliki co szeregowa.
+
+Uruchomienie z katalogu repozytorium:
+    python -m benchmarks.check_parallel [--pages 400] [--workers 4]
+
+Procesy robocze (fork) nie mogą korzystać z dokumentów rodzica - wspólny
+deskryptor pliku psuje odczyt stron, zwykle bez wyjątku. Kod wyjścia 1,
+gdy którykolwiek wynik się różni.
+"""
+import argparse
+import filecmp
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz
+
+from benchmarks.fixtures import make_large, make_table_heavy
+from extractors.pdf_table_extractor import PDFTableExtractor
+from extractors.pdf_text_extractor import PDFTextExtractor
+from extractors.table_export import export_tables
+from docparser.reextract import reextract_project
+from rectangle_store import RectangleStore
+from document_pool import document_pool, open_document
+from benchmarks.suite import quiet
+
+
+def extract(extractor_cls, pdf_path, output_dir, workers):
+    os.makedirs(output_dir)
+    extractor = extractor_cls(pdf_path)
+    extractor.output_dir = output_dir
+    try:
+        extractor.extract_full_text(workers=workers)
+    finally:
+        extractor.close()
+    return output_dir
+
+
+def same_tree(left, right):
+    """Lista plików różniących się między katalogami (pusta - identyczne)"""
+    diff = []
+    for root, _, files in os.walk(left):
+        for name in files:
+            path = os.path.join(root, name)
+            other = os.path.join(right, os.path.relpath(path, left))
+            if not os.path.exists(other) or not filecmp.cmp(path, other, shallow=False):
+                diff.append(os.path.relpath(path, left))
+    return diff
+
+
+def _pool_users_in_worker(pdf_path):
+    """Worker: liczba użytkowników dokumentu w puli przed otwarciem i czy
+    otwarty dokument jest obiektem odziedziczonym po rodzicu"""
+    before = document_pool.refcount(pdf_path)
+    handle = open_document(pdf_path)
+    try:
+        return before, id(handle.doc)
+    finally:
+        handle.close()
+
+
+def check_document_pool(pdf_path, tmp, workers):
+    """Deterministycznie: worker nie widzi dokumentu trzymanego przez rodzica
+    (porównanie wyników łapie wspólny deskryptor tylko przy przeplocie odczytów)"""
+    handle = open_document(pdf_path)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_pool_users_in_worker, [pdf_path] * workers))
+        diff = [f"worker sees {before} parent user(s)" for before, _ in results if before]
+        diff += ["worker reuses the parent's document"
+                 for _, doc_id in results if doc_id == id(handle.doc)]
+    finally:
+        handle.close()
+    return {'DocumentPool in worker processes': diff}
+
+
+def check_extractors(pdf_path, tmp, workers):
+    results = {}
+    for extractor_cls in (PDFTextExtractor, PDFTableExtractor):
+        name = extractor_cls.__name__
+        serial = extract(extractor_cls, pdf_path, os.path.join(tmp, f"{name}-serial"), 1)
+        parallel = extract(extractor_cls, pdf_path, os.path.join(tmp, f"{name}-parallel"), workers)
+        results[f"{name}.extract_full_text"] = same_tree(serial, parallel)
+    return results
+
+
+def check_table_export(pdf_path, tmp, workers, pages=60):
+    """export_tables (CSV) szeregowo i równolegle na dokumencie z tabelami"""
+    tables_pdf = os.path.join(tmp, 'tables.pdf')
+    make_table_heavy(tables_pdf, pages)
+    serial = os.path.join(tmp, 'tables-serial')
+    parallel = os.path.join(tmp, 'tables-parallel')
+    export_tables(tables_pdf, serial, 'csv', workers=1)
+    export_tables(tables_pdf, parallel, 'csv', workers=workers)
+    return {'export_tables': same_tree(serial, parallel)}
+
+
+def check_reextract(pdf_path, tmp, workers):
+    """reextract_project (workers=1 kontra workers) na projekcie bez pdf_content -
+    procesy czytają strony z dokumentu; prostokąt na co drugiej stronie"""
+    with fitz.open(pdf_path) as doc:
+        pages = doc.page_count
+    project = os.path.join(tmp, 'project')
+    os.makedirs(project)
+    store = RectangleStore(os.path.join(project, 'rectangle_map.json'), pdf_path)
+    store.replace_all([{
+        'id': rect_id, 'page': rect_id * 2 - 2, 'rect': [30.0, 30.0, 400.0, 80.0],
+        'coord_space': 'pdf', 'description': '', 'keywords': [],
+    } for rect_id in range(1, pages // 2 + 1)])
+    store.close()
+
+    extracted = {}
+    for name, count in (('serial', 1), ('parallel', workers)):
+        path = os.path.join(tmp, f"project-{name}")
+        shutil.copytree(project, path)
+        reextract_project(path, count)
+        store = RectangleStore(os.path.join(path, 'rectangle_map.json'), read_only=True)
+        extracted[name] = {rect['id']: rect.get('extracted_text') for rect in store.all()}
+        store.close()
+    diff = [f"rect {rect_id}" for rect_id, text in extracted['serial'].items()
+            if text is None or extracted['parallel'].get(rect_id) != text]
+    return {'TextExtractionManager.reextract_all': diff}
+
+
+CHECKS = [check_document_pool, check_extractors, check_table_export, check_reextract]
+
+
+def run(pages=400, workers=4):
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, 'large.pdf')
+        make_large(pdf_path, pages)
+        for check in CHECKS:
+            with quiet():
+                results = check(pdf_path, tmp, workers)
+            for name, diff in results.items():
+                print(f"{name:<40} {'OK' if not diff else 'DIFFERS: ' + ', '.join(diff)}")
+                failed = failed or bool(diff)
+    return not failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=400, help="pages of the generated document")
+    parser.add_argument("--workers", type=int, default=4, help="processes of the parallel run")
+    args = parser.parse_args(argv)
+    return 0 if run(args.pages, args.workers) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Sprawdzenie poprawności dziennika RectangleStore (odtwarzanie, ucięty ogon).
+
+Uruchomienie z katalogu repozytorium:
+    python -m benchmarks.check_rectangle_store [--ops 2000] [--seed 0]
+
+bench_rectangle_store mierzy tylko czasy - tutaj losowe operacje są
+zapisywane, a po ponownym wczytaniu model musi być identyczny. Kod
+wyjścia 1, gdy którykolwiek przypadek zawiedzie.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+from rectangle_store import RectangleStore
+from benchmarks.suite import quiet
+
+TORN_LINE = b'{"op": "add", "rect": {"id"'
+
+
+def make_rect(rect_id, rng):
+    x, y = rng.uniform(0, 400), rng.uniform(0, 600)
+    return {'id': rect_id, 'page': rng.randrange(20), 'rect': [x, y, x + 50, y + 30],
+            'coord_space': 'pdf', 'description': '', 'keywords': []}
+
+
+def random_ops(store, count, rng):
+    """Losowe add/update/update_many/delete; zwraca model oczekiwany po operacjach"""
+    next_id = store.next_id()
+    for _ in range(count):
+        ids = [rect['id'] for rect in store.all()]
+        kind = rng.random()
+        if kind < 0.5 or not ids:
+            store.add(make_rect(next_id, rng))
+            next_id += 1
+        elif kind < 0.7:
+            store.update(rng.choice(ids), {'description': f'd{rng.randrange(1000)}'})
+        elif kind < 0.85:
+            store.update_many({rect_id: {'keywords': [str(rng.randrange(10))]}
+                               for rect_id in rng.sample(ids, min(5, len(ids)))})
+        else:
+            store.delete(rng.choice(ids))
+    return snapshot(store)
+
+
+def snapshot(store):
+    return {rect['id']: dict(rect) for rect in store.all()}
+
+
+def reopen(data_file, compact_every=1000):
+    store = RectangleStore(data_file, 'doc.pdf', compact_every=compact_every)
+    model = snapshot(store)
+    return store, model
+
+
+def check_replay(tmp, ops, rng, compact_every):
+    """Model po ponownym wczytaniu (snapshot + dziennik) równy modelowi w pamięci"""
+    data_file = os.path.join(tmp, f'replay-{compact_every}', 'rectangle_map.json')
+    os.makedirs(os.path.dirname(data_file))
+    store = RectangleStore(data_file, 'doc.pdf', compact_every=compact_every)
+    expected = random_ops(store, ops, rng)
+    store.close()
+    store, model = reopen(data_file)
+    store.close()
+    return [] if model == expected else [f"{len(model)} rectangles replayed, {len(expected)} expected"]
+
+
+def check_torn_tail(tmp, ops, rng):
+    """Ucięta ostatnia linia: pominięta, obcięta, a następny zapis przetrwa wczytanie"""
+    data_file = os.path.join(tmp, 'torn', 'rectangle_map.json')
+    os.makedirs(os.path.dirname(data_file))
+    store = RectangleStore(data_file, 'doc.pdf', compact_every=ops * 10)
+    expected = random_ops(store, ops, rng)
+    store.close()
+    with open(store.journal_file, 'ab') as f:
+        f.write(TORN_LINE)
+
+    problems = []
+    # Bez kompaktacji - przepisanie snapshotu ukryłoby sklejenie linii w dzienniku
+    store, model = reopen(data_file, ops * 10)
+    if model != expected:
+        problems.append("model differs after a torn tail")
+    with open(store.journal_file, 'rb') as f:
+        if not f.read().endswith(b'\n'):
+            problems.append("torn tail left in the journal")
+
+    # Pierwsza zmiana po ponownym otwarciu
+    rect = make_rect(store.next_id(), rng)
+    store.add(rect)
+    expected = snapshot(store)
+    store.close()
+    store, model = reopen(data_file, ops * 10)
+    store.close()
+    if rect['id'] not in model:
+        problems.append(f"rectangle {rect['id']} added after reopening is missing")
+    elif model != expected:
+        problems.append("model differs after reopen-then-append")
+    return problems
+
+
+def run(ops=2000, seed=0):
+    rng = random.Random(seed)
+    checks = {
+        'replay (journal only)': lambda tmp: check_replay(tmp, ops, rng, ops * 10),
+        'replay (with compaction)': lambda tmp: check_replay(tmp, ops, rng, ops // 7 or 1),
+        'torn tail + reopen-then-append': lambda tmp: check_torn_tail(tmp, ops, rng),
+    }
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, check in checks.items():
+            with quiet():
+                problems = check(tmp)
+            print(f"{name:<40} {'OK' if not problems else 'FAILED: ' + '; '.join(problems)}")
+            failed = failed or bool(problems)
+    return not failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=2000, help="random operations per case")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    return 0 if run(args.ops, args.seed) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""Dokumenty testowe dla benchmarków, generowane lokalnie przez fitz.
+
+Generatory są deterministyczne (stałe ziarna), więc wyniki z różnych
+uruchomień dotyczą identycznych plików. Gotowe pliki są trzymane w katalogu
+fixtures (domyślnie w katalogu tymczasowym systemu) i generowane tylko, gdy
+ich brakuje albo zmieniła się wersja generatora (FIXTURE_VERSION w nazwie).
+
+    python -m benchmarks.fixtures [--dir katalog] [--large-pages 1000]
+"""
+import argparse
+import os
+import random
+import tempfile
+
+import fitz
+from PIL import Image
+
+from benchmarks.bench_table_detection import draw_table
+
+# Zmiana generatorów = nowa wersja, stare pliki nie są używane
+FIXTURE_VERSION = 1
+
+DEFAULT_DIR = os.path.join(tempfile.gettempdir(), 'docparser-bench-fixtures')
+
+
+def make_text_heavy(path, pages=50):
+    """Gęsty tekst akapitowy w trzech czcionkach"""
+    doc = fitz.open()
+    fonts = ["helv", "tiro", "cour"]
+    for page_num in range(pages):
+        page = doc.new_page()
+        for line in range(50):
+            page.insert_text(
+                (40, 40 + line * 15),
+                f"Page {page_num} line {line}: lorem ipsum dolor sit amet {line * page_num}",
+                fontname=fonts[line % len(fonts)],
+                fontsize=9 + line % 3
+            )
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def make_table_heavy(path, pages=30, seed=0):
+    """Na każdej stronie dwie tabele liczbowe z krótkim tekstem pomiędzy"""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        y = 40
+        for table in range(2):
+            page.insert_text((50, y), f"Table {page_num}.{table}: quarterly figures", fontsize=9)
+            rows, cols = rng.randint(12, 20), rng.randint(4, 6)
+            draw_table(page, rows, cols, 50, y + 6, 85, 14, 8)
+            y += (rows + 3) * 14
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def make_image_heavy(path, pages=20, seed=0):
+    """Strony z czterema zdjęciami (szum + gradient) i podpisami"""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    with tempfile.TemporaryDirectory() as tmp:
+        photos = []
+        for index in range(4):
+            photo = Image.new("RGB", (500, 350))
+            photo.putdata([((x + index * 60) % 256, y * 255 // 350, rng.randrange(256))
+                           for y in range(350) for x in range(500)])
+            photo_path = os.path.join(tmp, f"photo{index}.jpg")
+            photo.save(photo_path, quality=90)
+            photos.append(photo_path)
+        for page_num in range(pages):
+            page = doc.new_page()
+            for slot in range(4):
+                x, y = 40 + (slot % 2) * 270, 40 + (slot // 2) * 380
+                page.insert_image(fitz.Rect(x, y, x + 250, y + 175),
+                                  filename=photos[(page_num + slot) % len(photos)])
+                page.insert_text((x, y + 190), f"Figure {page_num}.{slot}: sample photograph", fontsize=8)
+        doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def make_large(path, pages=1000):
+    """Długi dokument tekstowy; jedno insert_text na stronę, żeby generowanie trwało sekundy"""
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        page.insert_text(
+            (40, 40),
+            [f"Page {page_num} line {line}: lorem ipsum dolor sit amet {line * page_num}"
+             for line in range(45)],
+            fontsize=10
+        )
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+FIXTURES = {
+    'text-heavy': make_text_heavy,
+    'table-heavy': make_table_heavy,
+    'image-heavy': make_image_heavy,
+    'large': make_large,
+}
+
+
+def fixture_path(directory, name, large_pages=1000):
+    suffix = f"-{large_pages}p" if name == 'large' else ""
+    return os.path.join(directory, f"{name}{suffix}-v{FIXTURE_VERSION}.pdf")
+
+
+def build_fixtures(directory=DEFAULT_DIR, names=None, large_pages=1000):
+    """{nazwa: ścieżka} - brakujące pliki są generowane"""
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name in names or FIXTURES:
+        path = fixture_path(directory, name, large_pages)
+        if not os.path.exists(path):
+            print(f"Generating fixture {name}: {path}")
+            partial = path + ".partial"
+            if name == 'large':
+                make_large(partial, large_pages)
+            else:
+                FIXTURES[name](partial)
+            os.replace(partial, path)
+        paths[name] = path
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="fixture directory")
+    parser.add_argument("--large-pages", type=int, default=1000, help="pages of the large fixture")
+    args = parser.parse_args(argv)
+    for name, path in build_fixtures(args.dir, large_pages=args.large_pages).items():
+        with fitz.open(path) as doc:
+            print(f"{name:<12} {doc.page_count:>5} pages {os.path.getsize(path):>12,} B  {path}")
+
+
+if __name__ == "__main__":
+    main()
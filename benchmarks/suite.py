@@ -0,0 +1,331 @@
+"""Zestaw benchmarków ścieżek krytycznych: ekstrakcja, render, zrzuty, zapis prostokątów.
+
+Uruchomienie z katalogu repozytorium:
+    python -m benchmarks.suite [--only text tables navigation screenshots rectangles]
+                               [--repeat 3] [--output wynik.json] [--compare poprzedni.json]
+
+Dokumenty generuje benchmarks.fixtures (text-heavy, table-heavy,
+image-heavy, large - 1000 stron). Każdy przypadek jest mierzony repeat razy;
+do JSON trafiają min/mediana/średnia oraz metadane (wersje Pythona i
+PyMuPDF, commit), a --compare zestawia mediany z wcześniejszym plikiem.
+Domyślnie wyniki trafiają do benchmarks/results/<data>.json.
+
+PDFNavigation.load_page wymaga Tk z ekranem; bez niego przypadki
+navigation są oznaczane jako pominięte, a mierzony jest sam render strony
+(page_cache.render_page), z którego korzysta load_page.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import fitz
+
+from benchmarks.fixtures import build_fixtures, DEFAULT_DIR
+from data_persistence import DataManager
+from extractors.pdf_table_extractor import PDFTableExtractor
+from extractors.pdf_text_extractor import PDFTextExtractor
+from page_cache import render_page
+from pdf_threading import fitz_lock
+from screenshot_manager import ScreenshotManager
+
+GROUPS = ['text', 'tables', 'navigation', 'screenshots', 'rectangles']
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Mediana wolniejsza o więcej niż 10% jest oznaczana w porównaniu
+REGRESSION_RATIO = 1.10
+
+
+@contextlib.contextmanager
+def quiet():
+    """Wycisza logi print() mierzonego kodu"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def measure(fn, repeat, setup=None):
+    """Statystyki czasu fn() z repeat pomiarów; setup() przed każdym, poza pomiarem"""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        with quiet():
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+    return {
+        'runs': repeat,
+        'min_s': min(times),
+        'median_s': statistics.median(times),
+        'mean_s': statistics.fmean(times),
+    }
+
+
+def result(benchmark, fixture, params, stats):
+    return {'benchmark': benchmark, 'fixture': fixture, 'params': params, **stats}
+
+
+def bench_extraction(extractor_cls, name, fixtures, tmp, repeat, workers):
+    results = []
+    for fixture, path in fixtures.items():
+        output_dir = os.path.join(tmp, f"{name}-{fixture}")
+        os.makedirs(output_dir, exist_ok=True)
+
+        def extract():
+            extractor = extractor_cls(path)
+            extractor.output_dir = output_dir
+            try:
+                extractor.extract_full_text(workers=workers)
+            finally:
+                extractor.close()
+
+        stats = measure(extract, repeat)
+        with fitz.open(path) as doc:
+            stats['pages'] = doc.page_count
+        results.append(result(f"{name}.extract_full_text", fixture, {'workers': workers}, stats))
+    return results
+
+
+def bench_text(fixtures, tmp, repeat, workers):
+    return bench_extraction(PDFTextExtractor, 'PDFTextExtractor', fixtures, tmp, repeat, workers)
+
+
+def bench_tables(fixtures, tmp, repeat, workers):
+    return bench_extraction(PDFTableExtractor, 'PDFTableExtractor', fixtures, tmp, repeat, workers)
+
+
+def bench_navigation(fixtures, tmp, repeat, zooms, page_num=1):
+    """load_page przy kilku zoomach: cache zimny (render) i ciepły (trafienie)"""
+    import tkinter as tk
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        return bench_render_page(fixtures, repeat, zooms, page_num, skipped=str(e))
+    root.withdraw()
+
+    from pdf_navigation import PDFNavigation
+
+    results = []
+    for fixture in ('text-heavy', 'image-heavy'):
+        if fixture not in fixtures:
+            continue
+        nav = PDFNavigation(root, fixtures[fixture], prefetch_pages=0)
+        canvas = tk.Canvas(root, width=1200, height=900)
+        nav.set_canvas(canvas)
+        for zoom in zooms:
+            nav.zoom_level = zoom
+            nav.current_page = page_num
+
+            def load():
+                nav.load_page(page_num)
+                root.update_idletasks()
+
+            cold = measure(load, repeat, setup=nav.render_cache.clear)
+            results.append(result('PDFNavigation.load_page', fixture, {'zoom': zoom, 'cache': 'cold'}, cold))
+            warm = measure(load, repeat, setup=load)
+            results.append(result('PDFNavigation.load_page', fixture, {'zoom': zoom, 'cache': 'warm'}, warm))
+        nav.close()
+        canvas.destroy()
+    root.destroy()
+    return results
+
+
+def bench_render_page(fixtures, repeat, zooms, page_num, skipped):
+    """Render strony bez Tk (ta sama skala co load_page: zoom * 2)"""
+    print(f"PDFNavigation.load_page skipped (no Tk display: {skipped}); measuring render_page")
+    results = []
+    for fixture in ('text-heavy', 'image-heavy'):
+        if fixture not in fixtures:
+            continue
+        doc = fitz.open(fixtures[fixture])
+        for zoom in zooms:
+            def render():
+                with fitz_lock:
+                    render_page(doc, page_num, zoom * 2)
+
+            results.append(result('page_cache.render_page', fixture, {'zoom': zoom}, measure(render, repeat)))
+        doc.close()
+    results.append({'benchmark': 'PDFNavigation.load_page', 'fixture': None, 'params': {},
+                    'skipped': skipped})
+    return results
+
+
+def bench_screenshots(fixtures, tmp, repeat, profiles=('default', 'ocr-300dpi-bitonal')):
+    """capture_screenshot i save_screenshot dla połowy strony (współrzędne canvas przy zoom 2)"""
+    results = []
+    for fixture in ('text-heavy', 'table-heavy', 'image-heavy'):
+        if fixture not in fixtures:
+            continue
+        with quiet():
+            manager = ScreenshotManager(os.path.join(tmp, f"shots-{fixture}"), fixtures[fixture])
+        doc = fitz.open(fixtures[fixture])
+        page = doc.load_page(0)
+        zoom = 2.0
+        rect = [0, 0, page.rect.width * zoom, page.rect.height * zoom / 2]
+        for profile in profiles:
+            images = []
+
+            def capture():
+                images.append(manager.capture_screenshot(page, rect, doc, zoom, profile))
+
+            params = {'profile': profile, 'region': 'half-page'}
+            results.append(result('ScreenshotManager.capture_screenshot', fixture, params,
+                                  measure(capture, repeat)))
+            image = images[-1]
+            save = lambda: manager.save_screenshot(image, 0, 1, profile)
+            results.append(result('ScreenshotManager.save_screenshot', fixture, params,
+                                  measure(save, repeat)))
+        doc.close()
+        manager.close()
+    return results
+
+
+def make_rect(rect_id):
+    page = rect_id % 50
+    return {
+        'id': rect_id,
+        'page': page,
+        'rect': [10.0, 20.0, 110.0, 220.0],
+        'description': f'Rectangle {rect_id}',
+        'keywords': ['bench'],
+        'image_path': f'screenshots/page{page + 1}_rect{rect_id}.jpg',
+    }
+
+
+def bench_rectangles(pdf_path, tmp, repeat, sizes, adds=50):
+    """DataManager.add_rectangle w projektach z sizes istniejącymi prostokątami"""
+    results = []
+    for size in sizes:
+        with quiet():
+            manager = DataManager(os.path.join(tmp, f"projects-{size}"))
+            manager.init_project(pdf_path, project_name='bench', use_cache=False)
+            manager.save_rectangle_data([
+                dict(make_rect(i), coord_space='pdf', dimensions={'width': 100.0, 'height': 200.0})
+                for i in range(1, size + 1)
+            ])
+        next_id = [size + 1]
+
+        def add_batch():
+            for _ in range(adds):
+                manager.add_rectangle(make_rect(next_id[0]))
+                next_id[0] += 1
+            manager.store.flush()
+
+        stats = measure(add_batch, repeat)
+        stats['per_add_s'] = stats['median_s'] / adds
+        results.append(result('DataManager.add_rectangle', 'text-heavy',
+                              {'rectangles': size, 'adds': adds}, stats))
+        with quiet():
+            manager.close()
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=os.path.dirname(RESULTS_DIR), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pymupdf': fitz.VersionBind,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def result_key(entry):
+    return (entry['benchmark'], entry['fixture'], json.dumps(entry['params'], sort_keys=True))
+
+
+def compare(previous_path, results):
+    """Tabela median: poprzedni plik kontra bieżące wyniki"""
+    with open(previous_path, encoding='utf-8') as f:
+        previous = json.load(f)
+    old = {result_key(entry): entry for entry in previous['results'] if 'median_s' in entry}
+    meta = previous.get('meta', {})
+    print(f"\nCompared with {previous_path} (commit {meta.get('commit')}, PyMuPDF {meta.get('pymupdf')})")
+    print(f"{'benchmark':<40} {'fixture':<12} {'params':<36} {'old ms':>10} {'new ms':>10} {'ratio':>7}")
+    for entry in results:
+        before = old.get(result_key(entry))
+        if before is None or 'median_s' not in entry:
+            continue
+        ratio = entry['median_s'] / before['median_s'] if before['median_s'] else float('inf')
+        flag = "  slower" if ratio > REGRESSION_RATIO else ""
+        print(f"{entry['benchmark']:<40} {entry['fixture'] or '':<12} {format_params(entry['params']):<36} "
+              f"{before['median_s'] * 1000:>10.2f} {entry['median_s'] * 1000:>10.2f} {ratio:>7.2f}{flag}")
+
+
+def format_params(params):
+    return " ".join(f"{key}={value}" for key, value in params.items())
+
+
+def run(groups=GROUPS, repeat=3, output=None, previous=None, fixture_dir=DEFAULT_DIR,
+        large_pages=1000, workers=1, zooms=(0.5, 1.0, 2.0, 4.0), sizes=(100, 1000, 10000)):
+    fixtures = build_fixtures(fixture_dir, large_pages=large_pages)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for group in groups:
+            print(f"Running {group} benchmarks...")
+            if group == 'text':
+                results += bench_text(fixtures, tmp, repeat, workers)
+            elif group == 'tables':
+                results += bench_tables(fixtures, tmp, repeat, workers)
+            elif group == 'navigation':
+                results += bench_navigation(fixtures, tmp, repeat, zooms)
+            elif group == 'screenshots':
+                results += bench_screenshots(fixtures, tmp, repeat)
+            elif group == 'rectangles':
+                results += bench_rectangles(fixtures['text-heavy'], tmp, repeat, sizes)
+
+    print(f"\n{'benchmark':<40} {'fixture':<12} {'params':<36} {'median ms':>10} {'min ms':>10}")
+    for entry in results:
+        if 'skipped' in entry:
+            print(f"{entry['benchmark']:<40} skipped: {entry['skipped']}")
+            continue
+        print(f"{entry['benchmark']:<40} {entry['fixture'] or '':<12} {format_params(entry['params']):<36} "
+              f"{entry['median_s'] * 1000:>10.2f} {entry['min_s'] * 1000:>10.2f}")
+
+    report = {'meta': environment(), 'results': results}
+    report['meta']['settings'] = {'repeat': repeat, 'workers': workers, 'large_pages': large_pages}
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if previous:
+        compare(previous, results)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=GROUPS, help="benchmark groups to run")
+    parser.add_argument("--repeat", type=int, default=3, help="measurements per case")
+    parser.add_argument("--output", help="results JSON (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results JSON to compare medians with")
+    parser.add_argument("--fixtures", default=DEFAULT_DIR, help="directory of generated fixture PDFs")
+    parser.add_argument("--large-pages", type=int, default=1000, help="pages of the large fixture")
+    parser.add_argument("--workers", type=int, default=1, help="extraction processes (1 = serial)")
+    parser.add_argument("--zooms", type=float, nargs="+", default=[0.5, 1.0, 2.0, 4.0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="existing rectangles per project for add_rectangle")
+    args = parser.parse_args(argv)
+    run(args.only, args.repeat, args.output, args.compare, args.fixtures, args.large_pages,
+        args.workers, args.zooms, args.sizes)
+
+
+if __name__ == "__main__":
+    main()
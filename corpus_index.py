@@ -0,0 +1,315 @@
+"""Indeks pełnotekstowy wszystkich projektów w katalogu projektów (SQLite FTS5).
+
+Indeksowany jest tekst stron (pdf_content.*) oraz extracted_text,
+description i keywords prostokątów. Każdy projekt ma zapisany podpis plików
+(mtime + rozmiar), więc update() przetwarza tylko projekty zmienione od
+ostatniego przebiegu, a usunięte katalogi usuwa z indeksu. Strony i
+prostokąty są rankingowane bm25 osobno w swoich tabelach, a przed
+scaleniem wynik jest normalizowany w obrębie tabeli (patrz search).
+
+Wiersze FTS mają rowid równy id w zwykłych tabelach pages/rects, co pozwala
+usunąć projekt po indeksie project_id bez skanowania tabel FTS.
+"""
+import json
+import os
+import sqlite3
+import time
+
+from data_persistence import DataManager
+from extractors.content_formats import find_content, open_content
+from rectangle_store import RectangleStore
+
+DB_FILE = '.corpus_index.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    pdf_path TEXT,
+    content_sig TEXT,
+    rect_sig TEXT,
+    indexed_at REAL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL,
+    page INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_project ON pages(project_id);
+CREATE TABLE IF NOT EXISTS rects (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL,
+    rect_id INTEGER NOT NULL,
+    page INTEGER NOT NULL,
+    bbox TEXT
+);
+CREATE INDEX IF NOT EXISTS rects_project ON rects(project_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS page_text USING fts5(
+    text, tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS rect_text USING fts5(
+    extracted_text, description, keywords, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+def _stat(path):
+    """(mtime_ns, rozmiar) pliku albo sumaryczny dla katalogu (format columnar)"""
+    try:
+        if os.path.isdir(path):
+            stats = [os.stat(os.path.join(root, name))
+                     for root, _, files in os.walk(path) for name in files]
+            return [max((st.st_mtime_ns for st in stats), default=0), sum(st.st_size for st in stats)]
+        st = os.stat(path)
+        return [st.st_mtime_ns, st.st_size]
+    except FileNotFoundError:
+        return None
+
+
+def content_signature(project_path):
+    found = find_content(project_path)
+    return json.dumps([found[0], _stat(found[1])]) if found else None
+
+
+def rect_signature(project_path):
+    data_file = os.path.join(project_path, 'rectangle_map.json')
+    return json.dumps([_stat(data_file), _stat(os.path.splitext(data_file)[0] + '.journal')])
+
+
+def page_text(page):
+    """Tekst strony w schemacie pdf_content (linie rozdzielone znakiem nowej linii)"""
+    lines = []
+    for block in page['content']:
+        if block['type'] != 'text':
+            continue
+        for line in block['lines']:
+            lines.append(' '.join(span['text'] for span in line['spans']))
+    return '\n'.join(lines)
+
+
+def fts_query(text, prefix=False):
+    """Zapytanie użytkownika jako bezpieczne wyrażenie FTS5.
+
+    Każde słowo (także z myślnikami, np. numer części) jest frazą w
+    cudzysłowie, ostatnie może być prefiksem; składnia FTS5 nie jest
+    interpretowana. Krótki prefiks pasuje do tysięcy terminów i wymaga
+    oceny wszystkich trafień, dlatego domyślnie dopasowanie jest dokładne.
+    """
+    words = text.split()
+    if not words:
+        return None
+    terms = ['"' + word.replace('"', '""') + '"' for word in words]
+    if prefix:
+        terms[-1] += ' *'
+    return ' '.join(terms)
+
+
+class CorpusIndex:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def for_project_dir(cls, project_dir="pdf_projects"):
+        return cls(os.path.join(project_dir, DB_FILE))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- indeksowanie ---
+
+    def update(self, project_dir, force=False):
+        """Indeksuje zmienione projekty z project_dir i usuwa zniknięte.
+
+        Zwraca słownik z liczbą projektów: indexed, unchanged, removed, skipped
+        (niekompletne - ekstrakcja jeszcze trwa) i failed.
+        """
+        stats = {'indexed': 0, 'unchanged': 0, 'removed': 0, 'skipped': 0, 'failed': 0}
+        seen = set()
+        for name in sorted(os.listdir(project_dir)):
+            project_path = os.path.abspath(os.path.join(project_dir, name))
+            if name.startswith('.') or not os.path.isdir(project_path):
+                continue
+            seen.add(project_path)
+            if not DataManager.is_project_complete(project_path):
+                stats['skipped'] += 1
+                continue
+            try:
+                changed = self.index_project(project_path, force)
+            except Exception as e:
+                print(f"Cannot index {project_path}: {e}")
+                stats['failed'] += 1
+                continue
+            stats['indexed' if changed else 'unchanged'] += 1
+
+        root = os.path.abspath(project_dir) + os.sep
+        for row in self.conn.execute("SELECT path FROM projects").fetchall():
+            if row['path'].startswith(root) and row['path'] not in seen:
+                self.remove_project(row['path'])
+                stats['removed'] += 1
+        return stats
+
+    def index_project(self, project_path, force=False):
+        """(Re)indeksuje jeden projekt, jeśli zmienił się od ostatniego razu"""
+        project_path = os.path.abspath(project_path)
+        row = self.conn.execute("SELECT * FROM projects WHERE path = ?", (project_path,)).fetchone()
+        content_sig = content_signature(project_path)
+        rect_sig = rect_signature(project_path)
+        reindex_pages = force or row is None or row['content_sig'] != content_sig
+        reindex_rects = force or row is None or row['rect_sig'] != rect_sig
+        if not reindex_pages and not reindex_rects:
+            return False
+
+        store = RectangleStore(os.path.join(project_path, 'rectangle_map.json'), read_only=True)
+        rectangles = store.all()
+
+        with self.conn:
+            if row is None:
+                project_id = self.conn.execute(
+                    "INSERT INTO projects (path, name) VALUES (?, ?)",
+                    (project_path, os.path.basename(project_path))
+                ).lastrowid
+            else:
+                project_id = row['id']
+
+            if reindex_pages:
+                self._delete_rows('pages', 'page_text', project_id)
+                if content_sig is not None:
+                    reader = open_content(project_path)
+                    try:
+                        for page in reader.iter_pages():
+                            page_id = self.conn.execute(
+                                "INSERT INTO pages (project_id, page) VALUES (?, ?)",
+                                (project_id, page['page'] - 1)
+                            ).lastrowid
+                            self.conn.execute("INSERT INTO page_text (rowid, text) VALUES (?, ?)",
+                                              (page_id, page_text(page)))
+                    finally:
+                        reader.close()
+
+            if reindex_rects:
+                self._delete_rows('rects', 'rect_text', project_id)
+                for rect in rectangles:
+                    rect_row = self.conn.execute(
+                        "INSERT INTO rects (project_id, rect_id, page, bbox) VALUES (?, ?, ?, ?)",
+                        (project_id, rect['id'], rect['page'], json.dumps(rect['rect']))
+                    ).lastrowid
+                    self.conn.execute(
+                        "INSERT INTO rect_text (rowid, extracted_text, description, keywords) VALUES (?, ?, ?, ?)",
+                        (rect_row, rect.get('extracted_text') or '', rect.get('description') or '',
+                         ' '.join(rect.get('keywords') or []))
+                    )
+
+            self.conn.execute(
+                "UPDATE projects SET pdf_path = ?, content_sig = ?, rect_sig = ?, indexed_at = ? WHERE id = ?",
+                (store.pdf_path, content_sig, rect_sig, time.time(), project_id)
+            )
+        return True
+
+    def _delete_rows(self, table, fts_table, project_id):
+        self.conn.execute(
+            f"DELETE FROM {fts_table} WHERE rowid IN (SELECT id FROM {table} WHERE project_id = ?)",
+            (project_id,)
+        )
+        self.conn.execute(f"DELETE FROM {table} WHERE project_id = ?", (project_id,))
+
+    def remove_project(self, project_path):
+        project_path = os.path.abspath(project_path)
+        row = self.conn.execute("SELECT id FROM projects WHERE path = ?", (project_path,)).fetchone()
+        if row is None:
+            return False
+        with self.conn:
+            self._delete_rows('pages', 'page_text', row['id'])
+            self._delete_rows('rects', 'rect_text', row['id'])
+            self.conn.execute("DELETE FROM projects WHERE id = ?", (row['id'],))
+        return True
+
+    # --- wyszukiwanie ---
+
+    def search(self, query, limit=20, prefix=False, raw=False):
+        """Najlepiej pasujące strony i prostokąty wszystkich projektów.
+
+        Wszystkie słowa zapytania muszą wystąpić (AND); prefix=True dopasowuje
+        ostatnie słowo jako prefiks. raw=True przekazuje zapytanie do FTS5 bez
+        zmian (AND/OR/NEAR, kolumny). Filtr kolumny istniejącej tylko w jednej
+        tabeli (text - strony; extracted_text, description, keywords -
+        prostokąty) przeszukuje tylko tę tabelę; niepoprawne zapytanie daje
+        ValueError.
+
+        bm25 z page_text i rect_text nie są porównywalne (inne statystyki IDF
+        i długości), więc o kolejności decyduje relevance = score / najlepszy
+        score w tej samej tabeli: 1.0 dla najlepszej strony i najlepszego
+        prostokąta, mniej dla słabszych trafień.
+        Zwraca listę słowników: kind ('page'/'rect'), project, name, pdf_path,
+        page (od 0), rect_id i bbox (dla prostokątów), snippet, score
+        (bm25 w swojej tabeli - mniejszy znaczy lepiej) i relevance.
+        """
+        match = query if raw else fts_query(query, prefix)
+        if not match:
+            return []
+
+        pages_sql = """
+            SELECT 'page' AS kind, p.path AS project, p.name, p.pdf_path, pg.page,
+                   NULL AS rect_id, NULL AS bbox,
+                   snippet(page_text, 0, '[', ']', '...', 12) AS snippet,
+                   bm25(page_text) AS score
+            FROM page_text
+            JOIN pages pg ON pg.id = page_text.rowid
+            JOIN projects p ON p.id = pg.project_id
+            WHERE page_text MATCH ?
+            ORDER BY score LIMIT ?
+            """
+        # Opis i słowa kluczowe nadaje człowiek - ważą więcej niż tekst regionu
+        rects_sql = """
+            SELECT 'rect' AS kind, p.path AS project, p.name, p.pdf_path, r.page,
+                   r.rect_id, r.bbox,
+                   snippet(rect_text, -1, '[', ']', '...', 12) AS snippet,
+                   bm25(rect_text, 1.0, 2.0, 2.0) AS score
+            FROM rect_text
+            JOIN rects r ON r.id = rect_text.rowid
+            JOIN projects p ON p.id = r.project_id
+            WHERE rect_text MATCH ?
+            ORDER BY score LIMIT ?
+            """
+
+        results = []
+        errors = []
+        for sql in (pages_sql, rects_sql):
+            try:
+                rows = self.conn.execute(sql, (match, limit)).fetchall()
+            except sqlite3.OperationalError as e:
+                if not raw:
+                    raise
+                errors.append(str(e))  # np. kolumna z drugiej tabeli
+                continue
+            # bm25 jest ujemny; najlepszy wiersz tabeli jest pierwszy
+            best = rows[0]['score'] if rows else 0.0
+            for row in rows:
+                hit = dict(row)
+                hit['relevance'] = hit['score'] / best if best else 1.0
+                if hit['bbox'] is not None:
+                    hit['bbox'] = json.loads(hit['bbox'])
+                results.append(hit)
+        if len(errors) == 2:
+            raise ValueError(f"Invalid FTS5 query {query!r}: {'; '.join(dict.fromkeys(errors))}")
+
+        results.sort(key=lambda hit: -hit['relevance'])
+        return results[:limit]
+
+    def stats(self):
+        return {
+            'projects': self.conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0],
+            'pages': self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0],
+            'rects': self.conn.execute("SELECT COUNT(*) FROM rects").fetchone()[0],
+        }
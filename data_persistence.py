@@ -1,20 +1,49 @@
-import json
 import os
+import shutil
 from datetime import datetime
 from extractors.pdf_text_extractor import PDFTextExtractor
 from extractors.pdf_table_extractor import PDFTableExtractor
 from extractors.pdf_rectangle_extractor import PDFRectangleExtractor
+from extractors.content_formats import find_content, content_files, content_path, remove_content, open_content
+from extractors.table_export import export_tables
+from background_extraction import BackgroundExtraction
+from search_index import SearchIndex, INDEX_FILE
+from thumbnail_pack import ThumbnailPack
+from extraction_cache import ExtractionCache, file_sha256
+from rectangle_store import RectangleStore
 
 class DataManager:
-    def __init__(self, project_dir="pdf_projects"):
+    def __init__(self, project_dir="pdf_projects", cache_dir=None, cache_bytes=2 * 1024 * 1024 * 1024):
+        """cache_dir: cache wyników ekstrakcji (domyślnie <project_dir>/.cache)"""
         print(f"Initializing DataManager with project_dir: {project_dir}")  # Debug log
         self.project_dir = project_dir
         self.current_project = None
+        self.store = None
+        self.extraction_submit = None
+        self.background = None
+        self.search_index = None
         os.makedirs(project_dir, exist_ok=True)
+        self.cache = ExtractionCache(cache_dir or os.path.join(project_dir, '.cache'), cache_bytes)
         
-    def init_project(self, pdf_path):
-        pdf_name = os.path.basename(pdf_path)
-        project_name = f"{os.path.splitext(pdf_name)[0]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    def init_project(self, pdf_path, project_name=None, workers=None, output_format='json', use_cache=True,
+                     background=False):
+        """Create project directory and run full-text extraction for a PDF.
+
+        project_name: stała nazwa katalogu projektu (np. w trybie wsadowym);
+        domyślnie nazwa pliku z timestampem.
+        workers: procesy dla ekstrakcji stron (None - automatycznie dla dużych plików)
+        output_format: format pdf_content ('json', 'jsonl', 'columnar')
+        use_cache: identyczny plik (SHA-256) przetworzony wcześniej nie jest
+        ekstrahowany ponownie - wynik jest podłączany z cache
+        background: zwraca od razu, a pełny tekst jest ekstrahowany w tle
+        (postęp: extraction_progress, dane strony: wait_for_page); projekt
+        jest kompletny, gdy pdf_content.* pojawi się w katalogu
+        """
+        self.close()
+        
+        if project_name is None:
+            pdf_name = os.path.basename(pdf_path)
+            project_name = f"{os.path.splitext(pdf_name)[0]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         project_path = os.path.join(self.project_dir, project_name)
         
         self.current_project = {
@@ -31,60 +60,160 @@ class DataManager:
         os.makedirs(self.current_project['screenshots_dir'], exist_ok=True)
         os.makedirs(self.current_project['thumbnails_dir'], exist_ok=True)
         
-        # Tu dodajemy ekstrakcję
-        extractor = PDFTextExtractor(pdf_path)
-        extractor.output_dir = project_path
-        extractor.extract_full_text()
+        # Indeks wyszukiwania jest budowany od nowa razem z pdf_content.*
+        index_path = os.path.join(project_path, INDEX_FILE)
+        if os.path.exists(index_path):
+            os.remove(index_path)
+        
+        digest = file_sha256(pdf_path)
+        self.current_project['pdf_sha256'] = digest
+        kind = f"content-{output_format}"
+        entry = self.cache.lookup(digest, kind) if use_cache else None
+        if entry:
+            remove_content(project_path, output_format)
+            if self.cache.materialize(entry, project_path) is None:
+                entry = None  # wpis usunięty przez inny proces - ekstrakcja od nowa
+        self.current_project['from_cache'] = entry is not None
         
+        if entry:
+            print(f"Extraction cache hit for {pdf_path}")  # Debug log
+            self.current_project['page_count'] = entry['page_count']
+            self.current_project['content_path'] = content_path(project_path, output_format)
+        elif background:
+            remove_content(project_path, output_format)
+            self.background = BackgroundExtraction(
+                pdf_path, project_path, output_format,
+                on_complete=lambda job: self._background_done(job, digest, kind, use_cache)
+            )
+            self.current_project['page_count'] = self.background.page_count
+            # Indeks rośnie razem z ekstrakcją (wywołania z wątku ekstrakcji)
+            self.search_index = SearchIndex(self.background.page_count)
+            self.background.on_page = self.search_index.add_page
+            self.current_project['content_path'] = None
+            self.background.start()
+        else:
+            # Tu dodajemy ekstrakcję
+            remove_content(project_path, output_format)
+            extractor = PDFTextExtractor(pdf_path)
+            try:
+                extractor.output_dir = project_path
+                path = extractor.extract_full_text(workers=workers, output_format=output_format)
+                self.current_project['page_count'] = extractor.doc.page_count
+                self.current_project['content_path'] = path
+            finally:
+                extractor.close()
+            if use_cache:
+                self.cache.put(digest, kind, project_path, content_files(output_format),
+                               {'page_count': self.current_project['page_count']})
+        
+        if self.search_index is None:
+            self.search_index = SearchIndex.for_project(project_path, self.current_project['page_count'])
+        
+        # rectangle_map.json zapisujemy na końcu - jego obecność oznacza kompletny projekt
+        self.store = RectangleStore(self.current_project['data_file'], pdf_path)
         self.save_rectangle_data([])
         
         return self.current_project
 
+    def _background_done(self, job, digest, kind, use_cache):
+        """Wywoływane w wątku ekstrakcji po zapisaniu kompletnego pdf_content.*"""
+        project = self.current_project
+        if project is None or project['path'] != job.output_dir:
+            return
+        project['content_path'] = job.content_path
+        if self.search_index is not None:
+            self.search_index.save(os.path.join(job.output_dir, INDEX_FILE))
+        if use_cache:
+            self.cache.put(digest, kind, job.output_dir, content_files(job.output_format),
+                           {'page_count': job.page_count})
+
+    def prioritize_page(self, page_num):
+        """Ekstrakcja w tle zajmie się najpierw oglądaną stroną"""
+        if self.background:
+            self.background.prioritize(page_num)
+
+    def extraction_progress(self):
+        """(gotowe strony, wszystkie strony, zakończona) pełnej ekstrakcji tekstu"""
+        if not self.current_project:
+            raise ValueError("No project initialized")
+        if self.background is None:
+            total = self.current_project['page_count']
+            return total, total, True
+        done, total = self.background.progress()
+        return done, total, self.background.finished.is_set()
+
+    def wait_for_page(self, page_num, timeout=None):
+        """Wyekstrahowana struktura strony; czeka, jeśli ekstrakcja w tle
+        jeszcze jej nie objęła (None po przekroczeniu timeout)"""
+        if not self.current_project:
+            raise ValueError("No project initialized")
+        if self.background and not self.background.finished.is_set():
+            page = self.background.wait_page(page_num, timeout)
+            if page is not None or not self.background.finished.is_set():
+                return page
+        if self.background and self.background.error is not None:
+            raise RuntimeError(f"Background extraction failed: {self.background.error}")
+        reader = open_content(self.current_project['path'])
+        try:
+            return reader.load_page(page_num)
+        finally:
+            reader.close()
+
+    def export_tables(self, fmt='csv', workers=None, use_cache=True):
+        """Write detected tables of the current PDF to <project>/tables (one file per table + index)"""
+        if not self.current_project:
+            raise ValueError("No project initialized")
+        project_path = self.current_project['path']
+        tables_dir = os.path.join(project_path, 'tables')
+        # Pliki mogą być hard linkami do cache - usuwamy zamiast nadpisywać
+        shutil.rmtree(tables_dir, ignore_errors=True)
+        
+        digest = self.current_project['pdf_sha256']
+        kind = f"tables-{fmt}"
+        entry = self.cache.lookup(digest, kind) if use_cache else None
+        if entry and self.cache.materialize(entry, project_path) is not None:
+            return os.path.join(tables_dir, 'tables_index.json')
+        
+        index_path = export_tables(self.current_project['pdf_path'], tables_dir, fmt, workers)
+        if use_cache:
+            self.cache.put(digest, kind, project_path, ['tables'])
+        return index_path
+
+    @staticmethod
+    def is_project_complete(project_path):
+        """Check whether init_project finished for the given project directory"""
+        return (find_content(project_path) is not None and
+                os.path.exists(os.path.join(project_path, 'rectangle_map.json')))
+
     def save_rectangle_data(self, rectangles):
-        """Save rectangle data to JSON file"""
+        """Replace all rectangles (writes a full rectangle_map.json snapshot)"""
         if not self.current_project:
             raise ValueError("No project initialized")
             
-        data = {
-            'pdf_path': self.current_project['pdf_path'],
-            'rectangles': rectangles
-        }
-        
-        print(f"Saving rectangle data to {self.current_project['data_file']}")  # Debug log
-        print(f"Data to save: {data}")  # Debug log
+        print(f"Saving {len(rectangles)} rectangles to {self.current_project['data_file']}")  # Debug log
         
         try:
-            with open(self.current_project['data_file'], 'w') as f:
-                json.dump(data, f, indent=2)
+            self.store.replace_all(rectangles)
             print("Successfully saved rectangle data")  # Debug log
         except Exception as e:
             print(f"Error saving rectangle data: {e}")  # Error log
             raise
 
     def load_rectangle_data(self):
-        """Load rectangle data from JSON file"""
+        """Return all rectangles of the current project"""
         if not self.current_project:
             raise ValueError("No project initialized")
             
-        try:
-            with open(self.current_project['data_file'], 'r') as f:
-                data = json.load(f)
-                print(f"Loaded rectangle data: {data}")  # Debug log
-                return data['rectangles']
-        except FileNotFoundError:
-            print("No existing rectangle data found")  # Debug log
-            return []
-        except Exception as e:
-            print(f"Error loading rectangle data: {e}")  # Error log
-            return []
+        return self.store.all()
 
     def add_rectangle(self, rect_info):
         """Add new rectangle data"""
-        print(f"Adding new rectangle: {rect_info}")  # Debug log
+        print(f"Adding new rectangle {rect_info['id']} on page {rect_info['page']}")  # Debug log
         rectangle_data = {
             'id': rect_info['id'],
             'page': rect_info['page'],
             'rect': rect_info['rect'],
+            'coord_space': rect_info.get('coord_space', 'pdf'),
             'dimensions': {
                 'width': rect_info['rect'][2] - rect_info['rect'][0],
                 'height': rect_info['rect'][3] - rect_info['rect'][1]
@@ -96,29 +225,67 @@ class DataManager:
             'timestamp': datetime.now().isoformat()
         }
         
-        rectangles = self.load_rectangle_data()
-        rectangles.append(rectangle_data)
-        self.save_rectangle_data(rectangles)
-        return rectangle_data
+        rect = self.store.add(rectangle_data)
+        if self.extraction_submit:
+            self.extraction_submit(rect)
+        return rect
+
+    def set_extraction_queue(self, submit):
+        """Register a callable that enqueues new rectangles for text extraction"""
+        self.extraction_submit = submit
+
+    @property
+    def rectangles(self):
+        """In-memory rectangle model of the current project (source of truth)"""
+        return self.store.model
+
+    def get_rectangle(self, rect_id):
+        """Return rectangle data by ID (None if missing)"""
+        return self.store.get(rect_id)
+
+    def rectangles_on_page(self, page):
+        return self.store.on_page(page)
+
+    def rectangles_at(self, page, x, y):
+        """Rectangles on the page containing the point"""
+        return self.store.hit_test(page, x, y)
+
+    def overlapping_rectangles(self, page, bbox):
+        return self.store.overlapping(page, bbox)
+
+    def next_rectangle_id(self):
+        return self.store.next_id()
+
+    def update_rectangle(self, rect_id, fields):
+        """Update fields of an existing rectangle; returns None if it no longer exists"""
+        return self.store.update(rect_id, fields)
 
     def delete_rectangle(self, rect_id, page):
         """Delete rectangle data by ID and page"""
         print(f"Deleting rectangle with ID {rect_id} on page {page}")
         
-        # Load current data
-        rectangles = self.load_rectangle_data()
-        print(f"Current rectangles count: {len(rectangles)}")
-        
-        # Filter out the rectangle to delete
-        new_rectangles = [r for r in rectangles if not (r['id'] == rect_id and r['page'] == page)]
-        print(f"Rectangles count after deletion: {len(new_rectangles)}")
-        
-        # Save updated data
-        self.save_rectangle_data(new_rectangles)
-        print("Rectangle data updated")
+        rect = self.store.get(rect_id)
+        if rect is None or rect['page'] != page:
+            print("Rectangle not found")
+            return None
+        return self.store.delete(rect_id)
     
-    def export_project(self, export_path):
-        """Export entire project to a specified location"""
+    def close(self):
+        """Stop background extraction and flush pending rectangle writes of the current project"""
+        if self.background:
+            self.background.stop()
+            self.background = None
+        self.search_index = None
+        if self.store:
+            self.store.close()
+            self.store = None
+
+    def export_project(self, export_path, pack_thumbnails=True):
+        """Export entire project to a specified location
+
+        pack_thumbnails: miniatury jako jeden thumbnails.pack (także te zapisane
+        jeszcze jako osobne pliki *_thumb.jpg); False - kopia katalogu miniatur
+        """
         if not self.current_project:
             raise ValueError("No project to export")
             
@@ -129,11 +296,10 @@ class DataManager:
         os.makedirs(export_dir, exist_ok=True)
         
         # Copy PDF file
-        import shutil
         shutil.copy2(self.current_project['pdf_path'], export_dir)
         
-        # Copy JSON data
-        shutil.copy2(self.current_project['data_file'], export_dir)
+        # Export JSON data (snapshot + dziennik w jednym pliku)
+        self.store.export_json(os.path.join(export_dir, 'rectangle_map.json'))
         
         # Copy screenshots
         screenshots_export_dir = os.path.join(export_dir, 'screenshots')
@@ -143,11 +309,21 @@ class DataManager:
         thumbnails_source_dir = os.path.join(os.path.dirname(self.current_project['data_file']), 'screenshots', 'thumbnails')
         thumbnails_export_dir = os.path.join(screenshots_export_dir, 'thumbnails')
         
-        # Kopiowanie całego katalogu z miniaturkami
-        if os.path.exists(thumbnails_source_dir):
+        rectangles = self.load_rectangle_data()
+        
+        if pack_thumbnails:
+            pack = ThumbnailPack(thumbnails_source_dir)
+            legacy = []
+            for rect in rectangles:
+                path = rect.get('thumbnail_path')
+                if rect['id'] not in pack and path and os.path.exists(path):
+                    with open(path, 'rb') as f:
+                        legacy.append((rect['id'], f.read()))
+            pack.export(thumbnails_export_dir, legacy)
+        elif os.path.exists(thumbnails_source_dir):
+            # Kopiowanie całego katalogu z miniaturkami
             shutil.copytree(thumbnails_source_dir, thumbnails_export_dir)
         
-        rectangles = self.load_rectangle_data()
         for rect in rectangles:
             if rect.get('image_path') and os.path.exists(rect['image_path']):
                 shutil.copy2(rect['image_path'], screenshots_export_dir)
@@ -0,0 +1,24 @@
+import sys
+
+# Polecenia bez GUI - importowane leniwie, żeby nie wymagać Tk na serwerze
+COMMANDS = {
+    "batch": "docparser.batch",
+    "reextract": "docparser.reextract",
+    "migrate": "docparser.migrate",
+    "index": "docparser.index",
+    "search": "docparser.search",
+}
+
+
+def run(argv):
+    if argv and argv[0] in COMMANDS:
+        import importlib
+        module = importlib.import_module(COMMANDS[argv[0]])
+        return module.main(argv[1:])
+
+    from docparser.main import main
+    main()
+    return 0
+
+
+sys.exit(run(sys.argv[1:]))
@@ -0,0 +1,171 @@
+import argparse
+import glob
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from data_persistence import DataManager
+from extractors.content_formats import OUTPUT_FORMATS
+
+
+def iter_pdf_paths(target):
+    """Yield PDF paths from a directory (recursively) or a glob pattern"""
+    if os.path.isdir(target):
+        for dirpath, dirnames, filenames in os.walk(target):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.lower().endswith('.pdf'):
+                    yield os.path.join(dirpath, filename)
+    else:
+        for path in glob.iglob(target, recursive=True):
+            if os.path.isfile(path):
+                yield path
+
+
+def project_name_for(pdf_path):
+    """Stable project name, so repeated runs land in the same directory"""
+    stem = os.path.splitext(os.path.basename(pdf_path))[0]
+    digest = hashlib.sha1(os.path.abspath(pdf_path).encode('utf-8')).hexdigest()[:8]
+    return f"{stem}_{digest}"
+
+
+def process_document(pdf_path, project_dir, output_format='json', use_cache=True):
+    """Worker: init one project exactly like the GUI does (one fitz document per call)"""
+    start = time.perf_counter()
+    data_manager = DataManager(project_dir)
+    # Równoległość jest już na poziomie dokumentów - strony ekstrahujemy szeregowo
+    project = data_manager.init_project(
+        pdf_path, project_name=project_name_for(pdf_path), workers=1,
+        output_format=output_format, use_cache=use_cache
+    )
+    return {
+        'pdf_path': pdf_path,
+        'project_path': project['path'],
+        'pages': project.get('page_count', 0),
+        'cached': project.get('from_cache', False),
+        'seconds': time.perf_counter() - start
+    }
+
+
+class BatchRunner:
+    def __init__(self, project_dir="pdf_projects", workers=None, max_in_flight=None,
+                 resume=True, max_tasks_per_child=None, output_format='json', use_cache=True,
+                 out=sys.stdout):
+        self.project_dir = project_dir
+        self.workers = workers or os.cpu_count() or 1
+        # Ograniczona liczba zadań w locie - pamięć nie rośnie z liczbą plików
+        self.max_in_flight = max_in_flight or self.workers * 2
+        self.resume = resume
+        self.max_tasks_per_child = max_tasks_per_child
+        self.output_format = output_format
+        self.use_cache = use_cache
+        self.out = out
+
+        self.processed = 0
+        self.skipped = 0
+        self.failures = []
+        self.total_pages = 0
+
+    def log(self, message):
+        print(message, file=self.out, flush=True)
+
+    def is_done(self, pdf_path):
+        project_path = os.path.join(self.project_dir, project_name_for(pdf_path))
+        return DataManager.is_project_complete(project_path)
+
+    def run(self, pdf_paths):
+        """Process all PDFs, returns number of failed documents"""
+        os.makedirs(self.project_dir, exist_ok=True)
+        start = time.perf_counter()
+        in_flight = {}
+
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 max_tasks_per_child=self.max_tasks_per_child) as executor:
+            for pdf_path in pdf_paths:
+                if self.resume and self.is_done(pdf_path):
+                    self.skipped += 1
+                    self.log(f"SKIP  {pdf_path} (already complete)")
+                    continue
+
+                if len(in_flight) >= self.max_in_flight:
+                    self._collect(in_flight, FIRST_COMPLETED)
+
+                future = executor.submit(process_document, pdf_path, self.project_dir,
+                                         self.output_format, self.use_cache)
+                in_flight[future] = pdf_path
+
+            while in_flight:
+                self._collect(in_flight, FIRST_COMPLETED)
+
+        elapsed = time.perf_counter() - start
+        pages_per_sec = self.total_pages / elapsed if elapsed > 0 else 0.0
+        self.log(
+            f"Done: {self.processed} processed, {self.skipped} skipped, "
+            f"{len(self.failures)} failed, {self.total_pages} pages in {elapsed:.1f}s "
+            f"({pages_per_sec:.1f} pages/s)"
+        )
+        for pdf_path, error in self.failures:
+            self.log(f"  failed: {pdf_path}: {error}")
+        return len(self.failures)
+
+    def _collect(self, in_flight, return_when):
+        done, _ = wait(in_flight, return_when=return_when)
+        for future in done:
+            pdf_path = in_flight.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                self.failures.append((pdf_path, str(e)))
+                self.log(f"FAIL  {pdf_path}: {e}")
+                continue
+
+            self.processed += 1
+            self.total_pages += result['pages']
+            rate = result['pages'] / result['seconds'] if result['seconds'] > 0 else 0.0
+            self.log(
+                f"OK    {pdf_path}: {result['pages']} pages in {result['seconds']:.2f}s "
+                f"({rate:.1f} pages/s) -> {result['project_path']}"
+                + (" (cached)" if result.get('cached') else "")
+            )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="docparser batch",
+        description="Extract a whole PDF corpus into project directories without the GUI"
+    )
+    parser.add_argument("target", help="directory (searched recursively) or glob pattern of PDF files")
+    parser.add_argument("--project-dir", default="pdf_projects", help="where project directories are written")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="documents queued at once (default: 2 x workers)")
+    parser.add_argument("--max-tasks-per-child", type=int, default=50,
+                        help="recycle worker processes after this many documents")
+    parser.add_argument("--format", dest="output_format", default="json", choices=OUTPUT_FORMATS,
+                        help="pdf_content output format")
+    parser.add_argument("--no-resume", dest="resume", action="store_false",
+                        help="reprocess documents whose project is already complete")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                        help="always extract, ignoring results cached for identical PDFs")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    runner = BatchRunner(
+        project_dir=args.project_dir,
+        workers=args.workers,
+        max_in_flight=args.max_in_flight,
+        resume=args.resume,
+        max_tasks_per_child=args.max_tasks_per_child,
+        output_format=args.output_format,
+        use_cache=args.use_cache
+    )
+    failed = runner.run(iter_pdf_paths(args.target))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
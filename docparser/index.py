@@ -0,0 +1,33 @@
+import argparse
+import sys
+
+from corpus_index import CorpusIndex
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="docparser index",
+        description="Update the full-text index of all projects (only changed projects are re-indexed)",
+    )
+    parser.add_argument("--project-dir", default="pdf_projects", help="directory holding the projects")
+    parser.add_argument("--db", default=None, help="index database (default: <project-dir>/.corpus_index.sqlite)")
+    parser.add_argument("--force", action="store_true", help="re-index every project")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    index = CorpusIndex(args.db) if args.db else CorpusIndex.for_project_dir(args.project_dir)
+    with index:
+        stats = index.update(args.project_dir, force=args.force)
+        totals = index.stats()
+    print(
+        f"{stats['indexed']} indexed, {stats['unchanged']} unchanged, {stats['removed']} removed, "
+        f"{stats['skipped']} incomplete, {stats['failed']} failed "
+        f"({totals['projects']} projects, {totals['pages']} pages, {totals['rects']} rectangles)"
+    )
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -79,19 +79,31 @@ class PDFApp:
     def initialize_with_pdf(self, pdf_path):
         """Initialize application with a PDF file"""
         try:
-            # Initialize project
-            project = self.data_manager.init_project(pdf_path)
-            
-            # Stop existing processor if any
+            # Stop existing processor if any - przed zamknięciem magazynu prostokątów
             if self.rectangle_processor:
+                self.data_manager.set_extraction_queue(None)
                 self.rectangle_processor.stop()
+                self.rectangle_processor.poll_status()
+                self.rectangle_processor = None
+            if getattr(self, 'navigation', None):
+                self.navigation.close()
+                self.navigation = None
+            if getattr(self, 'screenshot_manager', None):
+                self.screenshot_manager.close()
+                self.screenshot_manager = None
+            
+            # Initialize project - pełny tekst jest ekstrahowany w tle
+            project = self.data_manager.init_project(pdf_path, background=True)
             
             # Start new processor with status callback
             self.rectangle_processor = RectangleProcessor(
                 project['data_file'],  # json_path
                 project['pdf_path'],   # pdf_path
-                self.update_status     # callback
+                self.update_status,    # callback
+                self.data_manager.store
             )
+            self.data_manager.set_extraction_queue(self.rectangle_processor.submit)
+            self.poll_processor_status(self.rectangle_processor)
             
             # Clear existing widgets
             for widget in self.left_frame.winfo_children():
@@ -101,10 +113,11 @@ class PDFApp:
             
             # Initialize components
             navigation = PDFNavigation(self.left_frame, pdf_path)
+            navigation.set_search_index(self.data_manager.search_index)
             self.pdf_viewer = PDFViewerUI(self.left_frame, navigation)
             self.navigation = navigation  # zachowujemy referencję
 
-            self.screenshot_manager = ScreenshotManager(project['screenshots_dir'])
+            self.screenshot_manager = ScreenshotManager(project['screenshots_dir'], pdf_path)
             
             # Initialize Screenshot List
             self.screenshot_list = ScreenshotList(
@@ -124,16 +137,42 @@ class PDFApp:
             # Set screenshot list reference in rectangle manager
             self.rectangle_manager.screenshot_list = self.screenshot_list
             
+            # Ekstrakcja w tle zaczyna od oglądanej strony
+            self.pdf_viewer.add_page_listener(
+                lambda: self.data_manager.prioritize_page(self.pdf_viewer.get_current_page())
+            )
+            self.poll_extraction(project['path'])
+            
             # Load existing rectangles
-            rectangles = self.data_manager.load_rectangle_data()
-            self.rectangle_manager.redraw_rectangles(rectangles)
-            self.screenshot_list.update_list(rectangles)
+            self.rectangle_manager.redraw_rectangles()
+            self.screenshot_list.update_list(self.data_manager.load_rectangle_data())
             
             self.update_status(f"Loaded PDF: {os.path.basename(pdf_path)}")
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load PDF: {str(e)}")
             
+    def poll_processor_status(self, processor):
+        """Show status messages of the rectangle worker threads (runs in the Tk loop)"""
+        if processor is not self.rectangle_processor:
+            return  # procesor zatrzymany albo zastąpiony
+        processor.poll_status()
+        self.root.after(100, self.poll_processor_status, processor)
+
+    def poll_extraction(self, project_path):
+        """Show background text extraction progress in the processing status label"""
+        project = self.data_manager.current_project
+        if not project or project['path'] != project_path:
+            return  # otwarto inny projekt
+        done, total, finished = self.data_manager.extraction_progress()
+        if not finished:
+            self.processing_status.config(text=f"Extracting text: {done}/{total} pages")
+            self.root.after(250, self.poll_extraction, project_path)
+        elif self.data_manager.background and self.data_manager.background.error is not None:
+            self.processing_status.config(text=f"Text extraction failed: {self.data_manager.background.error}")
+        else:
+            self.processing_status.config(text=f"Text extraction complete ({total} pages)")
+            
     def open_pdf_file(self):
         """Open file dialog to select PDF"""
         file_path = filedialog.askopenfilename(
@@ -162,14 +201,16 @@ class PDFApp:
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to export project: {str(e)}")
                 
-    def update_status(self, message):
-        """Update status bar message"""
-        self.status_bar.config(text=message)
-        
     def on_closing(self):
         """Handle application closing"""
         if self.rectangle_processor:
+            self.data_manager.set_extraction_queue(None)
             self.rectangle_processor.stop()
+        if getattr(self, 'navigation', None):
+            self.navigation.close()
+        if getattr(self, 'screenshot_manager', None):
+            self.screenshot_manager.close()
+        self.data_manager.close()
         self.root.destroy()
 
 def main():
@@ -0,0 +1,45 @@
+import argparse
+import os
+import sys
+
+from rectangle_migration import migrate_to_pdf_space
+from rectangle_store import RectangleStore
+
+
+def migrate_project(project_path):
+    """Convert a project's canvas-space rectangles to PDF space; returns (migrated, skipped)"""
+    data_file = os.path.join(project_path, 'rectangle_map.json')
+    if not os.path.exists(data_file):
+        raise FileNotFoundError(f"No rectangle_map.json in {project_path}")
+    store = RectangleStore(data_file)
+    try:
+        return migrate_to_pdf_space(store, project_path)
+    finally:
+        store.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="docparser migrate",
+        description="Convert rectangles saved in canvas pixels to PDF coordinates (safe to re-run)",
+    )
+    parser.add_argument("projects", nargs="+", help="project directories (containing rectangle_map.json)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    failures = 0
+    for project_path in args.projects:
+        try:
+            migrated, skipped = migrate_project(project_path)
+        except Exception as e:
+            failures += 1
+            print(f"FAIL  {project_path}: {e}")
+            continue
+        print(f"OK    {project_path}: {migrated} migrated, {skipped} skipped")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import argparse
+import os
+import sys
+import time
+
+from rectangle_migration import migrate_to_pdf_space
+from rectangle_store import RectangleStore
+from text_extraction_manager import TextExtractionManager
+
+
+def reextract_project(project_path, workers=None, pdf_path=None):
+    """Re-run text extraction for every rectangle of an existing project.
+
+    Returns (saved, total) rectangle counts.
+    """
+    data_file = os.path.join(project_path, 'rectangle_map.json')
+    if not os.path.exists(data_file):
+        raise FileNotFoundError(f"No rectangle_map.json in {project_path}")
+
+    store = RectangleStore(data_file, pdf_path)
+    manager = None
+    try:
+        if not store.pdf_path or not os.path.exists(store.pdf_path):
+            raise FileNotFoundError(f"PDF for {project_path} not found: {store.pdf_path}")
+        # Starsze projekty mają prostokąty we współrzędnych canvasu
+        migrate_to_pdf_space(store, project_path)
+        manager = TextExtractionManager(store.pdf_path, data_file, store)
+        saved = manager.reextract_all(workers=workers)
+        return saved, len(store.model)
+    finally:
+        if manager:
+            manager.close()
+        store.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="docparser reextract",
+        description="Re-extract rectangle text of existing projects (e.g. after a strategy change)",
+    )
+    parser.add_argument("projects", nargs="+", help="project directories (containing rectangle_map.json)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes, pages are distributed across them (default: CPU count)")
+    parser.add_argument("--pdf", default=None,
+                        help="PDF path, if it moved since the project was created (single project only)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.pdf and len(args.projects) > 1:
+        print("--pdf can only be used with a single project", file=sys.stderr)
+        return 2
+
+    failures = 0
+    for project_path in args.projects:
+        start = time.perf_counter()
+        try:
+            saved, total = reextract_project(project_path, args.workers, args.pdf)
+        except Exception as e:
+            failures += 1
+            print(f"FAIL  {project_path}: {e}")
+            continue
+        print(f"OK    {project_path}: {saved}/{total} rectangles in {time.perf_counter() - start:.1f}s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
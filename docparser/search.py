@@ -0,0 +1,48 @@
+import argparse
+import sys
+import time
+
+from corpus_index import CorpusIndex
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="docparser search",
+        description="Search page text and rectangles of all indexed projects",
+    )
+    parser.add_argument("query", help="words that must all occur on the page or in the rectangle")
+    parser.add_argument("--project-dir", default="pdf_projects", help="directory holding the projects")
+    parser.add_argument("--db", default=None, help="index database (default: <project-dir>/.corpus_index.sqlite)")
+    parser.add_argument("--limit", type=int, default=20, help="maximum number of results")
+    parser.add_argument("--prefix", action="store_true", help="match the last word as a prefix (slower for short prefixes)")
+    parser.add_argument("--raw", action="store_true", help="pass the query to SQLite FTS5 unchanged")
+    parser.add_argument("--update", action="store_true", help="index changed projects before searching")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    index = CorpusIndex(args.db) if args.db else CorpusIndex.for_project_dir(args.project_dir)
+    with index:
+        if args.update:
+            index.update(args.project_dir)
+        start = time.perf_counter()
+        try:
+            results = index.search(args.query, limit=args.limit, prefix=args.prefix, raw=args.raw)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 2
+        elapsed = time.perf_counter() - start
+
+    for hit in results:
+        location = f"page {hit['page'] + 1}"
+        if hit['kind'] == 'rect':
+            location += f", rect {hit['rect_id']} {[round(c, 1) for c in hit['bbox']]}"
+        snippet = ' '.join(hit['snippet'].split())
+        print(f"{hit['relevance']:6.2f}  {hit['name']}  {location}\n        {snippet}")
+    print(f"{len(results)} results in {elapsed * 1000:.1f} ms")
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import os
+import threading
+
+import fitz
+
+from pdf_threading import fitz_lock
+
+
+class DocumentHandle:
+    """Wypożyczony uchwyt dokumentu z DocumentPool.
+
+    doc jest tylko do odczytu i może być współdzielony przez kilka obiektów,
+    więc wywołania fitz poza wątkiem głównym wykonujemy pod fitz_lock.
+    close() oddaje uchwyt do puli - dokument zamyka się, gdy odda go
+    ostatni użytkownik.
+    """
+
+    def __init__(self, pool, key, doc):
+        self._pool = pool
+        self.key = key
+        self.doc = doc
+        self.closed = False
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._pool.release(self)
+
+    def __enter__(self):
+        return self.doc
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class DocumentPool:
+    """Wspólne uchwyty fitz.Document kluczowane ścieżką i mtime pliku.
+
+    Ten sam PDF otwierany przez nawigację, ekstrakcję prostokątów i ekstraktor
+    pełnego tekstu jest parsowany raz. Zmiana pliku na dysku (inny mtime lub
+    rozmiar) daje nowy klucz - dotychczasowi użytkownicy zachowują stary
+    dokument do czasu zwolnienia.
+    Klucz zawiera PID: proces potomny (fork, np. ProcessPoolExecutor
+    ekstrakcji) dziedziczy kopię puli, ale dokumenty rodzica dzielą z nim
+    deskryptor pliku i jego pozycję, więc potomek otwiera własne.
+    thread_confined=True daje uchwyt związany z bieżącym wątkiem (wątki
+    renderujące w tle, które trzymają własny stan stron).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # klucz -> [doc, liczba użytkowników]
+        self.opens = 0
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # Blokada mogła być trzymana przez inny wątek rodzica w chwili forka
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def document_key(pdf_path, thread_confined=False):
+        st = os.stat(pdf_path)
+        key = (os.path.abspath(pdf_path), st.st_mtime_ns, st.st_size, os.getpid())
+        if thread_confined:
+            key += (threading.get_ident(),)
+        return key
+
+    def acquire(self, pdf_path, thread_confined=False):
+        """Zwraca DocumentHandle; każde acquire wymaga jednego close()"""
+        key = self.document_key(pdf_path, thread_confined)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                with fitz_lock:
+                    doc = fitz.open(pdf_path)
+                entry = self._entries[key] = [doc, 0]
+                self.opens += 1
+            entry[1] += 1
+            return DocumentHandle(self, key, entry[0])
+
+    def release(self, handle):
+        with self._lock:
+            entry = self._entries.get(handle.key)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del self._entries[handle.key]
+        with fitz_lock:
+            if not entry[0].is_closed:
+                entry[0].close()
+
+    def refcount(self, pdf_path, thread_confined=False):
+        with self._lock:
+            entry = self._entries.get(self.document_key(pdf_path, thread_confined))
+            return entry[1] if entry else 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+# Pula procesu; procesy potomne otwierają własne dokumenty (PID w kluczu)
+document_pool = DocumentPool()
+
+
+def open_document(pdf_path, thread_confined=False):
+    """Shortcut for document_pool.acquire"""
+    return document_pool.acquire(pdf_path, thread_confined)
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+META_FILE = 'meta.json'
+# Katalogi tymczasowe put() - poza drzewem wpisów, więc evict() ich nie liczy
+TMP_DIR = '.tmp'
+
+
+def file_sha256(path):
+    """SHA-256 zawartości pliku liczony strumieniowo (bez wczytywania całego PDF)"""
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def link_or_copy(src, dst):
+    """Hard link, a gdy system plików go nie obsługuje (inny dysk, FAT) - kopia"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
+
+def tree_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, files in os.walk(path) for name in files)
+
+
+class ExtractionCache:
+    """Wyniki ekstrakcji adresowane treścią PDF, współdzielone przez projekty.
+
+    Wpis to katalog <cache_dir>/<sha256[:2]>/<sha256>/<kind>/ z plikami
+    artefaktu (np. kind 'content-json': pdf_content.json + pdf_content.txt,
+    'tables-csv': pliki tabel + indeks) i meta.json. Trafienie podłącza pliki
+    do projektu hard linkami (albo kopiuje). Po przekroczeniu max_bytes
+    usuwane są najdawniej używane wpisy.
+    Cache może być współdzielony przez procesy wsadowe: wpis może zniknąć
+    (evict innego procesu) w dowolnej chwili, co jest traktowane jak chybienie.
+    """
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def entry_path(self, digest, kind):
+        return os.path.join(self.cache_dir, digest[:2], digest, kind)
+
+    def lookup(self, digest, kind):
+        """Metadane wpisu (z kluczem 'path') albo None"""
+        path = self.entry_path(digest, kind)
+        try:
+            with open(os.path.join(path, META_FILE), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        # Czas modyfikacji meta.json = ostatnie użycie (kolejność LRU)
+        try:
+            os.utime(os.path.join(path, META_FILE))
+        except FileNotFoundError:
+            return None  # wpis usunięty przez równoległe evict()
+        meta['path'] = path
+        return meta
+
+    def materialize(self, entry, dest_dir):
+        """Podłącza pliki wpisu do dest_dir; zwraca listę utworzonych ścieżek.
+
+        None, gdy wpis usunięto po lookup() (częściowo podłączone pliki są
+        usuwane) - wywołujący ekstrahuje wtedy od nowa.
+        """
+        os.makedirs(dest_dir, exist_ok=True)
+        created = []
+        for name in entry['files']:
+            src = os.path.join(entry['path'], name)
+            dst = os.path.join(dest_dir, name)
+            created.append(dst)
+            try:
+                if os.path.isdir(src):
+                    shutil.copytree(src, dst, copy_function=link_or_copy, dirs_exist_ok=True)
+                else:
+                    if os.path.exists(dst):
+                        os.remove(dst)
+                    link_or_copy(src, dst)
+            except (FileNotFoundError, shutil.Error):
+                if os.path.exists(os.path.join(entry['path'], META_FILE)):
+                    raise
+                for path in created:
+                    if os.path.isdir(path):
+                        shutil.rmtree(path, ignore_errors=True)
+                    elif os.path.exists(path):
+                        os.remove(path)
+                return None
+        return created
+
+    def put(self, digest, kind, src_dir, names, meta=None):
+        """Dodaje artefakt (pliki/katalogi names z src_dir) do cache.
+
+        Wpis powstaje w katalogu tymczasowym i jest podmieniany atomowo,
+        więc równoległe procesy wsadowe nie widzą niekompletnych wpisów.
+        """
+        final = self.entry_path(digest, kind)
+        if os.path.exists(os.path.join(final, META_FILE)):
+            return final
+        tmp_root = os.path.join(self.cache_dir, TMP_DIR)
+        os.makedirs(tmp_root, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix='entry-', dir=tmp_root)
+        try:
+            for name in names:
+                src = os.path.join(src_dir, name)
+                if os.path.isdir(src):
+                    shutil.copytree(src, os.path.join(tmp, name), copy_function=link_or_copy)
+                else:
+                    link_or_copy(src, os.path.join(tmp, name))
+            meta = dict(meta or {}, files=list(names), created=time.time())
+            meta['size'] = tree_size(tmp)
+            with open(os.path.join(tmp, META_FILE), 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            self._publish(tmp, final)
+        finally:
+            if os.path.exists(tmp):
+                shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+        return final
+
+    def _publish(self, tmp, final, attempts=3):
+        """Przenosi gotowy wpis na miejsce; katalog nadrzędny może zniknąć
+        między makedirs a rename (evict innego procesu usuwa puste katalogi)"""
+        for _ in range(attempts):
+            os.makedirs(os.path.dirname(final), exist_ok=True)
+            try:
+                os.rename(tmp, final)
+                return True
+            except FileNotFoundError:
+                continue
+            except OSError:
+                if os.path.exists(os.path.join(final, META_FILE)):
+                    return False  # inny proces zapisał ten sam wpis
+                raise
+        print(f"Could not store cache entry {final}: parent directory keeps disappearing")
+        return False
+
+    def entries(self):
+        """[(ostatnie użycie, rozmiar, ścieżka)] wszystkich wpisów"""
+        found = []
+        for prefix in os.listdir(self.cache_dir):
+            prefix_dir = os.path.join(self.cache_dir, prefix)
+            if prefix == TMP_DIR or not os.path.isdir(prefix_dir):
+                continue
+            for digest in self._listdir(prefix_dir):
+                digest_dir = os.path.join(prefix_dir, digest)
+                if digest.startswith('.tmp-') or not os.path.isdir(digest_dir):
+                    continue
+                for kind in self._listdir(digest_dir):
+                    if kind.startswith('.tmp-'):
+                        continue  # katalogi tymczasowe ze starszych wersji
+                    meta_path = os.path.join(digest_dir, kind, META_FILE)
+                    try:
+                        with open(meta_path, 'r', encoding='utf-8') as f:
+                            size = json.load(f)['size']
+                        found.append((os.path.getmtime(meta_path), size, os.path.join(digest_dir, kind)))
+                    except (OSError, ValueError, KeyError):
+                        continue
+        return found
+
+    @staticmethod
+    def _listdir(path):
+        try:
+            return os.listdir(path)
+        except OSError:
+            return []  # usunięty przez inny proces
+
+    def total_bytes(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Usuwa najdawniej używane wpisy, aż rozmiar cache <= max_bytes"""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+            try:
+                os.rmdir(os.path.dirname(path))
+            except OSError:
+                pass  # niepusty (inne wpisy) albo usunięty przez inny proces
+        return removed
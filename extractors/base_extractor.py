@@ -0,0 +1,115 @@
+import math
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from document_pool import open_document
+from extractors.content_formats import check_format, create_content_writer
+from pdf_threading import fitz_lock
+
+# Poniżej tej liczby stron start procesów kosztuje więcej niż zysk z równoległości
+PARALLEL_PAGE_THRESHOLD = 200
+
+
+def _extract_chunk(extractor_cls, pdf_path, start, stop):
+    """Worker: otwiera własny uchwyt fitz i ekstrahuje strony [start, stop)"""
+    extractor = extractor_cls(pdf_path)
+    try:
+        return [extractor.extract_page(page_num) for page_num in range(start, stop)]
+    finally:
+        extractor.close()
+
+
+class BasePDFExtractor:
+    """Wspólna część ekstraktorów: otwarcie dokumentu i iteracja po stronach"""
+
+    parallel_threshold = PARALLEL_PAGE_THRESHOLD
+    # Typy bloków w "content" stron (content_formats.check_format)
+    block_types = ('text', 'image')
+
+    def __init__(self, pdf_path):
+        self.pdf_path = pdf_path
+        # Wspólny uchwyt z puli - zwalniany jawnie przez close()
+        self._handle = open_document(pdf_path)
+        self.doc = self._handle.doc
+        self.output_dir = None  # będzie ustawione później
+
+    def extract_page(self, page_num):
+        """Zwraca strukturę jednej strony: {"page": n, "content": [...]}"""
+        raise NotImplementedError
+
+    def write_page_text(self, f, page):
+        """Dopisuje stronę do pliku pdf_content.txt"""
+        raise NotImplementedError
+
+    def resolve_workers(self, workers=None):
+        """Liczba procesów dla tego dokumentu; 1 oznacza tryb szeregowy"""
+        if workers is None:
+            if self.doc.page_count < self.parallel_threshold:
+                return 1
+            workers = os.cpu_count() or 1
+        return max(1, min(workers, self.doc.page_count))
+
+    def iter_pages(self, workers=None, chunk_size=None):
+        """Generator struktur stron w kolejności numerów stron.
+
+        Przy workers > 1 zakres stron dzielony jest na kawałki, a każdy proces
+        otwiera własny dokument. W locie jest najwyżej 2 x workers kawałków.
+        """
+        workers = self.resolve_workers(workers)
+        page_count = self.doc.page_count
+
+        if workers == 1:
+            for page_num in range(page_count):
+                # Dokument może być współdzielony z innymi wątkami
+                with fitz_lock:
+                    page = self.extract_page(page_num)
+                yield page
+            return
+
+        if chunk_size is None:
+            chunk_size = max(16, math.ceil(page_count / (workers * 4)))
+        chunks = [(start, min(start + chunk_size, page_count))
+                  for start in range(0, page_count, chunk_size)]
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            next_chunk = 0
+            while next_chunk < len(chunks) or pending:
+                while next_chunk < len(chunks) and len(pending) < workers * 2:
+                    start, stop = chunks[next_chunk]
+                    pending.append(executor.submit(_extract_chunk, type(self), self.pdf_path, start, stop))
+                    next_chunk += 1
+                # Wyniki scalane w kolejności stron
+                for page in pending.popleft().result():
+                    yield page
+
+    def extract_full_text(self, workers=None, indent=2, output_format='json'):
+        """Ekstrahuje pełny tekst dokumentu do pdf_content.* i pdf_content.txt
+
+        Strony są zapisywane strumieniowo (struktura i .txt w jednym przebiegu),
+        więc pamięć ograniczona jest rozmiarem pojedynczej strony.
+        workers: liczba procesów (None - automatycznie, równolegle dopiero
+        od parallel_threshold stron; 1 - zawsze szeregowo)
+        indent: wcięcie JSON; None daje zwarty zapis
+        output_format: 'json', 'jsonl' lub 'columnar' (patrz content_formats);
+        ValueError przed utworzeniem plików, gdy format nie obsługuje bloków
+        ekstraktora (columnar - tylko text i image)
+        """
+        check_format(output_format, self.block_types)
+        text_output = os.path.join(self.output_dir, 'pdf_content.txt')
+        writer = create_content_writer(self.output_dir, output_format, indent=indent)
+        
+        try:
+            with open(text_output, 'w', encoding='utf-8') as text_file:
+                for page in self.iter_pages(workers):
+                    writer.write_page(page)
+                    self.write_page_text(text_file, page)
+        finally:
+            writer.close()
+            
+        return writer.path
+
+    def close(self):
+        """Zwraca uchwyt dokumentu do puli"""
+        self._handle.close()
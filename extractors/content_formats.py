@@ -0,0 +1,340 @@
+"""Formaty zapisu struktury dokumentu (pdf_content.*) i ich czytniki.
+
+- json:     pdf_content.json - tablica stron (domyślny, dotychczasowy format)
+- jsonl:    pdf_content.jsonl - jedna strona na linię + indeks offsetów
+- columnar: pdf_content.columnar/ - kolumny spanów w plikach binarnych
+            (czcionki w tabeli internowanej, bboxy jako float32); tylko
+            bloki text i image - bez tabel PDFTableExtractor
+
+Czytniki jsonl i columnar potrafią wczytać pojedynczą stronę bez
+parsowania całego pliku.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+
+from extractors.json_stream import JSONArrayWriter
+
+OUTPUT_FORMATS = ('json', 'jsonl', 'columnar')
+
+CONTENT_FILES = {
+    'json': 'pdf_content.json',
+    'jsonl': 'pdf_content.jsonl',
+    'columnar': 'pdf_content.columnar',
+}
+
+JSONL_INDEX_FILE = 'pdf_content.jsonl.idx'
+
+BLOCK_TYPES = {'text': 0, 'image': 1}
+BLOCK_TYPE_NAMES = {code: name for name, code in BLOCK_TYPES.items()}
+
+# Typy bloków, które format potrafi zapisać (brak wpisu - dowolne)
+FORMAT_BLOCK_TYPES = {'columnar': frozenset(BLOCK_TYPES)}
+
+# plik -> dtype; *_bbox mają po 4 wartości na element
+COLUMNS = {
+    'pages': np.int64,        # offsety bloków stron (page_count + 1)
+    'block_type': np.int8,
+    'block_bbox': np.float32,
+    'block_lines': np.int64,  # offsety linii bloków (blocks + 1)
+    'line_bbox': np.float32,
+    'line_spans': np.int64,   # offsety spanów linii (lines + 1)
+    'span_font': np.int32,    # indeks w tabeli czcionek
+    'span_size': np.float32,
+    'span_flags': np.int32,
+    'span_bbox': np.float32,
+    'span_text': np.int64,    # offsety tekstu spanów w text.bin (spans + 1)
+}
+
+
+def content_path(output_dir, output_format):
+    if output_format not in CONTENT_FILES:
+        raise ValueError(f"Unknown output format: {output_format}")
+    return os.path.join(output_dir, CONTENT_FILES[output_format])
+
+
+def find_content(project_path):
+    """Zwraca (format, ścieżka) istniejącego pdf_content.* albo None"""
+    for output_format in OUTPUT_FORMATS:
+        path = content_path(project_path, output_format)
+        if output_format == 'columnar':
+            if os.path.exists(os.path.join(path, 'meta.json')):
+                return output_format, path
+        elif os.path.exists(path):
+            return output_format, path
+    return None
+
+
+def check_format(output_format, block_types):
+    """ValueError, gdy format nie zapisze bloków danego ekstraktora.
+
+    Sprawdzane przed utworzeniem jakiegokolwiek pliku - błąd w write_page
+    zostawiłby w projekcie niekompletny wynik.
+    """
+    if output_format not in CONTENT_FILES:
+        raise ValueError(f"Unknown output format: {output_format}")
+    unsupported = set(block_types) - FORMAT_BLOCK_TYPES.get(output_format, set(block_types))
+    if unsupported:
+        names = ', '.join(f"'{name}'" for name in sorted(unsupported))
+        raise ValueError(f"{output_format.capitalize()} format does not support {names} blocks")
+
+
+def content_files(output_format):
+    """Nazwy plików/katalogów tworzonych przez extract_full_text w danym formacie"""
+    names = [CONTENT_FILES[output_format], 'pdf_content.txt']
+    if output_format == 'jsonl':
+        names.append(JSONL_INDEX_FILE)
+    return names
+
+
+def remove_content(output_dir, output_format):
+    """Usuwa wcześniejszy wynik (pliki mogą być hard linkami do cache - nie nadpisujemy ich)"""
+    for name in content_files(output_format):
+        path = os.path.join(output_dir, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+
+def create_content_writer(output_dir, output_format='json', indent=2):
+    if output_format == 'json':
+        return JSONContentWriter(content_path(output_dir, 'json'), indent)
+    if output_format == 'jsonl':
+        return JSONLContentWriter(content_path(output_dir, 'jsonl'))
+    if output_format == 'columnar':
+        return ColumnarContentWriter(content_path(output_dir, 'columnar'))
+    raise ValueError(f"Unknown output format: {output_format}")
+
+
+def open_content(project_path):
+    """Otwiera czytnik struktury dokumentu w formacie, który jest w katalogu projektu"""
+    found = find_content(project_path)
+    if not found:
+        raise FileNotFoundError(f"No pdf_content output in {project_path}")
+    output_format, path = found
+    readers = {
+        'json': JSONContentReader,
+        'jsonl': JSONLContentReader,
+        'columnar': ColumnarContentReader,
+    }
+    return readers[output_format](path)
+
+
+class JSONContentWriter:
+    def __init__(self, path, indent=2):
+        self.path = path
+        self.f = open(path, 'w', encoding='utf-8')
+        self.writer = JSONArrayWriter(self.f, indent=indent)
+
+    def write_page(self, page):
+        self.writer.write(page)
+
+    def close(self):
+        self.writer.close()
+        self.f.close()
+
+
+class JSONLContentWriter:
+    def __init__(self, path):
+        self.path = path
+        self.f = open(path, 'wb')
+        self.offsets = []
+
+    def write_page(self, page):
+        self.offsets.append(self.f.tell())
+        line = json.dumps(page, ensure_ascii=False, separators=(',', ':'))
+        self.f.write(line.encode('utf-8') + b'\n')
+
+    def close(self):
+        self.offsets.append(self.f.tell())
+        self.f.close()
+        np.asarray(self.offsets, dtype=np.int64).tofile(
+            os.path.join(os.path.dirname(self.path), JSONL_INDEX_FILE)
+        )
+
+
+class ColumnarContentWriter:
+    """Zapis kolumnowy: każda kolumna dopisywana do własnego pliku .bin strona po stronie"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.files = {name: open(os.path.join(path, f'{name}.bin'), 'wb') for name in COLUMNS}
+        self.text_file = open(os.path.join(path, 'text.bin'), 'wb')
+        self.fonts = {}
+        self.counts = {'pages': 0, 'blocks': 0, 'lines': 0, 'spans': 0, 'text_bytes': 0}
+        # Offsety zaczynają się od zera
+        for name in ('pages', 'block_lines', 'line_spans', 'span_text'):
+            self._append(name, [0])
+
+    def _append(self, name, values):
+        np.asarray(values, dtype=COLUMNS[name]).tofile(self.files[name])
+
+    def _font_id(self, font):
+        if font not in self.fonts:
+            self.fonts[font] = len(self.fonts)
+        return self.fonts[font]
+
+    def write_page(self, page):
+        counts = self.counts
+        block_type, block_bbox, block_lines = [], [], []
+        line_bbox, line_spans = [], []
+        span_font, span_size, span_flags, span_bbox, span_text = [], [], [], [], []
+        text_chunks = []
+
+        for block in page['content']:
+            if block['type'] not in BLOCK_TYPES:
+                raise ValueError(f"Columnar format does not support '{block['type']}' blocks")
+            block_type.append(BLOCK_TYPES[block['type']])
+            block_bbox.append(block['bbox'])
+            for line in block.get('lines', []):
+                line_bbox.append(line['bbox'])
+                for span in line['spans']:
+                    encoded = span['text'].encode('utf-8')
+                    counts['text_bytes'] += len(encoded)
+                    text_chunks.append(encoded)
+                    span_text.append(counts['text_bytes'])
+                    span_font.append(self._font_id(span['font']))
+                    span_size.append(span['size'])
+                    span_flags.append(span['flags'])
+                    span_bbox.append(span['bbox'])
+                counts['spans'] += len(line['spans'])
+                line_spans.append(counts['spans'])
+            counts['lines'] += len(block.get('lines', []))
+            block_lines.append(counts['lines'])
+
+        counts['blocks'] += len(block_type)
+        counts['pages'] += 1
+
+        self._append('pages', [counts['blocks']])
+        self._append('block_type', block_type)
+        self._append('block_bbox', block_bbox)
+        self._append('block_lines', block_lines)
+        self._append('line_bbox', line_bbox)
+        self._append('line_spans', line_spans)
+        self._append('span_font', span_font)
+        self._append('span_size', span_size)
+        self._append('span_flags', span_flags)
+        self._append('span_bbox', span_bbox)
+        self._append('span_text', span_text)
+        self.text_file.write(b''.join(text_chunks))
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        self.text_file.close()
+        meta = {
+            'version': 1,
+            'counts': self.counts,
+            'fonts': list(self.fonts),
+            'columns': {name: np.dtype(dtype).str for name, dtype in COLUMNS.items()},
+        }
+        with open(os.path.join(self.path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+
+class JSONContentReader:
+    """Dotychczasowy format - wymaga sparsowania całego pliku przy otwarciu"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'r', encoding='utf-8') as f:
+            self.pages = json.load(f)
+
+    @property
+    def page_count(self):
+        return len(self.pages)
+
+    def load_page(self, page_num):
+        return self.pages[page_num]
+
+    def iter_pages(self):
+        return iter(self.pages)
+
+    def close(self):
+        self.pages = []
+
+
+class JSONLContentReader:
+    def __init__(self, path):
+        self.path = path
+        self.offsets = np.fromfile(
+            os.path.join(os.path.dirname(path), JSONL_INDEX_FILE), dtype=np.int64
+        )
+        self.f = open(path, 'rb')
+
+    @property
+    def page_count(self):
+        return len(self.offsets) - 1
+
+    def load_page(self, page_num):
+        start, end = self.offsets[page_num], self.offsets[page_num + 1]
+        self.f.seek(start)
+        return json.loads(self.f.read(end - start))
+
+    def iter_pages(self):
+        for page_num in range(self.page_count):
+            yield self.load_page(page_num)
+
+    def close(self):
+        self.f.close()
+
+
+class ColumnarContentReader:
+    """Kolumny mapowane w pamięci - strona materializowana dopiero w load_page"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.fonts = self.meta['fonts']
+        self.columns = {name: self._map(f'{name}.bin', dtype)
+                        for name, dtype in self.meta['columns'].items()}
+        for name in ('block_bbox', 'line_bbox', 'span_bbox'):
+            self.columns[name] = self.columns[name].reshape(-1, 4)
+        self.text = self._map('text.bin', np.uint8)
+
+    def _map(self, filename, dtype):
+        path = os.path.join(self.path, filename)
+        if os.path.getsize(path) == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r')
+
+    @property
+    def page_count(self):
+        return self.meta['counts']['pages']
+
+    def load_page(self, page_num):
+        c = self.columns
+        b0, b1 = int(c['pages'][page_num]), int(c['pages'][page_num + 1])
+        content = []
+        for b in range(b0, b1):
+            block_type = BLOCK_TYPE_NAMES[int(c['block_type'][b])]
+            block = {'type': block_type, 'bbox': c['block_bbox'][b].tolist()}
+            if block_type == 'text':
+                block['lines'] = []
+                for line in range(int(c['block_lines'][b]), int(c['block_lines'][b + 1])):
+                    spans = []
+                    for s in range(int(c['line_spans'][line]), int(c['line_spans'][line + 1])):
+                        t0, t1 = int(c['span_text'][s]), int(c['span_text'][s + 1])
+                        spans.append({
+                            'text': self.text[t0:t1].tobytes().decode('utf-8'),
+                            'font': self.fonts[int(c['span_font'][s])],
+                            'size': float(c['span_size'][s]),
+                            'flags': int(c['span_flags'][s]),
+                            'bbox': c['span_bbox'][s].tolist()
+                        })
+                    block['lines'].append({'bbox': c['line_bbox'][line].tolist(), 'spans': spans})
+            content.append(block)
+        return {'page': page_num + 1, 'content': content}
+
+    def iter_pages(self):
+        for page_num in range(self.page_count):
+            yield self.load_page(page_num)
+
+    def close(self):
+        self.columns = {}
+        self.text = None
@@ -0,0 +1,34 @@
+import json
+
+
+class JSONArrayWriter:
+    """Zapisuje tablicę JSON element po elemencie.
+
+    Wynik jest bajtowo identyczny z json.dump(lista, f, indent=indent,
+    ensure_ascii=False), ale w pamięci trzymany jest tylko bieżący element.
+    """
+
+    def __init__(self, f, indent=None):
+        self.f = f
+        self.indent = indent
+        self.count = 0
+
+    def write(self, item):
+        text = json.dumps(item, indent=self.indent, ensure_ascii=False)
+        if self.indent is None:
+            self.f.write('[' if self.count == 0 else ', ')
+        else:
+            # Stringi JSON nie zawierają surowych \n, więc wcięcie można dodać zamianą
+            newline_indent = '\n' + ' ' * self.indent
+            self.f.write('[' + newline_indent if self.count == 0 else ',' + newline_indent)
+            text = text.replace('\n', newline_indent)
+        self.f.write(text)
+        self.count += 1
+
+    def close(self):
+        if self.count == 0:
+            self.f.write('[]')
+        elif self.indent is None:
+            self.f.write(']')
+        else:
+            self.f.write('\n]')
@@ -0,0 +1,161 @@
+"""Układ tekstu stron (spany z bboxami) współdzielony przez ekstrakcję regionów.
+
+Zamiast liczyć get_text(clip=rect) dla każdego prostokąta, układ strony jest
+liczony raz (albo wczytywany z pdf_content.* zapisanego przy inicjalizacji
+projektu), a tekst regionu powstaje przez filtrowanie spanów.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from extractors.content_formats import find_content, open_content
+from pdf_threading import fitz_lock
+
+
+class PageLayout:
+    """Spany jednej strony: bboxy w tablicy NumPy + tekst i numer linii"""
+
+    def __init__(self, page_num, spans):
+        """spans: lista (bbox, text, line_no) w kolejności odczytu"""
+        self.page_num = page_num
+        self.texts = [text for _, text, _ in spans]
+        self.lines = np.array([line for _, _, line in spans], dtype=np.int64)
+        self.bboxes = np.array([bbox for bbox, _, _ in spans], dtype=np.float64).reshape(-1, 4)
+
+    @classmethod
+    def from_content(cls, page):
+        """Układ ze struktury strony w schemacie pdf_content ({"page", "content"})"""
+        spans = []
+        line_no = 0
+        for block in page['content']:
+            if block['type'] != 'text':
+                continue
+            for line in block['lines']:
+                for span in line['spans']:
+                    spans.append((span['bbox'], span['text'], line_no))
+                line_no += 1
+        return cls(page['page'] - 1, spans)
+
+    @classmethod
+    def from_page(cls, page):
+        """Układ liczony z fitz.Page jednym przebiegiem get_text("dict")"""
+        spans = []
+        line_no = 0
+        for block in page.get_text("dict")["blocks"]:
+            if block["type"] != 0:
+                continue
+            for line in block["lines"]:
+                for span in line["spans"]:
+                    spans.append((span["bbox"], span["text"], line_no))
+                line_no += 1
+        return cls(page.number, spans)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def spans_in(self, rect):
+        """Indeksy spanów przecinających rect"""
+        x0, y0, x1, y1 = rect
+        b = self.bboxes
+        mask = (b[:, 3] > y0) & (b[:, 1] < y1) & (b[:, 2] > x0) & (b[:, 0] < x1)
+        return np.flatnonzero(mask)
+
+    def _clip_span(self, index, x0, x1):
+        """Część tekstu spanu w przedziale [x0, x1].
+
+        Bboxy znaków nie są zapisywane, więc szerokość znaku przybliżamy
+        równym podziałem szerokości spanu; znak należy do regionu, gdy go
+        przecina (jak przy clip w get_text).
+        """
+        text = self.texts[index]
+        sx0, _, sx1, _ = self.bboxes[index]
+        if sx0 >= x0 and sx1 <= x1 or not text:
+            return text
+        width = (sx1 - sx0) / len(text)
+        if width <= 0:
+            return text
+        starts = sx0 + width * np.arange(len(text))
+        inside = np.flatnonzero((starts + width > x0) & (starts < x1))
+        if not len(inside):
+            return ''
+        return text[inside[0]:inside[-1] + 1]
+
+    def text_in(self, rect):
+        """Tekst regionu: linie rozdzielone znakiem nowej linii"""
+        x0, _, x1, _ = rect
+        lines = []
+        current = None
+        for index in self.spans_in(rect):
+            piece = self._clip_span(index, x0, x1)
+            if self.lines[index] != current:
+                current = self.lines[index]
+                lines.append([])
+            lines[-1].append(piece)
+        return '\n'.join(''.join(pieces) for pieces in lines)
+
+
+class PageLayoutCache:
+    """LRU układów stron dokumentu.
+
+    Źródłem jest pdf_content.* projektu (project_path), a gdy go brak -
+    get_text("dict") na doc. Bezpieczny wątkowo; wywołania fitz pod fitz_lock.
+    """
+
+    def __init__(self, doc, project_path=None, max_pages=64):
+        self.doc = doc
+        self.project_path = project_path
+        self.max_pages = max_pages
+        self.layouts = OrderedDict()
+        self.reader = None
+        self._reader_checked = False
+        self._lock = threading.Lock()          # layouts
+        self._reader_lock = threading.Lock()   # czytnik pdf_content
+        self.hits = 0
+        self.misses = 0
+
+    def _content_reader(self):
+        if not self._reader_checked:
+            self._reader_checked = True
+            if self.project_path and find_content(self.project_path):
+                self.reader = open_content(self.project_path)
+        return self.reader
+
+    def _build(self, page_num):
+        with self._reader_lock:
+            reader = self._content_reader()
+            if reader is not None and page_num < reader.page_count:
+                return PageLayout.from_content(reader.load_page(page_num))
+        with fitz_lock:
+            return PageLayout.from_page(self.doc.load_page(page_num))
+
+    def get(self, page_num):
+        with self._lock:
+            layout = self.layouts.get(page_num)
+            if layout is not None:
+                self.layouts.move_to_end(page_num)
+                self.hits += 1
+                return layout
+            self.misses += 1
+        # Budowa poza _lock - wywołujący może już trzymać fitz_lock
+        layout = self._build(page_num)
+        with self._lock:
+            self.layouts[page_num] = layout
+            while len(self.layouts) > self.max_pages:
+                self.layouts.popitem(last=False)
+        return layout
+
+    def region_text(self, page_num, rect):
+        """Tekst wewnątrz rect (współrzędne PDF) na stronie page_num"""
+        return self.get(page_num).text_in(tuple(rect))
+
+    def clear(self):
+        with self._lock:
+            self.layouts.clear()
+
+    def close(self):
+        self.clear()
+        with self._reader_lock:
+            if self.reader is not None:
+                self.reader.close()
+                self.reader = None
@@ -0,0 +1,137 @@
+"""Wykrywanie tabel na stronie na podstawie bboxów linii tekstu (NumPy).
+
+Linie strony (get_text("dict")) trafiają do tablic; wiersze to skupienia
+środków y, kolumny to przedziały x rozdzielone pustą przestrzenią wspólną
+dla wszystkich wierszy tabeli. Wynik to siatka komórek z indeksami
+wiersza i kolumny.
+"""
+import numpy as np
+
+
+def page_lines(blocks):
+    """(bboxes (n, 4), teksty) linii tekstowych z bloków get_text("dict")"""
+    bboxes = []
+    texts = []
+    for block in blocks:
+        if block["type"] != 0:
+            continue
+        for line in block["lines"]:
+            text = " ".join(span["text"] for span in line["spans"]).strip()
+            if text:
+                bboxes.append(line["bbox"])
+                texts.append(text)
+    return np.array(bboxes, dtype=np.float64).reshape(-1, 4), texts
+
+
+def cluster_1d(values, gap):
+    """Etykiety skupień: nowe skupienie tam, gdzie różnica posortowanych wartości > gap"""
+    if not len(values):
+        return np.empty(0, dtype=np.int64)
+    order = np.argsort(values, kind="stable")
+    breaks = np.diff(values[order]) > gap
+    labels = np.empty(len(values), dtype=np.int64)
+    labels[order] = np.concatenate(([0], np.cumsum(breaks)))
+    return labels
+
+
+def column_edges(x0, x1, min_gap):
+    """Lewe krawędzie kolumn: przerwy w pokryciu osi x szersze niż min_gap"""
+    order = np.argsort(x0, kind="stable")
+    starts = x0[order]
+    reach = np.maximum.accumulate(x1[order])
+    new_column = np.concatenate(([True], starts[1:] > reach[:-1] + min_gap))
+    return starts[new_column]
+
+
+def _segments(flags):
+    """Zakresy [start, stop) kolejnych wartości True"""
+    padded = np.concatenate(([False], flags, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return list(zip(edges[::2], edges[1::2]))
+
+
+def detect_tables(bboxes, texts, min_rows=2, min_cols=2, row_tolerance=0.5,
+                  column_gap=0.6, max_row_gap=2.0):
+    """Tabele strony jako siatki komórek.
+
+    bboxes, texts: linie strony (patrz page_lines)
+    row_tolerance: linie są w jednym wierszu, gdy środki y różnią się
+                   o mniej niż row_tolerance x mediana wysokości linii
+    column_gap: minimalna pusta przestrzeń między kolumnami (x mediana wysokości)
+    max_row_gap: większy odstęp między wierszami (x mediana wysokości) kończy tabelę
+
+    Zwraca listę słowników {"bbox", "n_rows", "n_cols", "cells"}, gdzie
+    cells to [{"row", "col", "text", "bbox"}] posortowane wierszami.
+    """
+    if len(bboxes) < min_rows * min_cols:
+        return []
+
+    heights = bboxes[:, 3] - bboxes[:, 1]
+    unit = float(np.median(heights)) or 1.0
+    yc = (bboxes[:, 1] + bboxes[:, 3]) / 2
+
+    # Wiersze strony - skupienia środków y
+    row_of = cluster_1d(yc, row_tolerance * unit)
+    n_page_rows = int(row_of.max()) + 1
+    cells_per_row = np.bincount(row_of, minlength=n_page_rows)
+    row_top = np.full(n_page_rows, np.inf)
+    row_bottom = np.full(n_page_rows, -np.inf)
+    np.minimum.at(row_top, row_of, bboxes[:, 1])
+    np.maximum.at(row_bottom, row_of, bboxes[:, 3])
+
+    # Kandydaci: kolejne wiersze z >= min_cols liniami i bez dużej przerwy
+    multi = cells_per_row >= min_cols
+    gaps = row_top[1:] - row_bottom[:-1]
+    connected = np.concatenate(([False], multi[1:] & multi[:-1] & (gaps <= max_row_gap * unit)))
+    run_start = multi & ~connected
+
+    run_id = np.cumsum(run_start) - 1
+    tables = []
+    for start, stop in _segments(multi):
+        # Podział zakresu na tabele w miejscach dużych przerw
+        ids = run_id[start:stop]
+        for table_id in np.unique(ids):
+            table_rows = np.arange(start, stop)[ids == table_id]
+            if len(table_rows) < min_rows:
+                continue
+            table = _build_table(bboxes, texts, row_of, table_rows, unit, column_gap, min_cols)
+            if table is not None:
+                tables.append(table)
+    return tables
+
+
+def _build_table(bboxes, texts, row_of, table_rows, unit, column_gap, min_cols):
+    members = np.flatnonzero(np.isin(row_of, table_rows))
+    b = bboxes[members]
+    widths = b[:, 2] - b[:, 0]
+
+    # Komórki scalone (nagłówki nad kilkoma kolumnami) zasłaniałyby przerwy
+    narrow = widths <= 2 * np.median(widths)
+    edges = column_edges(b[narrow, 0], b[narrow, 2], column_gap * unit)
+    if len(edges) < min_cols:
+        return None
+
+    col = np.searchsorted(edges, b[:, 0] + 1e-6, side="right") - 1
+    col = np.clip(col, 0, len(edges) - 1)
+    row = np.searchsorted(table_rows, row_of[members])
+
+    # Linie w tej samej komórce sklejamy w kolejności x
+    order = np.lexsort((b[:, 0], col, row))
+    cells = []
+    for i in order:
+        r, c = int(row[i]), int(col[i])
+        bbox = b[i].tolist()
+        if cells and cells[-1]["row"] == r and cells[-1]["col"] == c:
+            cell = cells[-1]
+            cell["text"] += " " + texts[members[i]]
+            cell["bbox"] = [min(cell["bbox"][0], bbox[0]), min(cell["bbox"][1], bbox[1]),
+                            max(cell["bbox"][2], bbox[2]), max(cell["bbox"][3], bbox[3])]
+        else:
+            cells.append({"row": r, "col": c, "text": texts[members[i]], "bbox": bbox})
+
+    return {
+        "bbox": [float(b[:, 0].min()), float(b[:, 1].min()), float(b[:, 2].max()), float(b[:, 3].max())],
+        "n_rows": len(table_rows),
+        "n_cols": len(edges),
+        "cells": cells,
+    }
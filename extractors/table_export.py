@@ -0,0 +1,218 @@
+"""Eksport tabel z PDFTableExtractor do plików kolumnowych.
+
+Każda tabela trafia do osobnego pliku (CSV; Parquet/Arrow przez pandas +
+pyarrow, jeśli są zainstalowane), a tables_index.json opisuje tabelę ->
+strony i bboxy. Tabela kontynuowana na kolejnej stronie (ta sama liczba i
+położenie kolumn, ostatnia na stronie -> pierwsza na następnej) jest
+sklejana w jeden plik. W pamięci trzymana jest tylko bieżąca, otwarta tabela.
+"""
+import csv
+import importlib.util
+import json
+import os
+import re
+
+TABLE_FORMATS = ('csv', 'parquet', 'arrow')
+
+TABLE_EXTENSIONS = {'csv': '.csv', 'parquet': '.parquet', 'arrow': '.arrow'}
+
+INDEX_FILE = 'tables_index.json'
+
+_NUMBER = re.compile(r'^[-+]?\d+([.,]\d+)?$')
+
+
+def parse_number(text):
+    """int/float z tekstu komórki ("1 234,5" -> 1234.5) albo None"""
+    value = text.replace(' ', '').replace('\xa0', '')
+    if not _NUMBER.match(value):
+        return None
+    if ',' in value or '.' in value:
+        return float(value.replace(',', '.'))
+    return int(value)
+
+
+def column_type(values):
+    """'int', 'float' albo 'str' dla wartości kolumny (puste komórki pomijane)"""
+    kind = None
+    for text in values:
+        if not text:
+            continue
+        number = parse_number(text)
+        if number is None:
+            return 'str'
+        if isinstance(number, float):
+            kind = 'float'
+        elif kind is None:
+            kind = 'int'
+    return kind or 'str'
+
+
+def table_grid(table):
+    """Wiersze tabeli jako listy tekstów (n_rows x n_cols, puste komórki '')"""
+    grid = [[''] * table['n_cols'] for _ in range(table['n_rows'])]
+    for cell in table['cells']:
+        grid[cell['row']][cell['col']] = cell['text']
+    return grid
+
+
+def column_lefts(table):
+    """Lewa krawędź każdej kolumny (minimum x0 komórek)"""
+    lefts = [None] * table['n_cols']
+    for cell in table['cells']:
+        x0 = cell['bbox'][0]
+        if lefts[cell['col']] is None or x0 < lefts[cell['col']]:
+            lefts[cell['col']] = x0
+    return lefts
+
+
+class TableExporter:
+    """Strumieniowy eksport tabel strona po stronie.
+
+    add_page(page) przyjmuje strukturę strony z PDFTableExtractor.extract_page,
+    strony muszą przychodzić po kolei. close() zapisuje ostatnią tabelę i indeks.
+    """
+
+    def __init__(self, output_dir, fmt='csv', stitch=True, column_tolerance=6.0):
+        if fmt not in TABLE_FORMATS:
+            raise ValueError(f"Unknown table format: {fmt}")
+        if fmt != 'csv' and not all(importlib.util.find_spec(name) for name in ('pandas', 'pyarrow')):
+            raise ValueError(f"Table format '{fmt}' requires pandas and pyarrow")
+        self.output_dir = output_dir
+        self.fmt = fmt
+        self.stitch = stitch
+        self.column_tolerance = column_tolerance
+        os.makedirs(output_dir, exist_ok=True)
+
+        self.index = []
+        self.open_table = None  # tabela, która może być kontynuowana na następnej stronie
+
+    def add_page(self, page):
+        tables = [block for block in page['content'] if block['type'] == 'table']
+        page_num = page['page']
+        for position, table in enumerate(tables):
+            if position == 0 and self._continues(table, page_num):
+                self._extend(table, page_num)
+            else:
+                self._flush()
+                self._open(table, page_num)
+            if position < len(tables) - 1:
+                self._flush()  # tylko ostatnia tabela strony może mieć ciąg dalszy
+        if not tables:
+            self._flush()
+
+    def _continues(self, table, page_num):
+        current = self.open_table
+        if not self.stitch or current is None or current['pages'][-1] != page_num - 1:
+            return False
+        if table['n_cols'] != len(current['lefts']):
+            return False
+        return all(abs(a - b) <= self.column_tolerance
+                   for a, b in zip(column_lefts(table), current['lefts']))
+
+    def _open(self, table, page_num):
+        grid = table_grid(table)
+        self.open_table = {
+            'id': len(self.index) + 1,
+            'pages': [page_num],
+            'bboxes': [{'page': page_num, 'bbox': table['bbox']}],
+            'lefts': column_lefts(table),
+            'header': grid[0],
+            'rows': grid,
+        }
+
+    def _extend(self, table, page_num):
+        current = self.open_table
+        grid = table_grid(table)
+        if grid and grid[0] == current['header']:
+            grid = grid[1:]  # nagłówek powtórzony na nowej stronie
+        current['rows'].extend(grid)
+        current['pages'].append(page_num)
+        current['bboxes'].append({'page': page_num, 'bbox': table['bbox']})
+
+    def _columns(self, rows):
+        """Nagłówek i typy kolumn; pierwszy wiersz jest nagłówkiem, gdy nie
+        zawiera liczb, a któraś kolumna poniżej jest liczbowa"""
+        n_cols = len(rows[0])
+        body_types = [column_type(row[c] for row in rows[1:]) for c in range(n_cols)]
+        first_is_text = all(parse_number(text) is None for text in rows[0])
+        if len(rows) > 1 and first_is_text and any(t != 'str' for t in body_types):
+            names = []
+            for c, text in enumerate(rows[0]):
+                name = text or f"col_{c + 1}"
+                if name in names:
+                    name = f"{name}_{c + 1}"
+                names.append(name)
+            return names, body_types, rows[1:]
+        types = [column_type(row[c] for row in rows) for c in range(n_cols)]
+        return [f"col_{c + 1}" for c in range(n_cols)], types, rows
+
+    def _flush(self):
+        table = self.open_table
+        if table is None:
+            return
+        self.open_table = None
+
+        names, types, rows = self._columns(table['rows'])
+        filename = f"table_{table['id']:04d}{TABLE_EXTENSIONS[self.fmt]}"
+        path = os.path.join(self.output_dir, filename)
+        if self.fmt == 'csv':
+            self._write_csv(path, names, rows)
+        else:
+            self._write_frame(path, names, types, rows)
+
+        self.index.append({
+            'table': table['id'],
+            'file': filename,
+            'pages': table['pages'],
+            'bboxes': table['bboxes'],
+            'n_rows': len(rows),
+            'n_cols': len(names),
+            'columns': [{'name': name, 'type': kind} for name, kind in zip(names, types)],
+        })
+
+    @staticmethod
+    def _write_csv(path, names, rows):
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(names)
+            writer.writerows(rows)
+
+    def _write_frame(self, path, names, types, rows):
+        import pandas as pd
+
+        columns = {}
+        for c, (name, kind) in enumerate(zip(names, types)):
+            values = [row[c] for row in rows]
+            if kind == 'str':
+                columns[name] = pd.Series(values, dtype='string')
+            else:
+                numbers = [parse_number(v) if v else None for v in values]
+                dtype = 'Int64' if kind == 'int' else 'Float64'
+                columns[name] = pd.Series(numbers, dtype=dtype)
+        frame = pd.DataFrame(columns)
+        if self.fmt == 'parquet':
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_feather(path)
+
+    def close(self):
+        """Zapisuje otwartą tabelę i indeks; zwraca ścieżkę indeksu"""
+        self._flush()
+        index_path = os.path.join(self.output_dir, INDEX_FILE)
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump({'format': self.fmt, 'tables': self.index}, f, indent=2, ensure_ascii=False)
+        return index_path
+
+
+def export_tables(pdf_path, output_dir, fmt='csv', workers=None):
+    """Wykrywa tabele w całym dokumencie i zapisuje je do output_dir; zwraca ścieżkę indeksu"""
+    from extractors.pdf_table_extractor import PDFTableExtractor
+
+    exporter = TableExporter(output_dir, fmt)
+    extractor = PDFTableExtractor(pdf_path)
+    try:
+        for page in extractor.iter_pages(workers):
+            exporter.add_page(page)
+    finally:
+        extractor.close()
+    return exporter.close()
@@ -0,0 +1,142 @@
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+import fitz
+
+from pdf_threading import fitz_lock
+from document_pool import open_document
+from pixmap_convert import pixmap_to_image
+
+
+def render_page(doc, page_number, scale):
+    """Renderuje stronę do obrazu PIL w danej skali (wywoływać z fitz_lock)"""
+    page = doc.load_page(page_number)
+    pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale))
+    return pixmap_to_image(pix)
+
+
+def cache_key(page_number, scale):
+    return (page_number, round(scale, 4))
+
+
+class PageRenderCache:
+    """LRU wyrenderowanych stron ograniczony budżetem pamięci w bajtach"""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def image_size(image):
+        return image.width * image.height * len(image.getbands())
+
+    def get(self, key):
+        with self._lock:
+            image = self._items.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def contains(self, key):
+        with self._lock:
+            return key in self._items
+
+    def put(self, key, image):
+        size = self.image_size(image)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.current_bytes -= self.image_size(old)
+            self._items[key] = image
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.current_bytes -= self.image_size(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pages': len(self._items),
+                'bytes': self.current_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+class PagePrefetcher(threading.Thread):
+    """Wątek w tle renderujący sąsiednie strony do PageRenderCache.
+
+    Ma własny uchwyt dokumentu; liczy się tylko najnowsze żądanie, więc
+    szybkie przewijanie nie buduje kolejki nieaktualnych renderów.
+    """
+
+    def __init__(self, pdf_path, cache, pages_around=2):
+        super().__init__(daemon=True, name="PagePrefetcher")
+        self.pdf_path = pdf_path
+        self.cache = cache
+        self.pages_around = pages_around
+        self.requests = queue.Queue()
+        self._stopped = threading.Event()
+
+    def request(self, page_number, scale, page_count):
+        """Zleca pre-render stron wokół page_number w skali scale"""
+        self.requests.put((page_number, scale, page_count))
+
+    def stop(self):
+        self._stopped.set()
+        self.requests.put(None)
+
+    def _latest_request(self):
+        item = self.requests.get()
+        while not self.requests.empty():
+            item = self.requests.get_nowait()
+            if item is None:
+                break
+        return item
+
+    def run(self):
+        handle = open_document(self.pdf_path, thread_confined=True)
+        doc = handle.doc
+        try:
+            while not self._stopped.is_set():
+                item = self._latest_request()
+                if item is None:
+                    break
+                page_number, scale, page_count = item
+
+                # Najpierw następna, potem poprzednia, potem dalsze strony
+                targets = []
+                for distance in range(1, self.pages_around + 1):
+                    targets += [page_number + distance, page_number - distance]
+
+                for target in targets:
+                    if self._stopped.is_set() or not self.requests.empty():
+                        break
+                    if not 0 <= target < page_count:
+                        continue
+                    key = cache_key(target, scale)
+                    if self.cache.contains(key):
+                        continue
+                    start = time.perf_counter()
+                    with fitz_lock:
+                        image = render_page(doc, target, scale)
+                    self.cache.put(key, image)
+                    print(f"Prefetched page {target + 1} in {(time.perf_counter() - start) * 1000:.0f} ms")
+        finally:
+            handle.close()
@@ -0,0 +1,116 @@
+import math
+import queue
+import threading
+
+import fitz
+from PIL import Image
+
+from pdf_threading import fitz_lock
+from document_pool import open_document
+from page_cache import render_page
+from pixmap_convert import pixmap_to_image
+
+TILE_SIZE = 512
+
+# Podgląd całej strony: 1/4 skali, ale nie więcej niż tyle pikseli
+PREVIEW_MAX_PIXELS = 2048 * 2048
+
+
+def tile_box(tx, ty, width, height, tile_size=TILE_SIZE):
+    """Prostokąt kafla w pikselach strony (przycięty do krawędzi)"""
+    x0, y0 = tx * tile_size, ty * tile_size
+    return x0, y0, min(x0 + tile_size, width), min(y0 + tile_size, height)
+
+
+def render_tile(doc, page_number, scale, box, render_scale=None):
+    """Renderuje fragment strony (box w pikselach przy skali scale).
+
+    render_scale < scale daje szybki podgląd o niższej rozdzielczości,
+    przeskalowany do rozmiaru kafla. Wywoływać z fitz_lock.
+    """
+    render_scale = render_scale or scale
+    page = doc.load_page(page_number)
+    origin = page.rect
+    x0, y0, x1, y1 = box
+    clip = fitz.Rect(
+        origin.x0 + x0 / scale, origin.y0 + y0 / scale,
+        origin.x0 + x1 / scale, origin.y0 + y1 / scale
+    )
+    pix = page.get_pixmap(matrix=fitz.Matrix(render_scale, render_scale), clip=clip)
+    img = pixmap_to_image(pix)
+    size = (int(x1 - x0), int(y1 - y0))
+    if img.size != size:
+        img = img.resize(size, Image.Resampling.BILINEAR)
+    return img
+
+
+def preview_scale(scale, width, height, max_pixels=PREVIEW_MAX_PIXELS):
+    """Skala podglądu strony o rozmiarze width x height px przy skali scale"""
+    limit = (max_pixels / (width * height)) ** 0.5
+    return scale * min(0.25, limit)
+
+
+def crop_preview(preview, width, box):
+    """Kafel wycięty z podglądu całej strony (tylko PIL, bez fitz_lock).
+
+    width: szerokość strony w pikselach skali kafli; box jak w tile_box.
+    """
+    ratio = preview.width / width
+    x0, y0, x1, y1 = box
+    crop = preview.crop((int(x0 * ratio), int(y0 * ratio),
+                         math.ceil(x1 * ratio), math.ceil(y1 * ratio)))
+    return crop.resize((int(x1 - x0), int(y1 - y0)), Image.Resampling.BILINEAR)
+
+
+class TileRenderer(threading.Thread):
+    """Wątek doczytujący kafle w pełnej rozdzielczości.
+
+    Zadania: (generation, page, scale, key, box); key None oznacza podgląd
+    całej strony w skali scale. Wyniki (generation, key, img) trafiają do
+    kolejki results, którą odbiera główny wątek Tk (PhotoImage tylko tam).
+    Kafle spoza wanted (przewinięte poza widok) są pomijane z img None,
+    żeby wątek Tk mógł je zlecić ponownie.
+    """
+
+    def __init__(self, pdf_path):
+        super().__init__(daemon=True, name="TileRenderer")
+        self.pdf_path = pdf_path
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.generation = 0
+        # Podmieniane w całości przez wątek Tk (frozenset kluczy kafli)
+        self.wanted = frozenset()
+        self._stopped = threading.Event()
+
+    def submit(self, generation, page_number, scale, key, box):
+        self.jobs.put((generation, page_number, scale, key, box))
+
+    def submit_preview(self, generation, page_number, scale):
+        self.jobs.put((generation, page_number, scale, None, None))
+
+    def stop(self):
+        self._stopped.set()
+        self.jobs.put(None)
+
+    def run(self):
+        handle = open_document(self.pdf_path, thread_confined=True)
+        doc = handle.doc
+        try:
+            while not self._stopped.is_set():
+                job = self.jobs.get()
+                if job is None:
+                    break
+                generation, page_number, scale, key, box = job
+                if generation != self.generation:
+                    continue  # strona lub zoom już się zmieniły
+                if key is None:
+                    with fitz_lock:
+                        img = render_page(doc, page_number, scale)
+                elif key not in self.wanted:
+                    img = None
+                else:
+                    with fitz_lock:
+                        img = render_tile(doc, page_number, scale, box)
+                self.results.put((generation, key, img))
+        finally:
+            handle.close()
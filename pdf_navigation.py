@@ -1,26 +1,58 @@
+import bisect
 import fitz
 from PIL import Image, ImageTk
 import os
+import time
 import tkinter as tk
 from tkinter import messagebox
 
+from page_cache import PageRenderCache, PagePrefetcher, render_page, cache_key
+from page_tiles import TileRenderer, tile_box, preview_scale, crop_preview, TILE_SIZE
+from pdf_threading import fitz_lock
+from document_pool import open_document
+from pixmap_convert import update_photo
+
 class PDFNavigation:
-    def __init__(self, parent, pdf_path):
+    def __init__(self, parent, pdf_path, cache_bytes=256 * 1024 * 1024, prefetch_pages=2,
+                 tile_threshold_pixels=4096 * 4096, max_tiles=48):
         self.parent = parent
         self.pdf_path = pdf_path
-        self._doc = fitz.open(pdf_path)
+        self._handle = open_document(pdf_path)
+        self._doc = self._handle.doc
         self.page_count = self._doc.page_count
         self.current_page = 0
         self.zoom_level = 1.0  # będzie zaktualizowane później
         self.search_text = None
-        self.search_results = []
+        self.search_results = []  # [(strona, bbox w punktach PDF)]
         self.current_search_index = -1
+        self.search_index = None  # SearchIndex projektu (None - page.search_for)
         
         # These will be set by UI class
         self.canvas = None
         self.page_label = None
         self.canvas_frame = None
         
+        # Cache wyrenderowanych stron + pre-render sąsiednich stron w tle
+        self.render_cache = PageRenderCache(cache_bytes)
+        self.prefetcher = None
+        if prefetch_pages > 0:
+            self.prefetcher = PagePrefetcher(pdf_path, self.render_cache, prefetch_pages)
+            self.prefetcher.start()
+        
+        # Renderowanie kafelkowe dla dużych powiększeń: tylko widoczne kafle,
+        # najpierw podgląd w niskiej rozdzielczości, potem doczytanie w tle
+        self.tile_threshold_pixels = tile_threshold_pixels
+        self.max_tiles = max_tiles
+        self.tiled_page = None
+        self.tiles = {}
+        self._tile_polling = False
+        self.tile_renderer = TileRenderer(pdf_path)
+        self.tile_renderer.start()
+        
+        # Wywoływane po każdym wyświetleniu strony (zmiana strony lub zoomu)
+        self.page_listeners = []
+        self.add_page_listener(self.highlight_search_hits)
+        
         self.setup_keyboard_bindings()
 
     def after_ui_init(self):
@@ -64,12 +96,29 @@ class PDFNavigation:
         if not self.canvas:
             return
             
-        page = self._doc.load_page(page_number)
-        matrix = fitz.Matrix(self.zoom_level * 2, self.zoom_level * 2)
-        pix = page.get_pixmap(matrix=matrix)
+        scale = self.zoom_level * 2
+        self.reset_tiles()
+        with fitz_lock:
+            page_rect = self._doc.load_page(page_number).rect
+        width, height = int(page_rect.width * scale), int(page_rect.height * scale)
+        if width * height > self.tile_threshold_pixels:
+            self.load_page_tiled(page_number, scale, width, height)
+            return
         
-        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-        img_tk = ImageTk.PhotoImage(img)
+        key = cache_key(page_number, scale)
+        start = time.perf_counter()
+        img = self.render_cache.get(key)
+        cache_hit = img is not None
+        if not cache_hit:
+            with fitz_lock:
+                img = render_page(self._doc, page_number, scale)
+            self.render_cache.put(key, img)
+        # PhotoImage poprzedniej strony o tym samym rozmiarze jest nadpisywany
+        img_tk = update_photo(getattr(self.canvas, "image", None), img)
+        self.log_render(page_number, cache_hit, time.perf_counter() - start)
+        
+        if self.prefetcher:
+            self.prefetcher.request(page_number, scale, self.page_count)
         
         # Update canvas
         self.canvas.delete("all")
@@ -84,6 +133,162 @@ class PDFNavigation:
         
         # Center horizontally
         self.center_pdf()
+        self.notify_page_listeners()
+
+    def add_page_listener(self, callback):
+        """callback() runs after a page is shown, e.g. to redraw overlays for the new zoom"""
+        self.page_listeners.append(callback)
+
+    def notify_page_listeners(self):
+        for callback in self.page_listeners:
+            callback()
+
+    def reset_tiles(self):
+        """Drop tiles of the previous page/zoom; pending tile renders become stale"""
+        self.tiled_page = None
+        self.tiles = {}
+        self.tile_renderer.generation += 1
+        self.tile_renderer.wanted = frozenset()
+
+    def load_page_tiled(self, page_number, scale, width, height):
+        """Show a page too large to rasterise at once as a grid of tiles"""
+        self.tiled_page = {
+            'page': page_number,
+            'scale': scale,
+            'width': width,
+            'height': height,
+            'generation': self.tile_renderer.generation,
+            'preview_key': cache_key(page_number, preview_scale(scale, width, height)),
+            'preview': None
+        }
+        print(f"Page {page_number + 1}: tiled rendering ({width}x{height} px)")
+        
+        self.canvas.delete("all")
+        self.canvas.image = None
+        # Tło o rozmiarze całej strony - bbox("all") i scrollregion jak dla obrazu
+        self.canvas.create_rectangle(0, 0, width, height, fill="white", outline="", tags="page_bg")
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        
+        # Podgląd całej strony w niskiej rozdzielczości - z cache albo z wątku
+        # kafli (pierwsze zadanie), nigdy pod fitz_lock w wątku Tk
+        self.tiled_page['preview'] = self.render_cache.get(self.tiled_page['preview_key'])
+        if self.tiled_page['preview'] is None:
+            self.tile_renderer.submit_preview(self.tiled_page['generation'], page_number,
+                                              self.tiled_page['preview_key'][1])
+        
+        self.update_page_label()
+        self.center_pdf()
+        self.update_tiles()
+        if not self._tile_polling:
+            self._tile_polling = True
+            self.canvas.after(30, self.poll_tiles)
+        self.notify_page_listeners()
+
+    def visible_tiles(self, margin=1):
+        """Tile indices intersecting the viewport, plus a margin of tiles around it"""
+        x0, y0 = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        x1 = x0 + self.canvas.winfo_width()
+        y1 = y0 + self.canvas.winfo_height()
+        tiles_x = (self.tiled_page['width'] - 1) // TILE_SIZE
+        tiles_y = (self.tiled_page['height'] - 1) // TILE_SIZE
+        tx0 = max(0, int(x0 // TILE_SIZE) - margin)
+        ty0 = max(0, int(y0 // TILE_SIZE) - margin)
+        tx1 = min(tiles_x, int(x1 // TILE_SIZE) + margin)
+        ty1 = min(tiles_y, int(y1 // TILE_SIZE) + margin)
+        return [(tx, ty) for ty in range(ty0, ty1 + 1) for tx in range(tx0, tx1 + 1)]
+
+    def update_tiles(self):
+        """Create preview tiles for the viewport and queue full-resolution renders"""
+        if not self.tiled_page or not self.canvas:
+            return
+        state = self.tiled_page
+        wanted = self.visible_tiles()
+        # Zlecone wcześniej kafle spoza widoku renderer pomija
+        self.tile_renderer.wanted = frozenset(wanted)
+        
+        # Pamięć ograniczona niezależnie od zoomu: usuwamy kafle poza widokiem
+        if len(self.tiles) + len(wanted) > self.max_tiles:
+            for key in [k for k in self.tiles if k not in wanted]:
+                item = self.tiles.pop(key)['item']
+                if item is not None:
+                    self.canvas.delete(item)
+        
+        for key in wanted:
+            tile = self.tiles.get(key)
+            if tile is None:
+                tile = self.tiles[key] = {'item': None, 'photo': None, 'refined': False, 'queued': False}
+                if state['preview'] is not None:
+                    self.show_tile(key, crop_preview(state['preview'], state['width'], self.tile_box(key)))
+            if not tile['refined'] and not tile['queued']:
+                tile['queued'] = True
+                self.tile_renderer.submit(state['generation'], state['page'], state['scale'],
+                                          key, self.tile_box(key))
+
+    def tile_box(self, key):
+        return tile_box(key[0], key[1], self.tiled_page['width'], self.tiled_page['height'])
+
+    def show_tile(self, key, img):
+        """Put img on the canvas for a tile (Tk main thread)"""
+        tile = self.tiles[key]
+        if tile['item'] is None:
+            box = self.tile_box(key)
+            tile['photo'] = ImageTk.PhotoImage(img)
+            tile['item'] = self.canvas.create_image(box[0], box[1], image=tile['photo'],
+                                                    anchor="nw", tags="page_tile")
+            self.canvas.tag_lower(tile['item'])
+            self.canvas.tag_lower("page_bg")
+            return
+        # Podgląd ma rozmiar kafla - pełna rozdzielczość trafia do tego samego PhotoImage
+        photo = update_photo(tile['photo'], img)
+        if photo is not tile['photo']:
+            tile['photo'] = photo
+            self.canvas.itemconfig(tile['item'], image=photo)
+
+    def poll_tiles(self):
+        """Swap in tiles finished by the background renderer (Tk main thread)"""
+        if not self.tiled_page:
+            self._tile_polling = False
+            return
+        state = self.tiled_page
+        skipped = False
+        while not self.tile_renderer.results.empty():
+            generation, key, img = self.tile_renderer.results.get_nowait()
+            if generation != state['generation']:
+                continue
+            if key is None:
+                # Podgląd strony: kafle bez pełnej rozdzielczości dostają wycinek
+                state['preview'] = img
+                self.render_cache.put(state['preview_key'], img)
+                for tile_key, tile in self.tiles.items():
+                    if not tile['refined']:
+                        self.show_tile(tile_key, crop_preview(img, state['width'], self.tile_box(tile_key)))
+                continue
+            tile = self.tiles.get(key)
+            if tile is None:
+                continue
+            tile['queued'] = False
+            if img is None:
+                skipped = True  # pominięty poza widokiem
+                continue
+            self.show_tile(key, img)
+            tile['refined'] = True
+        if skipped:
+            # Pominięte kafle, które tymczasem znów są w widoku, idą ponownie do kolejki
+            self.update_tiles()
+        self.canvas.after(30, self.poll_tiles)
+
+    def on_view_changed(self):
+        """Called whenever the canvas scrolls; renders newly exposed tiles"""
+        if self.tiled_page:
+            self.update_tiles()
+
+    def log_render(self, page_number, cache_hit, seconds):
+        stats = self.render_cache.stats()
+        print(
+            f"Page {page_number + 1}: {'cache hit' if cache_hit else 'rendered'} in {seconds * 1000:.0f} ms "
+            f"(cache: {stats['pages']} pages, {stats['bytes'] / (1024 * 1024):.0f} MB, "
+            f"{stats['hits']} hits / {stats['misses']} misses)"
+        )
 
     def scroll_vertical(self, units):
         """Scroll vertically by given number of units"""
@@ -114,35 +319,83 @@ class PDFNavigation:
             self.current_page = page_num
             self.load_page(self.current_page)
 
+    def set_search_index(self, index):
+        """Use a project SearchIndex for search instead of scanning pages"""
+        self.search_index = index
+
     def start_search(self, text):
         """Start new search"""
         self.search_text = text
         self.search_results = []
         self.current_search_index = -1
+        if self.search_index is not None and self.search_index.is_complete():
+            # Wszystkie wystąpienia od razu; pierwsze od bieżącej strony
+            self.search_results = self.search_index.search(text)
+            pages = [page_num for page_num, _ in self.search_results]
+            self.current_search_index = bisect.bisect_left(pages, self.current_page) - 1
         self.find_next()
 
     def find_next(self):
         """Find next occurrence of search text"""
         if not self.search_text:
             return
-            
-        start_page = self.current_page
+        
+        if self.search_index is not None and self.search_index.is_complete():
+            if self.current_search_index < len(self.search_results) - 1:
+                self.current_search_index += 1
+                self.show_search_hit()
+                return
+            messagebox.showinfo("Search Complete", "No more occurrences found.")
+            return
+        
+        # Indeks jeszcze niekompletny (ekstrakcja w tle) - przeszukiwanie stron
         if self.search_results and self.current_search_index < len(self.search_results) - 1:
             self.current_search_index += 1
+            self.show_search_hit()
             return
             
-        # Search through pages
+        start_page = self.search_results[-1][0] + 1 if self.search_results else self.current_page
         for page_num in range(start_page, self.page_count):
-            page = self._doc.load_page(page_num)
-            text_instances = page.search_for(self.search_text)
+            with fitz_lock:
+                page = self._doc.load_page(page_num)
+                text_instances = page.search_for(self.search_text)
             if text_instances:
-                self.goto_page(page_num)
-                self.search_results.extend(text_instances)
-                self.current_search_index = len(self.search_results) - 1
+                self.search_results.extend((page_num, tuple(rect)) for rect in text_instances)
+                self.current_search_index += 1
+                self.show_search_hit()
                 return
                 
         messagebox.showinfo("Search Complete", "No more occurrences found.")
 
+    def show_search_hit(self):
+        """Go to the page of the current search hit and highlight it"""
+        page_num, _ = self.search_results[self.current_search_index]
+        if page_num != self.current_page:
+            self.goto_page(page_num)
+        else:
+            self.highlight_search_hits()
+            self.update_page_label()
+
+    def highlight_search_hits(self):
+        """Draw all search hits of the current page (the current one stronger)"""
+        if not self.canvas:
+            return
+        self.canvas.delete("search_hit")
+        if not self.search_results:
+            return
+        scale = self.get_zoom_level()
+        for i, (page_num, bbox) in enumerate(self.search_results):
+            if page_num != self.current_page:
+                continue
+            x0, y0, x1, y1 = (c * scale for c in bbox)
+            current = i == self.current_search_index
+            self.canvas.create_rectangle(
+                x0, y0, x1, y1,
+                outline="orange" if current else "yellow",
+                width=3 if current else 2,
+                tags="search_hit"
+            )
+
     def print_pdf(self):
         """Print the PDF"""
         try:
@@ -174,9 +427,10 @@ class PDFNavigation:
 
     def update_page_label(self):
         if self.page_label:
-            self.page_label.config(
-                text=f"Page {self.current_page + 1} of {self.page_count} (Zoom: {int(self.zoom_level * 100)}%)"
-            )
+            text = f"Page {self.current_page + 1} of {self.page_count} (Zoom: {int(self.zoom_level * 100)}%)"
+            if self.search_results and self.search_index is not None and self.search_index.is_complete():
+                text += f" - hit {self.current_search_index + 1} of {len(self.search_results)}"
+            self.page_label.config(text=text)
 
     def get_current_page(self):
         return self.current_page
@@ -187,6 +441,18 @@ class PDFNavigation:
     def get_doc(self):
         return self._doc
 
+    def close(self):
+        """Stop background rendering and release the document"""
+        if self.prefetcher:
+            self.prefetcher.stop()
+            self.prefetcher.join(timeout=2)
+            self.prefetcher = None
+        self.render_cache.clear()
+        self.reset_tiles()
+        self.tile_renderer.stop()
+        self.tile_renderer.join(timeout=2)
+        self._handle.close()
+
     def calculate_fit_zoom(self):
         """Calculate zoom level to fit page height in window"""
         if not self.canvas_frame:
@@ -197,8 +463,8 @@ class PDFNavigation:
         frame_width = self.canvas_frame.winfo_width()
 
         # Get current page dimensions at base zoom (1.0)
-        page = self._doc.load_page(self.current_page)
-        page_rect = page.rect
+        with fitz_lock:
+            page_rect = self._doc.load_page(self.current_page).rect
         page_width = page_rect.width
         page_height = page_rect.height
 
@@ -0,0 +1,11 @@
+import os
+import threading
+
+# PyMuPDF nie jest bezpieczny wątkowo (wspólny kontekst MuPDF), nawet dla
+# osobnych dokumentów. Każde wywołanie fitz poza głównym wątkiem Tk - oraz
+# w głównym wątku, jeśli w tle działa inny wątek - musi trzymać tę blokadę.
+fitz_lock = threading.RLock()
+
+# Proces potomny (fork) dziedziczy blokadę w stanie z chwili forka - jeśli
+# trzymał ją inny wątek rodzica, nikt jej w potomku nie zwolni
+os.register_at_fork(after_in_child=fitz_lock._at_fork_reinit)
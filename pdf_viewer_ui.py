@@ -35,7 +35,7 @@ class PDFViewerUI:
         self.v_scrollbar = ttk.Scrollbar(self.canvas_frame, orient="vertical", command=self.canvas.yview)
         self.h_scrollbar = ttk.Scrollbar(self.canvas_frame, orient="horizontal", command=self.canvas.xview)
         
-        self.canvas.configure(yscrollcommand=self.v_scrollbar.set, xscrollcommand=self.h_scrollbar.set)
+        self.canvas.configure(yscrollcommand=self.on_yscroll, xscrollcommand=self.on_xscroll)
         
         # Grid layout
         self.v_scrollbar.pack(side="right", fill="y")
@@ -56,6 +56,15 @@ class PDFViewerUI:
         # Bind resize event
         self.canvas_frame.bind('<Configure>', self.on_resize)
 
+    def on_yscroll(self, first, last):
+        """Every vertical view change (scrollbar, keys, wheel) ends up here"""
+        self.v_scrollbar.set(first, last)
+        self.nav.on_view_changed()
+
+    def on_xscroll(self, first, last):
+        self.h_scrollbar.set(first, last)
+        self.nav.on_view_changed()
+
     def on_resize(self, event):
         """Handle window resize"""
         # You might want to add some debouncing here
@@ -129,4 +138,7 @@ class PDFViewerUI:
         return self.nav.get_current_page()
 
     def get_zoom_level(self):
-        return self.nav.get_zoom_level()
\ No newline at end of file
+        return self.nav.get_zoom_level()
+
+    def add_page_listener(self, callback):
+        self.nav.add_page_listener(callback)
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""Konwersja fitz.Pixmap -> PIL/Tk bez zbędnych kopii.
+
+Image.frombytes(mode, size, pix.samples) kopiuje próbki dwa razy: pix.samples
+tworzy nowy obiekt bytes, a PIL kopiuje go do własnej pamięci. Tutaj PIL
+czyta bezpośrednio z pix.samples_mv (bufor MuPDF), więc zostaje jedna kopia,
+a przy into= również ona trafia do istniejącej pamięci obrazu.
+
+Obrazy nie współdzielą pamięci z pixmapą - pixmapa (obiekt MuPDF) może być
+zwolniona od razu, wewnątrz fitz_lock, a obraz przeżyć ją w cache.
+"""
+import numpy as np
+from PIL import Image
+
+MODES = {1: 'L', 3: 'RGB', 4: 'RGBA'}
+
+
+def pixmap_mode(pix):
+    try:
+        return MODES[pix.n]
+    except KeyError:
+        raise ValueError(f"Unsupported pixmap with {pix.n} components")
+
+
+def pixmap_to_image(pix, into=None):
+    """Obraz PIL z próbek pixmapy (jedna kopia zamiast dwóch).
+
+    into: obraz o tym samym trybie i rozmiarze, którego pamięć zostanie
+    nadpisana zamiast alokowania nowej (wywołujący musi wiedzieć, że
+    poprzednia zawartość nie jest już potrzebna).
+    """
+    mode = pixmap_mode(pix)
+    size = (pix.width, pix.height)
+    if into is not None and into.mode == mode and into.size == size:
+        into.frombytes(pix.samples_mv, 'raw', mode, pix.stride)
+        return into
+    return Image.frombytes(mode, size, pix.samples_mv, 'raw', mode, pix.stride)
+
+
+def pixmap_array(pix):
+    """Widok NumPy (wysokość, szerokość, składowe) na próbki pixmapy - bez kopii.
+
+    Ważny tylko, dopóki pixmapa istnieje (i wewnątrz fitz_lock).
+    """
+    rows = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.stride)
+    return rows[:, :pix.width * pix.n].reshape(pix.height, pix.width, pix.n)
+
+
+def pixmap_to_bitonal(pix, threshold):
+    """Obraz '1' z pixmapy w skali szarości - progowanie na widoku NumPy,
+    bez pośredniego obrazu 'L'"""
+    if pix.n != 1:
+        raise ValueError("Bitonal conversion needs a grayscale pixmap (fitz.csGRAY)")
+    return Image.fromarray(pixmap_array(pix)[:, :, 0] >= threshold)
+
+
+def update_photo(photo, image):
+    """PhotoImage z obrazem image; istniejący PhotoImage tego samego rozmiaru
+    jest nadpisywany (paste) zamiast tworzenia nowego obrazu Tk"""
+    from PIL import ImageTk
+
+    if photo is not None and photo.width() == image.width and photo.height() == image.height:
+        photo.paste(image)
+        return photo
+    return ImageTk.PhotoImage(image)
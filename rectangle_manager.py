@@ -13,7 +13,13 @@ class RectangleManager:
         # Minimalne wymiary prostokąta
         self.min_size = 20
         
+        self.poll_interval_ms = 50
+        
         self.setup_bindings()
+        self.canvas.after(self.poll_interval_ms, self.poll_screenshots)
+        
+        # Prostokąty są w przestrzeni PDF - po zmianie strony lub zoomu rysujemy je od nowa
+        self.pdf_viewer.add_page_listener(self.redraw_rectangles)
         
     def setup_bindings(self):
         """Ustawienie obsługi zdarzeń myszy"""
@@ -71,75 +77,102 @@ class RectangleManager:
         self.start_x = None
         self.start_y = None
         
+    def to_pdf(self, coords):
+        """Współrzędne canvasu -> przestrzeń PDF (punkty) przy aktualnym zoomie"""
+        scale = self.pdf_viewer.get_zoom_level()
+        return [c / scale for c in coords]
+        
+    def to_canvas(self, coords):
+        """Przestrzeń PDF -> współrzędne canvasu przy aktualnym zoomie"""
+        scale = self.pdf_viewer.get_zoom_level()
+        return [c * scale for c in coords]
+        
     def create_rectangle(self, coords):
-        """Utwórz nowy prostokąt i zapisz jego dane"""
+        """Utwórz nowy prostokąt i zapisz jego dane (coords - współrzędne canvasu)"""
         try:
             current_page = self.pdf_viewer.get_current_page()
+            pdf_coords = self.to_pdf(coords)
             
             # Pobierz następne ID prostokąta
-            rectangles = self.data_manager.load_rectangle_data()
-            next_id = max([r['id'] for r in rectangles], default=0) + 1
+            next_id = self.data_manager.next_rectangle_id()
             
-            # Utwórz podstawowe informacje o prostokącie
+            # Utwórz podstawowe informacje o prostokącie - ścieżki obrazów
+            # uzupełnia wątek roboczy po zapisaniu plików
             rect_info = {
                 'id': next_id,
                 'page': current_page,
-                'rect': coords
+                'rect': pdf_coords,
+                'coord_space': 'pdf',
+                'image_path': '',
+                'thumbnail_path': ''
             }
             
-            # Zrób i zapisz screenshot zaznaczonego obszaru
-            page = self.pdf_viewer.get_doc().load_page(current_page)
-            screenshot = self.screenshot_manager.capture_screenshot(
-                page, coords, self.pdf_viewer.get_doc(),
-                self.pdf_viewer.get_zoom_level()
-            )
-            
-            # Zapisz screenshot i miniaturę
-            paths = self.screenshot_manager.save_screenshot(
-                screenshot, current_page, next_id
-            )
-            rect_info['image_path'] = paths['image_path']
-            rect_info['thumbnail_path'] = paths['thumbnail_path']
-            
-            # Zapisz dane prostokąta
-            self.data_manager.add_rectangle(rect_info)
-            
-            # Narysuj prostokąt na canvas
+            # Zapisz dane prostokąta i od razu go narysuj
+            rect = self.data_manager.add_rectangle(rect_info)
             self.draw_rectangle(rect_info)
             
-            # Aktualizuj listę screenshotów jeśli jest dostępna
+            # Dodaj wiersz do listy screenshotów jeśli jest dostępna
             if hasattr(self, 'screenshot_list'):
-                rectangles = self.data_manager.load_rectangle_data()
-                self.screenshot_list.update_list(rectangles)
+                self.screenshot_list.add_rectangle(rect)
+            
+            # Render 300 DPI, JPEG i miniatura w puli wątków
+            # (zoom 1.0 - współrzędne są już w przestrzeni PDF)
+            self.screenshot_manager.capture_async(current_page, pdf_coords, 1.0, next_id)
             
             return rect_info
             
         except Exception as e:
             print(f"Error creating rectangle: {e}")
             raise
+
+    def poll_screenshots(self):
+        """Pick up screenshots finished by worker threads (runs in the Tk loop)"""
+        if not self.canvas.winfo_exists():
+            return
+        while not self.screenshot_manager.completed.empty():
+            rect_id, paths, error = self.screenshot_manager.completed.get_nowait()
+            if error or not paths:
+                print(f"Error capturing screenshot for rectangle {rect_id}: {error}")
+                continue
+                
+            updated = self.data_manager.update_rectangle(rect_id, paths)
+            if updated is None:
+                # Prostokąt usunięto zanim zrzut był gotowy
+                self.screenshot_manager.delete_screenshot(paths['image_path'], rect_id)
+                continue
+                
+            if hasattr(self, 'screenshot_list'):
+                self.screenshot_list.set_thumbnail(rect_id, paths['thumbnail_path'])
+                
+        self.canvas.after(self.poll_interval_ms, self.poll_screenshots)
         
     def draw_rectangle(self, rect_info):
         """Narysuj stały prostokąt na canvas"""
-        coords = rect_info['rect']
+        coords = self.to_canvas(rect_info['rect'])
         self.canvas.create_rectangle(
             coords[0], coords[1], coords[2], coords[3],
             outline="red",
             width=2,
-            tags=f"rect_{rect_info['id']}"
+            tags=("rect", f"rect_{rect_info['id']}")
         )
         
     def clear_rectangles(self):
         """Usuń wszystkie prostokąty z canvas"""
         self.canvas.delete("rect")
         
-    def redraw_rectangles(self, rectangles):
+    def redraw_rectangles(self):
         """Przerysuj wszystkie prostokąty dla aktualnej strony"""
         self.clear_rectangles()
         current_page = self.pdf_viewer.get_current_page()
         
-        for rect in rectangles:
-            if rect['page'] == current_page:
-                self.draw_rectangle(rect)
+        for rect in self.data_manager.rectangles_on_page(current_page):
+            self.draw_rectangle(rect)
+            
+    def rectangle_at(self, x, y):
+        """Prostokąt aktualnej strony pod punktem canvasu (najnowszy), albo None"""
+        px, py = self.to_pdf([x, y])
+        hits = self.data_manager.rectangles_at(self.pdf_viewer.get_current_page(), px, py)
+        return max(hits, key=lambda r: r['id'], default=None)
                 
     def set_screenshot_list(self, screenshot_list):
         """Ustaw referencję do listy screenshotów"""
@@ -0,0 +1,95 @@
+import os
+import statistics
+
+from PIL import Image
+
+# Zrzuty prostokątów są renderowane w 300 DPI (ScreenshotManager.capture_screenshot)
+SCREENSHOT_DPI = 300
+
+
+def needs_migration(rect):
+    return rect.get('coord_space') != 'pdf'
+
+
+def screenshot_path(rect, project_path):
+    """Ścieżka zapisanego zrzutu prostokąta (także po przeniesieniu projektu)"""
+    path = rect.get('image_path')
+    if not path:
+        return None
+    if os.path.exists(path):
+        return path
+    moved = os.path.join(project_path, 'screenshots', os.path.basename(path))
+    return moved if os.path.exists(moved) else None
+
+
+def recover_zoom(rect, image_size, dpi=SCREENSHOT_DPI):
+    """Skala canvas/PDF, przy której narysowano prostokąt.
+
+    Zrzut ma (szerokość prostokąta w punktach PDF) * dpi / 72 pikseli, więc
+    skala = szerokość na canvasie / szerokość w PDF. Zrzut przycięty do
+    strony jest mniejszy i zawyża skalę - bierzemy mniejszą z dwóch osi.
+    """
+    x0, y0, x1, y1 = rect['rect']
+    image_w, image_h = image_size
+    candidates = []
+    if image_w > 0:
+        candidates.append(abs(x1 - x0) / (image_w * 72 / dpi))
+    if image_h > 0:
+        candidates.append(abs(y1 - y0) / (image_h * 72 / dpi))
+    return min(candidates) if candidates else None
+
+
+def migrate_to_pdf_space(store, project_path):
+    """Jednorazowa konwersja prostokątów zapisanych we współrzędnych canvasu.
+
+    Skala każdego prostokąta odtwarzana jest z rozmiaru jego zrzutu; bez
+    zrzutu używana jest mediana skal pozostałych prostokątów projektu.
+    Przeliczone prostokąty dostają 'coord_space': 'pdf', a wynik ekstrakcji
+    (liczony dla złego regionu) jest oznaczany do ponownego przetworzenia.
+    Zwraca (przeliczone, pominięte).
+    """
+    legacy = [rect for rect in store.all() if needs_migration(rect)]
+    if not legacy:
+        return 0, 0
+
+    zooms = {}
+    for rect in legacy:
+        path = screenshot_path(rect, project_path)
+        if path is None:
+            continue
+        try:
+            with Image.open(path) as img:
+                zoom = recover_zoom(rect, img.size)
+        except OSError as e:
+            print(f"Cannot read screenshot of rectangle {rect['id']}: {e}")
+            continue
+        if zoom:
+            zooms[rect['id']] = zoom
+
+    fallback = statistics.median(zooms.values()) if zooms else None
+
+    updates = {}
+    skipped = 0
+    for rect in legacy:
+        zoom = zooms.get(rect['id'], fallback)
+        if not zoom:
+            print(f"Rectangle {rect['id']}: no screenshot to recover its zoom, left unchanged")
+            skipped += 1
+            continue
+        pdf_rect = [c / zoom for c in rect['rect']]
+        fields = {
+            'rect': pdf_rect,
+            'coord_space': 'pdf',
+            'dimensions': {
+                'width': pdf_rect[2] - pdf_rect[0],
+                'height': pdf_rect[3] - pdf_rect[1]
+            }
+        }
+        if 'extraction_status' in rect:
+            fields['extraction_status'] = 'pending'
+        updates[rect['id']] = fields
+
+    migrated = store.update_many(updates)
+    if migrated:
+        store.compact()
+    return migrated, skipped
@@ -0,0 +1,149 @@
+import math
+
+
+class SpatialGrid:
+    """Indeks przestrzenny prostokątów jednej strony (siatka kubełków).
+
+    Każdy prostokąt jest wpisany do wszystkich komórek, które przecina, więc
+    zapytanie o punkt lub obszar sprawdza tylko kilka kubełków zamiast
+    wszystkich prostokątów na stronie.
+    """
+
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.cells = {}   # (cx, cy) -> set(id)
+        self.bboxes = {}  # id -> (x0, y0, x1, y1)
+
+    def _cells(self, bbox):
+        x0, y0, x1, y1 = bbox
+        size = self.cell_size
+        for cx in range(math.floor(x0 / size), math.floor(x1 / size) + 1):
+            for cy in range(math.floor(y0 / size), math.floor(y1 / size) + 1):
+                yield (cx, cy)
+
+    def insert(self, rect_id, bbox):
+        bbox = tuple(bbox)
+        self.bboxes[rect_id] = bbox
+        for cell in self._cells(bbox):
+            self.cells.setdefault(cell, set()).add(rect_id)
+
+    def remove(self, rect_id):
+        bbox = self.bboxes.pop(rect_id, None)
+        if bbox is None:
+            return
+        for cell in self._cells(bbox):
+            ids = self.cells.get(cell)
+            if ids is not None:
+                ids.discard(rect_id)
+                if not ids:
+                    del self.cells[cell]
+
+    def query(self, bbox):
+        """Id prostokątów przecinających bbox"""
+        x0, y0, x1, y1 = bbox
+        found = set()
+        for cell in self._cells(bbox):
+            for rect_id in self.cells.get(cell, ()):
+                if rect_id in found:
+                    continue
+                rx0, ry0, rx1, ry1 = self.bboxes[rect_id]
+                if rx0 <= x1 and x0 <= rx1 and ry0 <= y1 and y0 <= ry1:
+                    found.add(rect_id)
+        return found
+
+    def hit(self, x, y):
+        return self.query((x, y, x, y))
+
+    def __len__(self):
+        return len(self.bboxes)
+
+
+class RectangleModel:
+    """Autorytatywny stan prostokątów projektu w pamięci.
+
+    Mapa id, indeks stron i siatka przestrzenna per strona. Nie jest
+    bezpieczny wątkowo sam w sobie - synchronizuje go RectangleStore.
+    """
+
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.rectangles = {}  # id -> dane (kolejność dodania)
+        self.pages = {}       # strona -> SpatialGrid
+        self.max_id = 0
+
+    def reset(self, rectangles=()):
+        self.rectangles = {}
+        self.pages = {}
+        self.max_id = 0
+        for rect in rectangles:
+            self.add(rect)
+
+    def add(self, rect):
+        self.remove(rect['id'])
+        self.rectangles[rect['id']] = rect
+        self.max_id = max(self.max_id, rect['id'])
+        grid = self.pages.get(rect['page'])
+        if grid is None:
+            grid = self.pages[rect['page']] = SpatialGrid(self.cell_size)
+        grid.insert(rect['id'], self._bbox(rect))
+        return rect
+
+    def update(self, rect_id, fields):
+        rect = self.rectangles.get(rect_id)
+        if rect is None:
+            return None
+        if 'page' in fields or 'rect' in fields:
+            self.remove(rect_id)
+            rect.update(fields)
+            self.add(rect)
+        else:
+            rect.update(fields)
+        return rect
+
+    def remove(self, rect_id):
+        rect = self.rectangles.pop(rect_id, None)
+        if rect is not None:
+            grid = self.pages.get(rect['page'])
+            if grid is not None:
+                grid.remove(rect_id)
+                if not len(grid):
+                    del self.pages[rect['page']]
+        return rect
+
+    @staticmethod
+    def _bbox(rect):
+        x0, y0, x1, y1 = rect['rect']
+        return (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+
+    def get(self, rect_id):
+        return self.rectangles.get(rect_id)
+
+    def all(self):
+        return list(self.rectangles.values())
+
+    def on_page(self, page):
+        grid = self.pages.get(page)
+        if grid is None:
+            return []
+        return [self.rectangles[rect_id] for rect_id in grid.bboxes]
+
+    def hit_test(self, page, x, y):
+        """Prostokąty strony zawierające punkt (x, y)"""
+        grid = self.pages.get(page)
+        if grid is None:
+            return []
+        return [self.rectangles[rect_id] for rect_id in grid.hit(x, y)]
+
+    def overlapping(self, page, bbox):
+        """Prostokąty strony przecinające bbox"""
+        grid = self.pages.get(page)
+        if grid is None:
+            return []
+        return [self.rectangles[rect_id] for rect_id in grid.query(bbox)]
+
+    def next_id(self):
+        """Id nie są używane ponownie w trakcie sesji (nazwy plików zrzutów)"""
+        return self.max_id + 1
+
+    def __len__(self):
+        return len(self.rectangles)
@@ -1,32 +1,100 @@
-import json
 import time
 import os
 import threading
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
 from queue import Queue
 from text_extraction_manager import TextExtractionManager
+from rectangle_store import RectangleStore
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # watchdog potrzebny tylko w trybie watch_file
+    Observer = None
+    FileSystemEventHandler = object
 
 class RectangleProcessor:
-    def __init__(self, json_path, pdf_path, status_callback=None):
+    """Ekstrakcja tekstu dla nowych prostokątów w puli wątków.
+
+    Nowe prostokąty trafiają do kolejki jobs bezpośrednio z
+    DataManager.add_rectangle. Wyniki są zapisywane przez RectangleStore
+    (model w pamięci + jeden wątek piszący dziennik). Obserwowanie pliku
+    rectangle_map.json (watch_file=True) jest potrzebne tylko wtedy, gdy
+    prostokąty dopisuje zewnętrzny proces.
+    Komunikaty dla status_callback (zwykle widżety Tk) trafiają do kolejki
+    status_messages; poll_status przekazuje je w wątku Tk (root.after).
+    """
+
+    def __init__(self, json_path, pdf_path, status_callback=None, store=None,
+                 workers=2, watch_file=False):
         self.json_path = json_path
+        self.store = store or RectangleStore(json_path, pdf_path)
         self.pdf_path = pdf_path
         self.processed_ids = set()
-        self.event_queue = Queue()
+        self.jobs = Queue()
         self.lock = threading.Lock()
         self.status_callback = status_callback
-        
+        self.status_messages = Queue()
+        self.observer = None
+
         # Initialize TextExtractionManager
-        self.extraction_manager = TextExtractionManager(pdf_path, json_path)
-        
-        self.setup_watcher()
+        self.extraction_manager = TextExtractionManager(pdf_path, json_path, self.store)
+
+        self.workers = [
+            threading.Thread(target=self._worker_loop, daemon=True, name=f"RectangleWorker-{i}")
+            for i in range(workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+        # Prostokąty bez wyniku ekstrakcji z poprzedniej sesji
+        for rect in self.store.all():
+            if rect.get('extraction_status') != 'completed':
+                self.submit(rect)
+
+        if watch_file:
+            self.setup_watcher()
         self.update_status("Rectangle Processor started")
 
     def update_status(self, message):
+        """Wywoływane z dowolnego wątku - komunikat czeka na poll_status"""
         if self.status_callback:
-            self.status_callback(message)
+            self.status_messages.put(message)
+
+    def poll_status(self):
+        """Deliver queued status messages to status_callback (call from the Tk main thread)"""
+        while not self.status_messages.empty():
+            self.status_callback(self.status_messages.get_nowait())
+
+    def submit(self, rect):
+        """Enqueue a rectangle for text extraction (each id is processed once)"""
+        with self.lock:
+            if rect['id'] in self.processed_ids:
+                return
+            self.processed_ids.add(rect['id'])
+        self.jobs.put(rect)
+
+    def _worker_loop(self):
+        while True:
+            rect = self.jobs.get()
+            try:
+                if rect is None:
+                    return
+                self.process_rectangle(rect)
+            finally:
+                self.jobs.task_done()
+
+    def process_rectangle(self, rect):
+        self.update_status(f"Processing rectangle ID {rect['id']}")
+        try:
+            print("Starting text extraction for rectangle:", rect['id'])  # Debug
+            result = self.extraction_manager.process_rectangle(rect)
+            print("Text extraction result:", result)  # Debug
+        except Exception as e:
+            self.update_status(f"Error processing rectangle ID {rect['id']}: {e}")
 
     def setup_watcher(self):
+        if Observer is None:
+            raise RuntimeError("watch_file requires the watchdog package")
         self.observer = Observer()
         self.observer.schedule(
             JsonFileHandler(self.on_json_change),
@@ -37,47 +105,26 @@ class RectangleProcessor:
         self.update_status("Watching for changes in rectangle_map.json")
 
     def on_json_change(self):
+        """Tylko tryb watch_file: prostokąty dopisane przez inne procesy"""
         time.sleep(0.2)  # Debouncing
-        with self.lock:
-            try:
-                with open(self.json_path, 'r') as f:
-                    content = f.read()
-                    data = json.loads(content) if content else {"rectangles": []}
-            except json.JSONDecodeError:
-                self.update_status("Error: Failed to parse JSON file")
-                return
+        if not self.store.refresh():
+            return  # zapis własny - nowe prostokąty są już w kolejce
 
-            modified = False
-            for rect in data.get('rectangles', []):
-                if rect['id'] not in self.processed_ids and not rect.get('eventComplete', False):
-                    self.event_queue.put(rect)
-                    rect['eventComplete'] = True
-                    self.processed_ids.add(rect['id'])
-                    modified = True
-                    self.update_status(f"New rectangle detected: ID {rect['id']}")
-
-            if modified:
-                with open(self.json_path, 'w') as f:
-                    json.dump(data, f, indent=2)
-                self.update_status("Rectangle map updated with processed items")
-
-            self.process_events()
-
-    def process_events(self):
-        while not self.event_queue.empty():
-            rect = self.event_queue.get()
-            self.update_status(f"Processing rectangle ID {rect['id']}")
-            try:
-                print("Starting text extraction for rectangle:", rect['id'])  # Debug
-                result = self.extraction_manager.process_rectangle(rect)
-                print("Text extraction result:", result)  # Debug
-            except Exception as e:
-                self.update_status(f"Error processing rectangle ID {rect['id']}: {e}")
+        for rect in self.store.all():
+            if rect['id'] not in self.processed_ids and rect.get('extraction_status') != 'completed':
+                self.update_status(f"New rectangle detected: ID {rect['id']}")
+                self.submit(rect)
 
     def stop(self):
         self.update_status("Stopping Rectangle Processor...")
-        self.observer.stop()
-        self.observer.join()
+        if self.observer:
+            self.observer.stop()
+            self.observer.join()
+        for _ in self.workers:
+            self.jobs.put(None)
+        for worker in self.workers:
+            worker.join()
+        self.extraction_manager.close()
         self.update_status("Rectangle Processor stopped")
 
 class JsonFileHandler(FileSystemEventHandler):
@@ -85,5 +132,5 @@ class JsonFileHandler(FileSystemEventHandler):
         self.callback = callback
 
     def on_modified(self, event):
-        if event.src_path.endswith('rectangle_map.json'):
-            self.callback()
\ No newline at end of file
+        if event.src_path.endswith(('rectangle_map.json', 'rectangle_map.journal')):
+            self.callback()
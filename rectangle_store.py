@@ -0,0 +1,249 @@
+import json
+import os
+import queue
+import threading
+
+from rectangle_model import RectangleModel
+
+_COMPACT = object()
+_STOP = object()
+
+
+class RectangleStore:
+    """Prostokąty projektu: model w pamięci + dziennik zmian zapisywany w tle.
+
+    Źródłem prawdy jest RectangleModel (mapa id, indeks stron, indeks
+    przestrzenny). Każda zmiana od razu trafia do modelu, a linia dziennika
+    (rectangle_map.journal, jedna operacja JSON na linię) jest zapisywana
+    przez wątek piszący - zapis nie blokuje wywołującego.
+    rectangle_map.json jest skompaktowanym snapshotem w dotychczasowym formacie.
+    """
+
+    def __init__(self, data_file, pdf_path=None, compact_every=1000, read_only=False):
+        """read_only: tylko odczyt (bez wątku piszącego), np. do indeksowania projektów"""
+        self.data_file = data_file
+        self.journal_file = os.path.splitext(data_file)[0] + '.journal'
+        self.pdf_path = pdf_path
+        self.compact_every = compact_every
+
+        self.model = RectangleModel()
+        self.journal_ops = 0
+        self._signature = None
+        self._lock = threading.RLock()     # model
+        self._io_lock = threading.Lock()   # pliki
+        self.read_only = read_only
+
+        self.load()
+
+        self._queue = queue.Queue()
+        self._writer = None
+        if not read_only:
+            self._writer = threading.Thread(target=self._writer_loop, daemon=True, name="RectangleStoreWriter")
+            self._writer.start()
+
+    def _file_signature(self):
+        """Stan plików na dysku - pozwala wykryć zapisy innych procesów"""
+        def stat(path):
+            try:
+                st = os.stat(path)
+                return (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                return None
+        return (stat(self.data_file), stat(self.journal_file))
+
+    def _apply(self, op):
+        if op['op'] == 'add':
+            self.model.add(op['rect'])
+        elif op['op'] == 'update':
+            self.model.update(op['id'], op['fields'])
+        elif op['op'] == 'update_many':
+            for rect_id, fields in op['updates']:
+                self.model.update(rect_id, fields)
+        elif op['op'] == 'delete':
+            self.model.remove(op['id'])
+
+    def load(self):
+        """Wczytuje snapshot i odtwarza dziennik"""
+        with self._io_lock, self._lock:
+            self.model.reset()
+            self.journal_ops = 0
+
+            try:
+                with open(self.data_file, 'r') as f:
+                    data = json.load(f)
+                self.pdf_path = self.pdf_path or data.get('pdf_path')
+                self.model.reset(data.get('rectangles', []))
+            except FileNotFoundError:
+                pass
+
+            try:
+                with open(self.journal_file, 'rb') as f:
+                    journal = f.read()
+            except FileNotFoundError:
+                journal = b''
+
+            # Linia bez '\n' na końcu to zapis przerwany awarią
+            end = journal.rfind(b'\n') + 1
+            for line in journal[:end].splitlines():
+                try:
+                    op = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Skipping corrupt journal entry in {self.journal_file}")
+                    continue
+                self._apply(op)
+                self.journal_ops += 1
+            if end < len(journal) and not self.read_only:
+                # Obcinamy ucięty ogon - inaczej następny dopisek skleiłby się z nim
+                # w jedną niepoprawną linię i przepadł przy kolejnym wczytaniu
+                print(f"Truncating torn journal tail in {self.journal_file}")
+                with open(self.journal_file, 'r+b') as f:
+                    f.truncate(end)
+
+            self._signature = self._file_signature()
+
+    def refresh(self):
+        """Przeładowuje dane, jeśli pliki zmienił ktoś inny niż ten obiekt"""
+        self.flush()
+        if self._file_signature() != self._signature:
+            self.load()
+            return True
+        return False
+
+    # --- zapis w tle ---
+
+    def _writer_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                if item is _COMPACT:
+                    self._compact_now()
+                else:
+                    self._write_line(item)
+            except Exception as e:
+                print(f"Error writing rectangle journal: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write_line(self, line):
+        with self._io_lock:
+            with open(self.journal_file, 'a') as f:
+                f.write(line)
+            self.journal_ops += 1
+            self._signature = self._file_signature()
+        if self.journal_ops >= self.compact_every:
+            self._compact_now()
+
+    def _record(self, op):
+        """Zmiana już jest w modelu - serializujemy teraz, zapis w wątku piszącym"""
+        if self.read_only:
+            raise RuntimeError(f"{self.data_file} is opened read-only")
+        self._queue.put(json.dumps(op) + '\n')
+
+    def flush(self):
+        """Czeka, aż wszystkie zmiany trafią na dysk"""
+        self._queue.join()
+
+    def close(self):
+        if self._writer is None:
+            return
+        self.flush()
+        self._queue.put(_STOP)
+        self._writer.join()
+
+    # --- odczyt (z modelu) ---
+
+    def all(self):
+        """Wszystkie prostokąty (nie modyfikować zwróconych słowników)"""
+        with self._lock:
+            return self.model.all()
+
+    def get(self, rect_id):
+        with self._lock:
+            return self.model.get(rect_id)
+
+    def on_page(self, page):
+        with self._lock:
+            return self.model.on_page(page)
+
+    def hit_test(self, page, x, y):
+        with self._lock:
+            return self.model.hit_test(page, x, y)
+
+    def overlapping(self, page, bbox):
+        with self._lock:
+            return self.model.overlapping(page, bbox)
+
+    def next_id(self):
+        with self._lock:
+            return self.model.next_id()
+
+    # --- zmiany ---
+
+    def add(self, rect):
+        with self._lock:
+            self.model.add(rect)
+            self._record({'op': 'add', 'rect': rect})
+            return rect
+
+    def update(self, rect_id, fields):
+        """Aktualizuje pola prostokąta; zwraca None, jeśli nie istnieje"""
+        with self._lock:
+            rect = self.model.update(rect_id, fields)
+            if rect is not None:
+                self._record({'op': 'update', 'id': rect_id, 'fields': fields})
+            return rect
+
+    def update_many(self, updates):
+        """Aktualizuje wiele prostokątów jedną linią dziennika.
+
+        updates: {id: pola}; zwraca liczbę zaktualizowanych (brakujące id są pomijane)
+        """
+        with self._lock:
+            applied = [(rect_id, fields) for rect_id, fields in updates.items()
+                       if self.model.update(rect_id, fields) is not None]
+            if applied:
+                self._record({'op': 'update_many', 'updates': applied})
+            return len(applied)
+
+    def delete(self, rect_id):
+        with self._lock:
+            rect = self.model.remove(rect_id)
+            if rect is not None:
+                self._record({'op': 'delete', 'id': rect_id})
+            return rect
+
+    def replace_all(self, rectangles):
+        """Zastępuje wszystkie prostokąty (synchroniczny zapis pełnego snapshotu)"""
+        with self._lock:
+            self.model.reset(rectangles)
+        self.flush()
+        self._compact_now()
+
+    def export_json(self, path):
+        """Zapisuje rectangle_map.json w dotychczasowym formacie"""
+        with self._lock:
+            data = {
+                'pdf_path': self.pdf_path,
+                'rectangles': [dict(rect) for rect in self.model.all()]
+            }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def compact(self):
+        """Zleca kompaktację (snapshot + wyczyszczenie dziennika) wątkowi piszącemu"""
+        if self.read_only:
+            raise RuntimeError(f"{self.data_file} is opened read-only")
+        self._queue.put(_COMPACT)
+
+    def _compact_now(self):
+        # Zmiany zapisane do dziennika po snapshocie są idempotentne przy odtwarzaniu
+        with self._io_lock:
+            self.export_json(self.data_file)
+            if os.path.exists(self.journal_file):
+                os.remove(self.journal_file)
+            self.journal_ops = 0
+            self._signature = self._file_signature()
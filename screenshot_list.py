@@ -1,70 +1,162 @@
+import bisect
 import tkinter as tk
 from tkinter import ttk
 from screenshot_item import ScreenshotItem
+from thumbnail_cache import ThumbnailCache
+
+# Stała wysokość wiersza (miniatura 80 px + odstępy) - pozycja wiersza to row * ROW_HEIGHT
+ROW_HEIGHT = 88
+
 
 class ScreenshotList:
-    def __init__(self, parent, screenshot_manager, data_manager):
+    """Wirtualizowana lista zrzutów.
+
+    Widżety ScreenshotItem istnieją tylko dla widocznych wierszy (plus
+    margines) i są ponownie używane przy przewijaniu; dodanie i usunięcie
+    prostokąta zmienia tylko listę wierszy. Zdekodowane miniatury trzyma
+    ThumbnailCache.
+    """
+
+    def __init__(self, parent, screenshot_manager, data_manager, thumbnail_cache_size=256):
         self.parent = parent
         self.screenshot_manager = screenshot_manager
         self.data_manager = data_manager
-        self.items = {}
+        # Miniatury z ThumbnailPack projektu (pliki *_thumb.jpg w starszych projektach)
+        self.thumbnails = ThumbnailCache(thumbnail_cache_size, screenshot_manager.thumbnail_pack)
+
+        self.rects = {}    # id -> dane prostokąta wyświetlane w liście
+        self.order = []    # posortowane klucze (page, id)
+        self.items = {}    # id -> widoczny ScreenshotItem
+        self._pool = []    # [(item, window_id)] wszystkich utworzonych wierszy
         self.setup_ui()
 
     def setup_ui(self):
         ttk.Label(self.parent, text="Screenshots", font=('Arial', 12, 'bold')).pack(side="top", pady=5)
 
         # Scrollable canvas
-        self.canvas = tk.Canvas(self.parent)
-        scrollbar = ttk.Scrollbar(self.parent, orient="vertical", command=self.canvas.yview)
-        
-        self.items_frame = ttk.Frame(self.canvas)
-        self.items_frame.bind("<Configure>", 
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
-        
-        self.canvas.create_window((0, 0), window=self.items_frame, anchor="nw", 
-                                width=self.parent.winfo_width())
-        self.canvas.configure(yscrollcommand=scrollbar.set)
-        
+        self.canvas = tk.Canvas(self.parent, yscrollincrement=ROW_HEIGHT // 4)
+        self.scrollbar = ttk.Scrollbar(self.parent, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+
         self.canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-        
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.canvas.bind("<Configure>", lambda e: self.refresh())
         self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
 
     def _on_mousewheel(self, event):
         self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
 
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._render_visible()
+
+    # --- dane ---
+
+    @staticmethod
+    def _key(rect):
+        return (rect['page'], rect['id'])
+
     def update_list(self, rectangles):
-        # Clear existing items
-        for widget in self.items_frame.winfo_children():
-            widget.destroy()
-        self.items.clear()
-
-        # Create new items
-        for rect in sorted(rectangles, key=lambda x: (x['page'], x['id'])):
-            item = ScreenshotItem(
-                self.items_frame,
-                rect.get('thumbnail_path', ''),
-                rect['page'],
-                rect['id'],
-                rect.get('description', ''),
-                self._on_item_delete,
-                self._on_thumbnail_click
-            )
-            self.items[rect['id']] = item
-            
+        """Replace all rows (only the visible ones are (re)drawn)"""
+        if self.thumbnails.pack is not None:
+            self.thumbnails.pack.load()  # wszystkie miniatury jednym odczytem
+        self.rects = {rect['id']: dict(rect) for rect in rectangles}
+        self.order = sorted(self._key(rect) for rect in self.rects.values())
+        for item, _ in self._pool:
+            item.rect_id = None  # dane mogły się zmienić - widoczne wiersze rysujemy od nowa
+        self.refresh()
+
+    def add_rectangle(self, rect):
+        if rect['id'] in self.rects:
+            self.remove_rectangle(rect['id'])
+        self.rects[rect['id']] = dict(rect)
+        bisect.insort(self.order, self._key(rect))
+        self.refresh()
+
+    def remove_rectangle(self, rect_id):
+        rect = self.rects.pop(rect_id, None)
+        if rect is None:
+            return
+        i = bisect.bisect_left(self.order, self._key(rect))
+        if i < len(self.order) and self.order[i] == self._key(rect):
+            del self.order[i]
+        self.thumbnails.discard(rect)
+        self.refresh()
+
+    def set_thumbnail(self, rect_id, thumbnail_path):
+        """Show a thumbnail that finished rendering after the item was created"""
+        if rect_id in self.rects:
+            self.rects[rect_id]['thumbnail_path'] = thumbnail_path
+        if rect_id in self.items:
+            self.items[rect_id].set_thumbnail(self.rects[rect_id])
+
+    # --- wiersze ---
+
+    def refresh(self):
+        """Recompute the scroll region and redraw visible rows"""
+        width = self.canvas.winfo_width()
+        self.canvas.configure(scrollregion=(0, 0, width, len(self.order) * ROW_HEIGHT))
+        for _, window in self._pool:
+            self.canvas.itemconfigure(window, width=width)
+        self._render_visible()
+
+    def visible_rows(self, margin=2):
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first = max(0, int(top // ROW_HEIGHT) - margin)
+        last = min(len(self.order), int(bottom // ROW_HEIGHT) + 1 + margin)
+        return range(first, last)
+
+    def _render_visible(self):
+        wanted = {}
+        for row in self.visible_rows():
+            rect_id = self.order[row][1]
+            wanted[rect_id] = row
+
+        # Wiersze nadal widoczne zostają przy swoich prostokątach, pozostałe
+        # widżety są ponownie używane dla nowo odsłoniętych wierszy
+        free = []
+        assigned = {}
+        for item, window in self._pool:
+            if item.rect_id in wanted and item.rect_id not in assigned:
+                assigned[item.rect_id] = (item, window)
+            else:
+                free.append((item, window))
+        for rect_id in wanted:
+            if rect_id in assigned:
+                continue
+            if free:
+                item, window = free.pop()
+            else:
+                item = ScreenshotItem(self.canvas, self._on_item_delete, self._on_thumbnail_click, self.thumbnails)
+                window = self.canvas.create_window(0, 0, window=item, anchor="nw",
+                                                   width=self.canvas.winfo_width(), height=ROW_HEIGHT)
+                self._pool.append((item, window))
+            item.show_rect(self.rects[rect_id])
+            assigned[rect_id] = (item, window)
+
+        self.items = {}
+        for rect_id, (item, window) in assigned.items():
+            if item.page_num != self.rects[rect_id]['page']:
+                item.show_rect(self.rects[rect_id])
+            self.canvas.coords(window, 0, wanted[rect_id] * ROW_HEIGHT)
+            self.canvas.itemconfigure(window, state="normal")
+            self.items[rect_id] = item
+        for item, window in free:
+            self.canvas.itemconfigure(window, state="hidden")
+            item.rect_id = None
+
     def _on_item_delete(self, rect_id):
-        rectangles = self.data_manager.load_rectangle_data()
-        rect_to_delete = next((r for r in rectangles if r['id'] == rect_id), None)
-        
+        rect_to_delete = self.data_manager.get_rectangle(rect_id)
+
         if rect_to_delete and 'image_path' in rect_to_delete:
-            self.screenshot_manager.delete_screenshot(rect_to_delete['image_path'])
-            
-        if rect_id in self.items:
-            self.items[rect_id].destroy()
-            del self.items[rect_id]
-            
-        new_rectangles = [r for r in rectangles if r['id'] != rect_id]
-        self.data_manager.save_rectangle_data(new_rectangles)
+            self.screenshot_manager.delete_screenshot(rect_to_delete['image_path'], rect_id)
+
+        self.remove_rectangle(rect_id)
+
+        if rect_to_delete:
+            self.data_manager.delete_rectangle(rect_id, rect_to_delete['page'])
 
     def _on_thumbnail_click(self, event_type, data):
-        self.parent.event_generate("<<ThumbnailClick>>", data=str(data))
\ No newline at end of file
+        self.parent.event_generate("<<ThumbnailClick>>", data=str(data))
@@ -1,18 +1,85 @@
 import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import fitz
 
+from pdf_threading import fitz_lock
+from document_pool import open_document
+from thumbnail_pack import ThumbnailPack
+from screenshot_profiles import get_profile, render_scale, pixmap_colorspace, BITONAL_THRESHOLD
+from pixmap_convert import pixmap_to_image, pixmap_to_bitonal
+
 class ScreenshotManager:
-    def __init__(self, output_dir):
-        """Initialize with output directory"""
+    def __init__(self, output_dir, pdf_path=None, workers=2, profile='default'):
+        """Initialize with output directory
+
+        pdf_path: wymagany dla capture_async - wątki robocze otwierają
+        własne uchwyty dokumentu
+        profile: nazwa profilu kodowania zrzutów (screenshot_profiles.PROFILES)
+        """
         print(f"Initializing ScreenshotManager with output_dir: {output_dir}")
         self.output_dir = output_dir
+        self.pdf_path = pdf_path
+        get_profile(profile)  # nieznany profil - błąd od razu, nie w wątku roboczym
+        self.profile = profile
         self.thumbnails_dir = os.path.join(output_dir, "thumbnails")
         os.makedirs(output_dir, exist_ok=True)
         os.makedirs(self.thumbnails_dir, exist_ok=True)
+        # Miniatury trafiają do jednego pliku zamiast *_thumb.jpg dla każdego prostokąta
+        self.thumbnail_pack = ThumbnailPack(self.thumbnails_dir)
+        
+        # Asynchroniczne zrzuty: render + JPEG + miniatura poza pętlą Tk
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="screenshot")
+        self.completed = queue.Queue()  # (rect_id, paths, error) - odbierane w wątku Tk
+        self._local = threading.local()
+        self._handles = []
+
+    def _thread_doc(self):
+        """Dokument fitz należący do bieżącego wątku roboczego"""
+        handle = getattr(self._local, 'handle', None)
+        if handle is None:
+            handle = open_document(self.pdf_path, thread_confined=True)
+            self._local.handle = handle
+            self._handles.append(handle)
+        return handle.doc
+
+    def capture_async(self, page_num, rect, zoom_level, rect_id, profile=None):
+        """Capture and save a screenshot in a worker thread.
+
+        Wynik trafia do kolejki completed jako (rect_id, paths, error).
+        """
+        future = self.executor.submit(self._capture_and_save, page_num, rect, zoom_level, rect_id, profile)
+        
+        def on_done(f):
+            error = f.exception()
+            self.completed.put((rect_id, None if error else f.result(), error))
+        future.add_done_callback(on_done)
+        return future
+
+    def _capture_and_save(self, page_num, rect, zoom_level, rect_id, profile=None):
+        doc = self._thread_doc()
+        with fitz_lock:
+            page = doc.load_page(page_num)
+            image = self.capture_screenshot(page, rect, doc, zoom_level, profile)
+        # Kodowanie obrazu i miniatura bez blokady - PIL zwalnia GIL
+        return self.save_screenshot(image, page_num, rect_id, profile)
 
-    def capture_screenshot(self, page, rect, doc, zoom_level=2.0):
-        """Capture a screenshot from PDF page"""
+    def close(self):
+        """Wait for pending screenshots and release worker documents"""
+        self.executor.shutdown(wait=True)
+        for handle in self._handles:
+            handle.close()
+        self._handles = []
+
+    def capture_screenshot(self, page, rect, doc, zoom_level=2.0, profile=None):
+        """Capture a screenshot from PDF page
+
+        Rozdzielczość i przestrzeń kolorów wg profilu (domyślnie profil
+        menedżera); efektywne DPI (po limicie max_pixels) jest w img.info['dpi'].
+        """
+        profile = get_profile(profile or self.profile)
         print(f"Capturing screenshot with rect: {rect}, zoom_level: {zoom_level}")
         
         # Convert canvas coordinates to PDF coordinates
@@ -23,50 +90,55 @@ class ScreenshotManager:
             rect[3] / zoom_level
         )
         
-        # Create high-resolution image for OCR (300 DPI)
-        matrix = fitz.Matrix(300/72, 300/72)
+        # Skala wg DPI profilu, obniżona dla regionów przekraczających max_pixels
+        scale = render_scale(profile, pdf_rect & page.rect)
+        matrix = fitz.Matrix(scale, scale)
         try:
-            pix = page.get_pixmap(matrix=matrix, clip=pdf_rect)
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            print(f"Screenshot captured successfully, size: {img.size}")
+            # Szarości renderuje od razu PyMuPDF - bez konwersji z RGB w PIL
+            pix = page.get_pixmap(matrix=matrix, clip=pdf_rect,
+                                  colorspace=pixmap_colorspace(profile), alpha=False)
+            if profile['colorspace'] == 'bitonal':
+                img = pixmap_to_bitonal(pix, BITONAL_THRESHOLD)
+            else:
+                img = pixmap_to_image(pix)
+            dpi = round(scale * 72)
+            img.info['dpi'] = (dpi, dpi)
+            print(f"Screenshot captured successfully, size: {img.size}, {dpi} DPI")
             return img
         except Exception as e:
             print(f"Error capturing screenshot: {e}")
             raise
 
-    def save_screenshot(self, image, page_num, rect_id):
-        """Save screenshot and its thumbnail"""
-        # Generate filenames
-        screenshot_filename = f"page{page_num+1}_rect{rect_id}.jpg"
-        thumbnail_filename = f"page{page_num+1}_rect{rect_id}_thumb.jpg"
+    def save_screenshot(self, image, page_num, rect_id, profile=None):
+        """Save screenshot (format wg profilu) and add its thumbnail to the project's thumbnail pack"""
+        profile = profile or self.profile
+        profile_name = profile if isinstance(profile, str) else 'custom'
+        profile = get_profile(profile)
         
+        # Generate filenames
+        screenshot_filename = f"page{page_num+1}_rect{rect_id}{profile['extension']}"
         screenshot_path = os.path.join(self.output_dir, screenshot_filename)
-        thumbnail_path = os.path.join(self.thumbnails_dir, thumbnail_filename)
         
         print(f"Saving files:")
         print(f"- Screenshot: {screenshot_path}")
-        print(f"- Thumbnail: {thumbnail_path}")
+        print(f"- Thumbnail: {self.thumbnail_pack.pack_path} (rect {rect_id})")
         
         try:
-            # Save high-quality screenshot (300 DPI)
-            image.save(screenshot_path, 'JPEG', quality=95, dpi=(300, 300))
+            # Save screenshot with the profile's encoder options and the rendered DPI
+            dpi = image.info.get('dpi', (profile['dpi'], profile['dpi']))
+            image.save(screenshot_path, profile['format'], dpi=dpi, **profile['options'])
             print("Saved screenshot successfully")
             
-            # Create and save thumbnail
+            # Create and pack thumbnail
             thumbnail = self.create_thumbnail(image)
             if thumbnail:
-                thumbnail.save(thumbnail_path, 'JPEG', quality=85)
-                print("Saved thumbnail successfully")
-                
-                # Verify files exist
-                print(f"Verification:")
-                print(f"- Screenshot exists: {os.path.exists(screenshot_path)}")
-                print(f"- Thumbnail exists: {os.path.exists(thumbnail_path)}")
-                print(f"- Thumbnail size: {thumbnail.size}")
+                self.thumbnail_pack.add(rect_id, thumbnail, quality=85)
+                print(f"Packed thumbnail successfully, size: {thumbnail.size}")
                 
                 return {
                     'image_path': screenshot_path,
-                    'thumbnail_path': thumbnail_path
+                    'thumbnail_path': '',  # miniatura w thumbnail_pack pod id prostokąta
+                    'screenshot_profile': profile_name
                 }
         except Exception as e:
             print(f"Error saving files: {e}")
@@ -88,8 +160,8 @@ class ScreenshotManager:
             
             print(f"New thumbnail dimensions: {new_width}x{new_height}")
             
-            # Create thumbnail
-            thumbnail = image.copy()
+            # Create thumbnail (JPEG - obraz bitonalny jako skala szarości)
+            thumbnail = image.convert('L') if image.mode == '1' else image.copy()
             thumbnail.thumbnail((new_width, new_height), Image.Resampling.LANCZOS)
             print(f"Thumbnail created successfully, size: {thumbnail.size}")
             
@@ -99,19 +171,22 @@ class ScreenshotManager:
             print(f"Error creating thumbnail: {e}")
             return None
 
-    def delete_screenshot(self, image_path):
-        """Delete screenshot and its thumbnail"""
+    def delete_screenshot(self, image_path, rect_id=None):
+        """Delete screenshot and its thumbnail (packed under rect_id or a legacy file)"""
         try:
             print(f"Deleting screenshot: {image_path}")
             
             # Delete screenshot
-            if os.path.exists(image_path):
+            if image_path and os.path.exists(image_path):
                 os.remove(image_path)
                 print("Screenshot deleted")
             
+            if rect_id is not None and self.thumbnail_pack.remove(rect_id):
+                print("Packed thumbnail deleted")
+            
             # Delete thumbnail
             thumbnail_path = self.get_thumbnail_path(image_path)
-            if os.path.exists(thumbnail_path):
+            if thumbnail_path and os.path.exists(thumbnail_path):
                 os.remove(thumbnail_path)
                 print("Thumbnail deleted")
             
@@ -138,7 +213,8 @@ class ScreenshotManager:
                 if file.endswith('.jpg'):
                     print(f"- {file}")
         
-        print("\nThumbnails directory: {self.thumbnails_dir}")
+        print(f"\nThumbnail pack: {len(self.thumbnail_pack)} thumbnails in {self.thumbnail_pack.pack_path}")
+        print(f"Thumbnails directory: {self.thumbnails_dir}")
         if os.path.exists(self.thumbnails_dir):
             for file in os.listdir(self.thumbnails_dir):
                 if file.endswith('_thumb.jpg'):
@@ -0,0 +1,63 @@
+"""Profile kodowania zrzutów prostokątów.
+
+Profil określa rozdzielczość renderu, przestrzeń kolorów (renderowaną
+bezpośrednio przez PyMuPDF - bez konwersji z RGB), format pliku i jego
+opcje oraz limit pikseli dla dużych regionów (po przekroczeniu DPI jest
+obniżane, tak aby obraz miał co najwyżej max_pixels pikseli).
+"""
+import math
+
+import fitz
+
+PROFILES = {
+    # Dotychczasowe zachowanie: 300 DPI, JPEG q95
+    'default': {
+        'dpi': 300, 'colorspace': 'rgb', 'format': 'JPEG', 'extension': '.jpg',
+        'options': {'quality': 95}, 'max_pixels': None,
+    },
+    'fast-preview': {
+        'dpi': 96, 'colorspace': 'rgb', 'format': 'JPEG', 'extension': '.jpg',
+        'options': {'quality': 70}, 'max_pixels': 1_000_000,
+    },
+    'ocr-300dpi-grayscale': {
+        'dpi': 300, 'colorspace': 'gray', 'format': 'PNG', 'extension': '.png',
+        'options': {'compress_level': 3}, 'max_pixels': 50_000_000,
+    },
+    'ocr-300dpi-bitonal': {
+        'dpi': 300, 'colorspace': 'bitonal', 'format': 'PNG', 'extension': '.png',
+        'options': {'compress_level': 6}, 'max_pixels': 50_000_000,
+    },
+    'archival-webp-lossless': {
+        'dpi': 300, 'colorspace': 'rgb', 'format': 'WEBP', 'extension': '.webp',
+        'options': {'lossless': True, 'quality': 80, 'method': 4}, 'max_pixels': 50_000_000,
+    },
+}
+
+DEFAULT_PROFILE = 'default'
+
+# Próg binaryzacji dla profilu bitonal (skala szarości 0-255)
+BITONAL_THRESHOLD = 160
+
+
+def get_profile(profile):
+    """Profil po nazwie (albo słownik profilu podany wprost)"""
+    if isinstance(profile, dict):
+        return profile
+    try:
+        return PROFILES[profile or DEFAULT_PROFILE]
+    except KeyError:
+        raise ValueError(f"Unknown screenshot profile: {profile} (available: {', '.join(PROFILES)})")
+
+
+def render_scale(profile, clip):
+    """Skala renderu regionu clip (fitz.Rect) z uwzględnieniem max_pixels"""
+    scale = profile['dpi'] / 72
+    max_pixels = profile.get('max_pixels')
+    area = clip.width * clip.height
+    if max_pixels and area > 0 and area * scale * scale > max_pixels:
+        scale = math.sqrt(max_pixels / area)
+    return scale
+
+
+def pixmap_colorspace(profile):
+    return fitz.csGRAY if profile['colorspace'] in ('gray', 'bitonal') else fitz.csRGB
@@ -0,0 +1,169 @@
+"""Indeks odwrócony tekstu dokumentu: termin -> (strona, pozycja, bbox słowa).
+
+Budowany ze struktury stron pdf_content (spany z bboxami), strona po stronie,
+więc może rosnąć razem z ekstrakcją w tle. Terminy są zapisywane małymi
+literami; bbox słowa jest przybliżany równym podziałem szerokości spanu
+(jak PageLayout._clip_span). Zapisywany w katalogu projektu jako
+search_index.json.
+"""
+import bisect
+import json
+import os
+import re
+import threading
+
+from extractors.content_formats import find_content, open_content
+
+INDEX_FILE = 'search_index.json'
+
+_WORD = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Terminy zapytania/tekstu (małe litery)"""
+    return [match.group().lower() for match in _WORD.finditer(text)]
+
+
+def span_words(text, bbox):
+    """(termin, bbox) słów spanu"""
+    x0, y0, x1, y1 = bbox
+    width = (x1 - x0) / len(text) if text else 0
+    for match in _WORD.finditer(text):
+        yield (match.group().lower(),
+               (x0 + width * match.start(), y0, x0 + width * match.end(), y1))
+
+
+class SearchIndex:
+    def __init__(self, page_count=None):
+        self.page_count = page_count
+        self.pages = set()  # zaindeksowane strony (od 0)
+        self.postings = {}  # termin -> [(strona, pozycja, x0, y0, x1, y1)]
+        self._terms = None  # posortowane terminy dla wyszukiwania prefiksowego
+        self._lock = threading.Lock()
+
+    def add_page(self, page):
+        """Indeksuje stronę w schemacie pdf_content ({"page": n od 1, "content"})"""
+        page_num = page['page'] - 1
+        words = []
+        for block in page['content']:
+            if block['type'] != 'text':
+                continue
+            for line in block['lines']:
+                for span in line['spans']:
+                    words.extend(span_words(span['text'], span['bbox']))
+
+        with self._lock:
+            if page_num in self.pages:
+                return False
+            for pos, (term, (x0, y0, x1, y1)) in enumerate(words):
+                postings = self.postings.get(term)
+                if postings is None:
+                    postings = self.postings[term] = []
+                    self._terms = None
+                postings.append((page_num, pos, round(x0, 2), round(y0, 2), round(x1, 2), round(y1, 2)))
+            self.pages.add(page_num)
+        return True
+
+    def is_complete(self):
+        with self._lock:
+            return self.page_count is not None and len(self.pages) >= self.page_count
+
+    def _matching_terms(self, term, prefix):
+        if not prefix:
+            return [term] if term in self.postings else []
+        if self._terms is None:
+            self._terms = sorted(self.postings)
+        start = bisect.bisect_left(self._terms, term)
+        end = bisect.bisect_left(self._terms, term + '\uffff')
+        return self._terms[start:end]
+
+    def search(self, query, prefix=True):
+        """Wystąpienia zapytania [(strona, bbox)] w kolejności dokumentu.
+
+        Wielowyrazowe zapytanie musi wystąpić jako fraza (kolejne słowa
+        strony); przy prefix=True ostatnie słowo może być początkiem terminu.
+        Wielkość liter nie ma znaczenia.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self._lock:
+            per_term = []
+            for i, term in enumerate(terms):
+                matched = self._matching_terms(term, prefix and i == len(terms) - 1)
+                positions = {}
+                for name in matched:
+                    for page_num, pos, *bbox in self.postings[name]:
+                        positions[(page_num, pos)] = bbox
+                if not positions:
+                    return []
+                per_term.append(positions)
+
+        hits = []
+        for (page_num, pos), bbox in per_term[0].items():
+            boxes = [bbox]
+            for offset, positions in enumerate(per_term[1:], 1):
+                following = positions.get((page_num, pos + offset))
+                if following is None:
+                    break
+                boxes.append(following)
+            else:
+                hits.append((page_num, pos, (
+                    min(b[0] for b in boxes), min(b[1] for b in boxes),
+                    max(b[2] for b in boxes), max(b[3] for b in boxes)
+                )))
+        hits.sort()
+        return [(page_num, bbox) for page_num, _, bbox in hits]
+
+    def hit_counts(self, query, prefix=True):
+        """{strona: liczba wystąpień}"""
+        counts = {}
+        for page_num, _ in self.search(query, prefix):
+            counts[page_num] = counts.get(page_num, 0) + 1
+        return counts
+
+    def save(self, path):
+        with self._lock:
+            data = {
+                'version': 1,
+                'page_count': self.page_count,
+                'pages': sorted(self.pages),
+                'terms': {term: [list(p) for p in postings] for term, postings in self.postings.items()},
+            }
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        index = cls(data.get('page_count'))
+        index.pages = set(data['pages'])
+        index.postings = {term: [tuple(p) for p in postings] for term, postings in data['terms'].items()}
+        return index
+
+    @classmethod
+    def for_project(cls, project_path, page_count=None):
+        """Indeks zapisany w projekcie; brakujące strony są dobudowywane z pdf_content.*"""
+        path = os.path.join(project_path, INDEX_FILE)
+        try:
+            index = cls.load(path)
+        except (FileNotFoundError, ValueError, KeyError):
+            index = cls(page_count)
+        if page_count is not None:
+            index.page_count = page_count
+
+        if not index.is_complete() and find_content(project_path):
+            reader = open_content(project_path)
+            try:
+                if index.page_count is None:
+                    index.page_count = reader.page_count
+                for page in reader.iter_pages():
+                    if page['page'] - 1 not in index.pages:
+                        index.add_page(page)
+            finally:
+                reader.close()
+            index.save(path)
+        return index
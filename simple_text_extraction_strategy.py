@@ -2,14 +2,15 @@ import fitz
 from extractors.pdf_rectangle_extractor import PDFRectangleExtractor
 
 class SimpleTextExtractionStrategy:
-    def __init__(self, pdf_path):
+    def __init__(self, pdf_path, project_path=None):
         # Użyj PDFTextExtractor do ekstrakcji pełnego tekstu
-        self.pdf_extractor = PDFRectangleExtractor(pdf_path)
+        # (układ stron z pdf_content.* projektu, jeśli jest)
+        self.pdf_extractor = PDFRectangleExtractor(pdf_path, project_path)
     
     def can_handle(self, rectangle_data, doc):
-        page = doc[rectangle_data['page']]
+        # Filtrowanie spanów z cache układu strony zamiast get_text(clip=...)
         rect = fitz.Rect(rectangle_data['rect'])
-        text = page.get_text("text", clip=rect)
+        text = self.pdf_extractor.layouts.region_text(rectangle_data['page'], rect)
         print(f"Found text in rectangle: {text}")  # Debug
         return len(text.strip()) > 0
 
@@ -34,3 +35,6 @@ class SimpleTextExtractionStrategy:
         
         print(f"Extracted text: {result}")  # Debug
         return result
+
+    def close(self):
+        self.pdf_extractor.close()
@@ -1,7 +1,12 @@
-import json
+import math
+import os
 from abc import ABC, abstractmethod
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from simple_text_extraction_strategy import SimpleTextExtractionStrategy
-import fitz
+from document_pool import open_document
+from pdf_threading import fitz_lock
+from rectangle_store import RectangleStore
 
 class TextExtractionStrategy(ABC):
     @abstractmethod
@@ -12,63 +17,145 @@ class TextExtractionStrategy(ABC):
     def extract_text(self, rectangle_data, doc) -> dict:
         pass
 
+def result_fields(extraction_results):
+    """Pola prostokąta zapisywane po udanej ekstrakcji"""
+    return {
+        'extracted_text': extraction_results['text'],
+        'extraction_source': extraction_results['source'],
+        'extraction_metadata': extraction_results.get('metadata', {}),
+        'extraction_status': 'completed'
+    }
+
+
+def _extract_batch(pdf_path, project_path, rectangles):
+    """Worker: ekstrakcja prostokątów kilku stron bez magazynu - wyniki {id: pola}"""
+    # Proces potomny dostaje własny dokument z puli (PID w kluczu), nie kopię
+    # dokumentu rodzica ze wspólnym deskryptorem pliku
+    manager = TextExtractionManager(pdf_path, project_path=project_path)
+    try:
+        return manager.extract_batch(rectangles)
+    finally:
+        manager.close()
+
+
 class TextExtractionManager:
-    def __init__(self, pdf_path, json_path):
+    def __init__(self, pdf_path, json_path=None, store=None, project_path=None):
         """
         pdf_path: ścieżka do pliku PDF
-        json_path: ścieżka do pliku rectangle_map.json
+        json_path: ścieżka do pliku rectangle_map.json (None - bez magazynu,
+                   tylko extract_batch, np. w procesie roboczym)
+        store: wspólny RectangleStore projektu (domyślnie własny)
+        project_path: katalog projektu z pdf_content.* (domyślnie katalog json_path)
         """
         self.pdf_path = pdf_path
         self.json_path = json_path
-        self.doc = fitz.open(pdf_path)
+        self.project_path = project_path or (os.path.dirname(json_path) if json_path else None)
+        self.store = store or (RectangleStore(json_path, pdf_path) if json_path else None)
+        self._handle = open_document(pdf_path)
+        self.doc = self._handle.doc
         self.strategies = []
-        self.register_strategy(SimpleTextExtractionStrategy(pdf_path))
+        self.register_strategy(SimpleTextExtractionStrategy(pdf_path, self.project_path))
 
     def register_strategy(self, strategy: TextExtractionStrategy):
         """Dodaje nową strategię do managera"""
         self.strategies.append(strategy)
 
-    def process_rectangle(self, rectangle_data):
-        print(f"Available strategies: {len(self.strategies)}")  # Debug
+    def extract_region(self, rectangle_data):
+        """Wynik pierwszej strategii, która obsługuje prostokąt (None - żadna)"""
         for strategy in self.strategies:
             print(f"Trying strategy: {strategy.__class__.__name__}")  # Debug
             try:
-                if strategy.can_handle(rectangle_data, self.doc):
-                    print("Strategy can handle this rectangle")  # Debug
-                    result = strategy.extract_text(rectangle_data, self.doc)
-                    self.save_results(rectangle_data, result)
-                    return True
+                # Wywoływane z wątku procesora - fitz tylko pod blokadą
+                with fitz_lock:
+                    if strategy.can_handle(rectangle_data, self.doc):
+                        print("Strategy can handle this rectangle")  # Debug
+                        return strategy.extract_text(rectangle_data, self.doc)
             except Exception as e:
                 print(f"Strategy {strategy.__class__.__name__} failed: {e}")
                 continue
                 
         print(f"No suitable strategy found for rectangle {rectangle_data['id']}")
-        return False
+        return None
+
+    def process_rectangle(self, rectangle_data):
+        print(f"Available strategies: {len(self.strategies)}")  # Debug
+        result = self.extract_region(rectangle_data)
+        if result is None:
+            return False
+        self.save_results(rectangle_data, result)
+        return True
+
+    def extract_batch(self, rectangles):
+        """Ekstrakcja wielu prostokątów strona po stronie - zwraca {id: pola}.
+
+        Prostokąty grupowane są po stronach, więc układ każdej strony
+        (cache strategii) liczony jest raz dla wszystkich jej regionów.
+        """
+        by_page = defaultdict(list)
+        for rect in rectangles:
+            by_page[rect['page']].append(rect)
+
+        results = {}
+        for page in sorted(by_page):
+            for rect in by_page[page]:
+                result = self.extract_region(rect)
+                if result is not None:
+                    results[rect['id']] = result_fields(result)
+        return results
+
+    def process_batch(self, rectangles):
+        """Jak process_rectangle dla wielu prostokątów, z jednym zapisem wyników.
+
+        Zwraca liczbę zapisanych prostokątów.
+        """
+        results = self.extract_batch(rectangles)
+        saved = self.store.update_many(results)
+        print(f"Results saved for {saved} of {len(rectangles)} rectangles")
+        return saved
+
+    def reextract_all(self, workers=None, pages_per_chunk=None):
+        """Ponowna ekstrakcja wszystkich prostokątów projektu (np. po zmianie strategii).
+
+        Strony są rozdzielane między procesy (workers; None - liczba CPU,
+        1 - w bieżącym procesie). Wyniki zapisywane są jednym zapisem.
+        """
+        rectangles = [dict(rect) for rect in self.store.all()]
+        by_page = defaultdict(list)
+        for rect in rectangles:
+            by_page[rect['page']].append(rect)
+        pages = sorted(by_page)
+
+        workers = workers or os.cpu_count() or 1
+        workers = max(1, min(workers, len(pages)))
+        if workers == 1:
+            return self.process_batch(rectangles)
+
+        if pages_per_chunk is None:
+            pages_per_chunk = max(1, math.ceil(len(pages) / (workers * 4)))
+        chunks = [[rect for page in pages[start:start + pages_per_chunk] for rect in by_page[page]]
+                  for start in range(0, len(pages), pages_per_chunk)]
+
+        results = {}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_extract_batch, self.pdf_path, self.project_path, chunk)
+                       for chunk in chunks]
+            for future in futures:
+                results.update(future.result())
+
+        saved = self.store.update_many(results)
+        print(f"Results saved for {saved} of {len(rectangles)} rectangles")
+        return saved
 
     def save_results(self, rectangle_data, extraction_results):
         """
-        Zapisuje wyniki ekstrakcji do pliku JSON
+        Zapisuje wyniki ekstrakcji do magazynu prostokątów
         """
         try:
-            with open(self.json_path, 'r') as f:
-                data = json.load(f)
-                
-            # Znajdź i zaktualizuj odpowiedni prostokąt
-            for rect in data.get('rectangles', []):
-                if rect['id'] == rectangle_data['id']:
-                    rect.update({
-                        'extracted_text': extraction_results['text'],
-                        'extraction_source': extraction_results['source'],
-                        'extraction_metadata': extraction_results.get('metadata', {}),
-                        'extraction_status': 'completed'
-                    })
-                    break
-                    
-            # Zapisz zaktualizowane dane
-            with open(self.json_path, 'w') as f:
-                json.dump(data, f, indent=2)
-                
-            print(f"Results saved for rectangle {rectangle_data['id']}")
+            updated = self.store.update(rectangle_data['id'], result_fields(extraction_results))
+            if updated is None:
+                print(f"Rectangle {rectangle_data['id']} no longer exists, result dropped")
+            else:
+                print(f"Results saved for rectangle {rectangle_data['id']}")
             
         except Exception as e:
             print(f"Error saving results: {e}")
@@ -78,17 +165,16 @@ class TextExtractionManager:
         Przetwarza wszystkie oczekujące prostokąty
         """
         try:
-            with open(self.json_path, 'r') as f:
-                data = json.load(f)
-            
-            for rect in data.get('rectangles', []):
-                if 'extraction_status' not in rect:
-                    self.process_rectangle(rect)
+            pending = [rect for rect in self.store.all() if rect.get('extraction_status') != 'completed']
+            if pending:
+                self.process_batch(pending)
                     
         except Exception as e:
             print(f"Error processing pending rectangles: {e}")
 
-    def __del__(self):
-        """Cleanup przy usuwaniu managera"""
-        if hasattr(self, 'doc'):
-            self.doc.close()
\ No newline at end of file
+    def close(self):
+        """Zwalnia uchwyty dokumentu managera i strategii"""
+        for strategy in self.strategies:
+            if hasattr(strategy, 'close'):
+                strategy.close()
+        self._handle.close()
@@ -0,0 +1,79 @@
+import io
+import os
+from collections import OrderedDict
+
+from PIL import Image, ImageTk
+
+
+class ThumbnailCache:
+    """LRU zdekodowanych miniatur (PhotoImage) kluczowanych ścieżką i mtime.
+
+    Zmiana pliku (nowy zrzut pod tą samą ścieżką) zmienia mtime, więc stary
+    obraz nie jest zwracany. Miniatury z ThumbnailPack są kluczowane id
+    prostokąta i offsetem w pliku. Używać tylko w wątku Tk.
+    """
+
+    def __init__(self, max_items=256, pack=None):
+        self.max_items = max_items
+        self.pack = pack
+        self._images = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path):
+        """PhotoImage miniatury albo None, gdy pliku nie ma lub nie da się go odczytać"""
+        if not path:
+            return None
+        try:
+            key = (path, os.stat(path).st_mtime_ns)
+        except OSError:
+            return None
+
+        photo = self._images.get(key)
+        if photo is not None:
+            self._images.move_to_end(key)
+            self.hits += 1
+            return photo
+
+        return self._decode(key, path)
+
+    def for_rect(self, rect):
+        """Miniatura prostokąta: z pack (nowe projekty) albo z pliku thumbnail_path"""
+        pack = self.pack
+        entry = pack.entries.get(rect['id']) if pack is not None else None
+        if entry is None:
+            return self.get(rect.get('thumbnail_path'))
+
+        key = ('pack', rect['id'], entry[0])
+        photo = self._images.get(key)
+        if photo is not None:
+            self._images.move_to_end(key)
+            self.hits += 1
+            return photo
+        data = pack.read(rect['id'])
+        return self._decode(key, io.BytesIO(data)) if data else None
+
+    def _decode(self, key, source):
+        self.misses += 1
+        try:
+            with Image.open(source) as img:
+                photo = ImageTk.PhotoImage(img)
+        except Exception:
+            return None
+        self._images[key] = photo
+        while len(self._images) > self.max_items:
+            self._images.popitem(last=False)
+        return photo
+
+    def discard(self, rect):
+        """Usuwa z cache miniatury prostokąta (z pliku i z pack)"""
+        path = rect.get('thumbnail_path')
+        for key in [k for k in self._images
+                    if (path and k[0] == path) or (k[0] == 'pack' and k[1] == rect['id'])]:
+            del self._images[key]
+
+    def clear(self):
+        self._images.clear()
+
+    def __len__(self):
+        return len(self._images)
@@ -0,0 +1,151 @@
+"""Miniatury projektu spakowane w jednym pliku.
+
+thumbnails.pack to sklejone pliki JPEG (dopisywane na końcu), a
+thumbnails.pack.json mapuje id prostokąta -> [offset, długość]. Usunięcie
+miniatury tylko usuwa wpis z indeksu; gdy martwe bajty przekroczą
+compact_ratio rozmiaru pliku, pack jest przepisywany z samymi żywymi wpisami.
+Lista zrzutów wczytuje cały plik jednym odczytem (load) i dekoduje tylko
+widoczne miniatury.
+"""
+import io
+import json
+import os
+import threading
+
+PACK_FILE = 'thumbnails.pack'
+INDEX_FILE = 'thumbnails.pack.json'
+
+
+class ThumbnailPack:
+    def __init__(self, directory, compact_ratio=0.5, min_compact_bytes=1024 * 1024):
+        self.directory = directory
+        self.pack_path = os.path.join(directory, PACK_FILE)
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        self.compact_ratio = compact_ratio
+        self.min_compact_bytes = min_compact_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self.entries = {}  # id prostokąta -> (offset, długość)
+        self._blob = None  # zawartość pliku wczytana przez load()
+        self._lock = threading.Lock()
+        self._read_index()
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.entries = {int(rect_id): tuple(entry) for rect_id, entry in data['entries'].items()}
+        except (FileNotFoundError, ValueError, KeyError):
+            self.entries = {}
+
+    def _write_index(self):
+        tmp = self.index_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'entries': {str(k): list(v) for k, v in self.entries.items()}}, f)
+        os.replace(tmp, self.index_path)
+
+    def __contains__(self, rect_id):
+        return rect_id in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def pack_size(self):
+        try:
+            return os.path.getsize(self.pack_path)
+        except FileNotFoundError:
+            return 0
+
+    def dead_bytes(self):
+        """Bajty usuniętych/zastąpionych miniatur (i ewentualnie uciętego zapisu)"""
+        with self._lock:
+            return self.pack_size() - sum(length for _, length in self.entries.values())
+
+    # --- zapis ---
+
+    def add(self, rect_id, image, quality=85):
+        """Koduje miniaturę (PIL.Image) do JPEG i dopisuje ją do pack"""
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=quality)
+        return self.add_bytes(rect_id, buffer.getvalue())
+
+    def add_bytes(self, rect_id, data):
+        with self._lock:
+            with open(self.pack_path, 'ab') as f:
+                offset = f.tell()
+                f.write(data)
+            # Indeks zapisywany po danych - przerwany zapis zostawia tylko martwe bajty
+            self.entries[rect_id] = (offset, len(data))
+            self._write_index()
+        return offset
+
+    def remove(self, rect_id):
+        with self._lock:
+            if self.entries.pop(rect_id, None) is None:
+                return False
+            self._write_index()
+        if self._needs_compaction():
+            self.compact()
+        return True
+
+    def _needs_compaction(self):
+        dead = self.dead_bytes()
+        return dead >= self.min_compact_bytes and dead > self.pack_size() * self.compact_ratio
+
+    def compact(self):
+        """Przepisuje pack bez martwych bajtów"""
+        with self._lock:
+            tmp = self.pack_path + '.tmp'
+            entries = {}
+            with open(self.pack_path, 'rb') as src, open(tmp, 'wb') as dst:
+                for rect_id, (offset, length) in sorted(self.entries.items(), key=lambda e: e[1][0]):
+                    src.seek(offset)
+                    entries[rect_id] = (dst.tell(), length)
+                    dst.write(src.read(length))
+            os.replace(tmp, self.pack_path)
+            self.entries = entries
+            self._write_index()
+            self._blob = None
+
+    # --- odczyt ---
+
+    def load(self):
+        """Wczytuje cały pack jednym odczytem; kolejne read() tną bufor w pamięci"""
+        with self._lock:
+            try:
+                with open(self.pack_path, 'rb') as f:
+                    self._blob = f.read()
+            except FileNotFoundError:
+                self._blob = b''
+
+    def read(self, rect_id):
+        """Bajty JPEG miniatury albo None"""
+        with self._lock:
+            entry = self.entries.get(rect_id)
+            if entry is None:
+                return None
+            offset, length = entry
+            if self._blob is not None and offset + length <= len(self._blob):
+                return self._blob[offset:offset + length]
+            # Dopisane po load() - odczyt z pliku
+            with open(self.pack_path, 'rb') as f:
+                f.seek(offset)
+                return f.read(length)
+
+    def export(self, directory, extra=()):
+        """Kopia pack bez martwych bajtów w innym katalogu (jeden zapis indeksu).
+
+        extra: dodatkowe (id, bajty JPEG), np. miniatury zapisane jeszcze jako
+        osobne pliki. Zwraca nowy ThumbnailPack.
+        """
+        exported = ThumbnailPack(directory)
+        with exported._lock, open(exported.pack_path, 'wb') as dst:
+            exported.entries = {}
+            items = [(rect_id, self.read(rect_id)) for rect_id in sorted(self.entries)]
+            for rect_id, data in list(items) + list(extra):
+                if data is None:
+                    continue
+                exported.entries[rect_id] = (dst.tell(), len(data))
+                dst.write(data)
+            exported._write_index()
+        return exported